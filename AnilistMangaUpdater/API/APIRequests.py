@@ -11,24 +11,27 @@ from typing import Optional, Union
 
 import API.queries as Queries
 import requests
+from API.rate_limit import get_rate_limiter
+from API.session import get_session
 from Utils.Config import load_config
 from Utils.log import Logger
 
-# Define the API endpoint
-url = "https://graphql.anilist.co"
-
 headers: dict[str, str] = {}
 
 
 def api_request(
     query: str,
     app: object,
-    variables: Optional[Union[dict, None]] = None,
+    variables: Optional[dict] = None,
     retries: int = 3,
-) -> Optional[Union[dict, None]]:
+) -> Optional[dict]:
     """
     Send a POST request to the API endpoint and handle rate limits.
 
+    Requests are paced by the shared rate limiter. If a 429 is still received,
+    the limiter is blocked for the time given by the response and the request
+    is sent again once it lets requests through.
+
     Parameters:
         query (str): The GraphQL query to send.
         app: The application object used to update the terminal and progress.
@@ -44,24 +47,19 @@ def api_request(
         headers = {}
 
     Logger.INFO("Function api_request called.")
-    for _ in range(retries):
-        response = requests.post(
-            url,
-            json={"query": query, "variables": variables},
+    attempt = 0
+    while attempt < retries:
+        response = get_session().post(
+            {"query": query, "variables": variables},
             headers=headers,  # pylint: disable=E0606
-            timeout=10,
         )
 
         if response.status_code == 429:
-            wait_time = int(response.headers.get("X-RateLimit-Reset", 0)) - int(
-                time.time()
-            )
-            wait_time = max(wait_time, 60)
+            wait_time = round(get_rate_limiter().wait_time())
             Logger.WARNING(f"Rate limit hit. Waiting for {wait_time} seconds.")
             app.update_terminal(f"\nRate limit hit. Waiting for {wait_time} seconds.")
             app.update_estimated_time_remaining(add_time=wait_time)
-            time.sleep(wait_time)
-            return api_request(query, app, variables)
+            continue
 
         if response.status_code == 200:
             Logger.INFO("Request successful.")
@@ -74,6 +72,7 @@ def api_request(
             app.update_terminal(
                 f"\nServer error, retrying request. Status code: {response.status_code}"
             )
+            attempt += 1
             time.sleep(2)
             continue
 
@@ -134,7 +133,7 @@ def Set_Access_Token(app: object) -> Union[bool, None]:
         return False
 
 
-def needs_refresh(app: object) -> Optional[Union[bool, None]]:
+def needs_refresh(app: object) -> Optional[bool]:
     """
     Check if the access token needs to be refreshed.
 
@@ -154,10 +153,8 @@ def needs_refresh(app: object) -> Optional[Union[bool, None]]:
     query = Queries.VIEWER
     Logger.DEBUG("Defined the query.")
     try:
-        # Send a POST request to the API endpoint with a timeout of 10 seconds
-        response = requests.post(
-            url, json={"query": query}, headers=headers, timeout=10
-        )
+        # Send a POST request to the API endpoint through the shared session
+        response = get_session().post({"query": query}, headers=headers)
         Logger.DEBUG("Sent the POST request.")
     except requests.exceptions.RequestException:
         Logger.ERROR("Error: Cannot resolve graphql.anilist.co")
@@ -8,8 +8,9 @@ represents a manga with its details.
 # pylint: disable=C0103, W0601, W0603, E0401
 
 import math
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Union
+from typing import Iterable, Iterator, NamedTuple, Union
 
 import API.queries as Queries
 from API.APIRequests import api_request
@@ -21,6 +22,15 @@ chapters_updated: int = 0
 # Initialize userId
 userId: Union[int, None] = None
 
+# Maximum number of media items Anilist returns in a single page
+FORMAT_BATCH_SIZE: int = 50
+
+# Number of manga list entries requested per chunk
+LIST_CHUNK_SIZE: int = 500
+
+# Number of manga list chunks requested at once
+LIST_CHUNK_WINDOW: int = 4
+
 # Initialize the dictionary for the status mapping
 status_mapping: dict[str, str] = {
     "reading": "CURRENT",
@@ -56,51 +66,182 @@ def Get_User(app: object) -> Union[int, None]:
     return None
 
 
-def Get_User_Manga_List(app: object) -> list[dict[str, Union[int, str]]]:
+class MangaListEntry(NamedTuple):
     """
-    Retrieves the entire manga list of a user from AniList.
+    An entry of the user's manga list on AniList.
+
+    Attributes:
+        mediaId: The ID of the manga.
+        progress: The number of chapters read.
+        status: The status of the entry, such as CURRENT or COMPLETED.
+        format: The format of the manga, such as MANGA or NOVEL.
+        titles: The English and Romaji titles and the synonyms of the manga.
+    """
+
+    mediaId: int
+    progress: int
+    status: str
+    format: Union[str, None] = None
+    titles: tuple[str, ...] = ()
+
+
+class MangaList:
+    """
+    The user's manga list on AniList, indexed by media ID.
+
+    Entries are kept in the order AniList returns them, and each entry is a
+    MangaListEntry tuple rather than the dictionary from the response. A manga
+    that appears in several lists (such as a custom list) keeps its first entry.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, MangaListEntry] = {}
+
+    def add_entries(self, entries: Iterable[dict]) -> None:
+        """
+        Adds the entries of a MediaListCollection response to the list.
+
+        Parameters:
+            entries (iterable): The entries, each a dictionary with 'mediaId',
+                'progress', 'status' and optionally 'media' keys.
+        """
+        for entry in entries:
+            media_id = int(entry["mediaId"])
+            if media_id not in self._entries:
+                progress = entry.get("progress")
+                media = entry.get("media") or {}
+                title = media.get("title") or {}
+                self._entries[media_id] = MangaListEntry(
+                    media_id,
+                    int(progress) if progress is not None else 0,
+                    entry["status"],
+                    media.get("format"),
+                    tuple(
+                        name
+                        for name in (
+                            title.get("english"),
+                            title.get("romaji"),
+                            *(media.get("synonyms") or []),
+                        )
+                        if name
+                    ),
+                )
+
+    def get(self, media_id: int) -> Union[MangaListEntry, None]:
+        """
+        Gets the entry of a manga.
+
+        Parameters:
+            media_id (int): The ID of the manga.
+
+        Returns:
+            MangaListEntry: The entry of the manga, or None if it is not on the list.
+        """
+        return self._entries.get(media_id)
+
+    def __contains__(self, media_id: object) -> bool:
+        return media_id in self._entries
+
+    def __iter__(self) -> Iterator[MangaListEntry]:
+        return iter(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def Stream_User_Manga_List(
+    app: object,
+    window: int = LIST_CHUNK_WINDOW,
+    per_chunk: int = LIST_CHUNK_SIZE,
+) -> Iterator[dict[str, Union[int, str]]]:
+    """
+    Streams the entire manga list of a user from AniList, chunk by chunk.
+
+    The first chunk is requested on its own, since most lists fit in a single
+    chunk. Once a chunk reports that there is a next one, up to window chunks
+    are requested at once, ahead of the chunk being read, and every request goes
+    through the shared rate limiter. The end of the list is found from the
+    hasNextChunk field of a chunk, or from the first empty chunk. Chunks fetched
+    past the end are dropped. The entries are yielded in the order AniList
+    returns them, as soon as their chunk has arrived.
 
     Parameters:
         app: The application object used to send the API request.
+        window (int): The maximum number of chunks requested at once once the
+            list is known to have more than one chunk.
+        per_chunk (int): The number of entries requested per chunk.
 
-    Returns:
-        list: The list of manga, each represented as a dictionary with 'mediaId',
-        'progress', and 'status' keys.
+    Yields:
+        dict: Each entry, a dictionary with 'mediaId', 'progress', 'status', and
+        'media' keys.
     """
-    Logger.INFO("Function Get_User_Manga_List called.")
+    Logger.INFO("Function Stream_User_Manga_List called.")
     query: str = Queries.MANGALIST
-    chunk: int = 0
-    per_chunk: int = 500
-    manga_list: list = []
     user_Id: Union[int, None] = Get_User(app)
 
-    while True:
+    def fetch_chunk(chunk: int) -> Union[dict, None]:
         variables = {"userId": user_Id, "chunk": chunk, "perChunk": per_chunk}
         Logger.DEBUG(f"Sending API request with variables: {variables}")
-        data = api_request(query, app, variables)
+        return api_request(query, app, variables)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max(window, 1), thread_name_prefix="anilist-list"
+    )
+    futures: dict[int, Future] = {}
+    chunk: int = 0
+    next_chunk: int = 0
+    # The number of chunks kept in flight, one until a chunk reports a next one
+    ahead: int = 1
+    try:
+        while True:
+            # Keep the chunks ahead of the one being read in flight
+            while next_chunk < chunk + ahead:
+                futures[next_chunk] = executor.submit(fetch_chunk, next_chunk)
+                next_chunk += 1
 
-        if data:
-            chunk_manga_list = (
-                data.get("data", {}).get("MediaListCollection", {}).get("lists", [])
-            )
+            data = futures.pop(chunk).result()
+            if not data:
+                Logger.WARNING("API request returned no data. Stopping the stream.")
+                break
 
+            collection = (data.get("data") or {}).get("MediaListCollection") or {}
+            chunk_manga_list = collection.get("lists") or []
             if not chunk_manga_list:
-                Logger.DEBUG("No more chunks in manga list. Breaking the loop.")
+                Logger.DEBUG("No more chunks in manga list. Stopping the stream.")
                 break
 
-            manga_list += [
-                entry
-                for sublist in chunk_manga_list
-                for entry in sublist.get("entries", [])
-            ]
-            Logger.DEBUG(
-                f"Added chunk to manga list. Current list length: {len(manga_list)}"
-            )
+            for sublist in chunk_manga_list:
+                yield from sublist.get("entries") or []
+            Logger.DEBUG(f"Streamed chunk {chunk} of the manga list.")
+
+            has_next_chunk = collection.get("hasNextChunk")
+            if has_next_chunk is False:
+                Logger.DEBUG("Last chunk of the manga list reached.")
+                break
+            # Only request several chunks at once while there are more to come
+            ahead = max(window, 1) if has_next_chunk else 1
             chunk += 1
-        else:
-            Logger.WARNING("API request returned no data. Breaking the loop.")
-            break
+    finally:
+        # Drop the chunks requested past the end of the list. Those already sent
+        # cannot be cancelled, so at most window - 1 requests are wasted
+        Logger.DEBUG(f"Dropping {len(futures)} chunks fetched past the end.")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def Get_User_Manga_List(app: object) -> MangaList:
+    """
+    Retrieves the entire manga list of a user from AniList.
+
+    Parameters:
+        app: The application object used to send the API request.
 
+    Returns:
+        MangaList: The list of manga, indexed by media ID.
+    """
+    Logger.INFO("Function Get_User_Manga_List called.")
+    manga_list = MangaList()
+    manga_list.add_entries(Stream_User_Manga_List(app))
+    Logger.DEBUG(f"Got the manga list. List length: {len(manga_list)}")
     return manga_list
 
 
@@ -136,6 +277,41 @@ def Get_Format(media_id: int, app: object) -> Union[str, None]:
     return None
 
 
+def Get_Formats(
+    media_ids: list[int], app: object, batch_size: int = FORMAT_BATCH_SIZE
+) -> dict[int, Union[str, None]]:
+    """
+    Retrieves the formats of many media items from AniList in as few requests as possible.
+
+    The IDs are sent in batches of up to batch_size with a single
+    Page { media(id_in: [...]) } query per batch.
+
+    Parameters:
+        media_ids (list): The IDs of the media items.
+        app: The application object used to send the API request.
+        batch_size (int): The number of IDs sent per request. Defaults to 50.
+
+    Returns:
+        dict: A dictionary mapping each media ID to its format. IDs that could
+        not be retrieved are mapped to None.
+    """
+    Logger.INFO(f"Function Get_Formats called with {len(media_ids)} media IDs.")
+    unique_ids = list(dict.fromkeys(media_ids))
+    formats: dict[int, Union[str, None]] = dict.fromkeys(unique_ids)
+    for start in range(0, len(unique_ids), batch_size):
+        batch = unique_ids[start : start + batch_size]
+        variables = {"ids": batch, "perPage": len(batch)}
+        data = api_request(Queries.FORMATS, app, variables)
+        if not data:
+            Logger.WARNING(f"The request for media IDs {batch} was not successful.")
+            continue
+        media_list = (data.get("data") or {}).get("Page", {}).get("media") or []
+        for media in media_list:
+            formats[media["id"]] = media.get("format") or None
+        Logger.DEBUG(f"Got the formats of {len(media_list)} media items.")
+    return formats
+
+
 class Manga:  # pylint: disable=R0903
     """
     Represents a Manga with its details.
@@ -146,7 +322,7 @@ class Manga:  # pylint: disable=R0903
         last_chapter_read: The last chapter of the manga that was read.
         private_bool: A boolean indicating whether the manga is private.
         status: The status of the manga.
-        last_read_at: The date and time when the manga was last read.
+        last_read_at: The date and time when the manga was last read, if known.
         months: The number of months since the manga was last read.
     """
 
@@ -157,7 +333,7 @@ class Manga:  # pylint: disable=R0903
         last_chapter_read: int,
         private_bool: str,
         status: str,
-        last_read_at: str,
+        last_read_at: Union[str, None],
         months: str,
     ):
         self.name: str = name
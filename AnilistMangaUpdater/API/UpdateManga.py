@@ -3,10 +3,16 @@ This module contains functions to update manga details such as status, progress,
 and privacy settings. It also includes functions to handle the updating process,
 including creating a dictionary of variables for updating, updating the status
 and progress of the manga, and sending the update request to the Anilist API.
+
+The mutations of a manga are the fewest that bring its entry from the progress
+and status it has on AniList to the new ones: a single SaveMediaListEntry holding
+only the fields that change, or none if the entry is already up to date.
 """
 
 # pylint: disable=C0103, W0601, W0603, E0401
 
+import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, Union
 
@@ -19,12 +25,15 @@ from API.AccessAPI import (  # noqa: F401
 from API.APIRequests import api_request
 from Utils.log import Logger
 
+# Guards chapters_updated when manga are updated from several threads
+chapters_updated_lock = threading.Lock()
+
 
 def update_manga_variables(
     manga_id: int,
-    progress: Optional[Union[int, None]] = None,
-    status: Optional[Union[str, None]] = None,
-    private: Optional[Union[bool, None]] = None,
+    progress: Optional[int] = None,
+    status: Optional[str] = None,
+    private: Optional[bool] = None,
 ) -> dict:
     """
     Creates a dictionary of variables for updating a manga.
@@ -46,10 +55,11 @@ def update_manga_variables(
         "status": status,
         "private": private,
     }
-    Logger.DEBUG(f"Created the variables dictionary: {variables}")
     # Only return variables that are not None
     filtered_variables = {k: v for k, v in variables.items() if v is not None}
-    Logger.DEBUG(f"Filtered the variables dictionary: {filtered_variables}")
+    if Logger.is_enabled_for(logging.DEBUG):
+        Logger.DEBUG(f"Created the variables dictionary: {variables}")
+        Logger.DEBUG(f"Filtered the variables dictionary: {filtered_variables}")
     return filtered_variables
 
 
@@ -57,7 +67,8 @@ def Update_Manga(
     manga: object,
     app: object,
     chapter_anilist: int,
-    manga_status: Union[int, str, None],
+    manga_status: Union[str, None],
+    batcher: Optional[object] = None,
 ) -> Optional[bool]:
     """
     Updates the manga in the user's list.
@@ -70,6 +81,8 @@ def Update_Manga(
         app: The application instance.
         chapter_anilist: The current progress of the manga in the user's list.
         manga_status: The current status of the manga in the user's list.
+        batcher: The MutationBatcher to queue the mutations in. If not given,
+            the mutations are sent right away.
 
     Returns:
         None
@@ -83,13 +96,12 @@ def Update_Manga(
         userId = Get_User(app)
         Logger.DEBUG(f"Got the user ID: {userId}")
 
-    Logger.INFO("Updating the status of the manga.")
-    manga.status = update_status(manga)
-    Logger.DEBUG(f"Updated the status of the manga to: {manga.status}")
+    variables_list = plan_manga_update(manga, chapter_anilist, manga_status)
 
-    Logger.INFO("Updating the variables for the manga.")
-    variables_list = update_variables(manga, chapter_anilist, manga_status)
-    Logger.DEBUG(f"Updated the variables for the manga: {variables_list}")
+    if batcher is not None:
+        Logger.INFO("Queueing the mutations of the manga.")
+        batcher.add(manga, variables_list, chapter_anilist)
+        return None
 
     Logger.INFO("Updating the progress of the manga.")
     updated = update_manga_progress(manga, app, variables_list, chapter_anilist)
@@ -97,6 +109,40 @@ def Update_Manga(
     return updated
 
 
+def plan_manga_update(
+    manga: object,
+    chapter_anilist: Union[str, int, None],
+    manga_status: Union[str, None],
+) -> list[dict]:
+    """
+    Computes the mutations that update the manga in the user's list, without
+    sending them.
+
+    The status of the manga is updated first, and its last chapter read is
+    adjusted the same way as when the mutations are sent.
+
+    Args:
+        manga: The manga to update.
+        chapter_anilist: The current progress of the manga in the user's list.
+        manga_status: The current status of the manga in the user's list.
+
+    Returns:
+        list: A list of dictionaries, each containing the variables for the mutation request.
+    """
+    Logger.INFO("Updating the status of the manga.")
+    # This runs for every manga, so only build the messages if logged
+    debug = Logger.is_enabled_for(logging.DEBUG)
+    manga.status = update_status(manga)
+    if debug:
+        Logger.DEBUG(f"Updated the status of the manga to: {manga.status}")
+
+    Logger.INFO("Updating the variables for the manga.")
+    variables_list = update_variables(manga, chapter_anilist, manga_status)
+    if debug:
+        Logger.DEBUG(f"Updated the variables for the manga: {variables_list}")
+    return variables_list
+
+
 def update_status(manga: object) -> str:
     """
     Updates the status of the given manga.
@@ -122,14 +168,66 @@ def update_status(manga: object) -> str:
     )
 
 
+def diff_entry_variables(  # pylint: disable=R0913
+    manga_id: int,
+    progress: Union[int, None],
+    status: Union[str, None],
+    target_progress: Union[int, None],
+    target_status: Union[str, None],
+    private: Optional[bool] = None,
+) -> list[dict]:
+    """
+    Computes the fewest SaveMediaListEntry mutations that bring an entry from its
+    current progress and status to the target ones.
+
+    Only the fields that change are sent, all in a single mutation. A planned
+    entry is reset to chapter 0 by the same mutation that sets its status, as
+    the original update did.
+
+    Args:
+        manga_id: The ID of the manga.
+        progress: The progress of the entry on AniList.
+        status: The status of the entry on AniList, or None if it is not on the
+            user's list yet.
+        target_progress: The progress the entry should have, or None to keep it.
+        target_status: The status the entry should have, or None to keep it.
+        private: The privacy setting sent with the mutation, or None to keep it.
+
+    Returns:
+        list: The variables of each mutation, in the order they must be sent.
+            Empty if the entry is already in the target state, a single mutation
+            otherwise.
+    """
+    new_progress = (
+        target_progress
+        if target_progress is not None and target_progress != progress
+        else None
+    )
+    new_status = (
+        target_status if target_status is not None and target_status != status else None
+    )
+    if new_progress is None and new_status is None and status is not None:
+        return []
+    return [
+        update_manga_variables(
+            manga_id, progress=new_progress, status=new_status, private=private
+        )
+    ]
+
+
 def update_variables(
     manga: object,
     chapter_anilist: Union[str, int, None],
-    manga_status: Union[str, int, None],
+    manga_status: Union[str, None],
 ) -> list[dict]:
     """
     Updates the variables for the given manga.
 
+    The target progress and status of the entry are worked out first, and
+    diff_entry_variables then gives the fewest mutations that reach them.
+    Completed entries are never changed. When only the status changes, the
+    progress on AniList is kept, except that planned manga are set to chapter 0.
+
     Args:
         manga: The manga object whose variables are to be updated. The manga object should
         have 'status', 'last_chapter_read', 'id', and 'private_bool' attributes.
@@ -139,75 +237,50 @@ def update_variables(
     Returns:
         list: A list of dictionaries, each containing the variables for the mutation request.
     """
-    variables_list = []
-    manga.last_chapter_read = (
-        0
-        if manga.last_chapter_read is None and manga.last_chapter_read
-        else manga.last_chapter_read
-    )
     if manga_status == "COMPLETED":
-        pass
-    elif manga.status == "PLANNING" or (
+        return []
+    chapter_anilist = int(chapter_anilist) if chapter_anilist is not None else None
+    if manga.status == "PLANNING" or (
         manga.status != manga_status
         and (
             manga.last_chapter_read is None
-            or manga.last_chapter_read <= chapter_anilist
-            or chapter_anilist is None
+            or (
+                chapter_anilist is not None
+                and manga.last_chapter_read <= chapter_anilist
+            )
         )
     ):
-        manga.last_chapter_read = (
-            0 if manga.status == "PLANNING" else manga.last_chapter_read
-        )
-        first_variables = update_manga_variables(
-            manga.id,
-            status=manga.status,
-            progress=(
-                0
-                if manga.status == "PLANNING"
-                else int(chapter_anilist)
-                if chapter_anilist is not None
-                else None
-            ),
-            private=manga.private_bool,
-        )
-        variables_list.append(first_variables)
+        if manga.status == "PLANNING":
+            manga.last_chapter_read = 0
+        target_progress = 0 if manga.status == "PLANNING" else None
     elif manga.last_chapter_read is not None and (
-        manga.last_chapter_read > chapter_anilist or chapter_anilist is None
+        chapter_anilist is None or manga.last_chapter_read > chapter_anilist
     ):
-        first_variables = update_manga_variables(
-            manga.id,
-            progress=((int(chapter_anilist) if chapter_anilist is not None else 0) + 1),
-            private=manga.private_bool,
-        )
-        third_variables = None
-        second_variables = None
-        if (
-            manga.status == "PLANNING"
-            and ((int(chapter_anilist) if chapter_anilist is not None else 0) + 1)
-            != manga.last_chapter_read
-        ):
-            second_variables = update_manga_variables(
-                manga.id, progress=manga.last_chapter_read
-            )
-            third_variables = update_manga_variables(manga.id, status=manga.status)
-        elif (
-            (int(chapter_anilist) if chapter_anilist is not None else 0) + 1
-        ) != manga.last_chapter_read:
-            second_variables = update_manga_variables(
-                manga.id, status=manga.status, progress=manga.last_chapter_read
-            )
-        variables_list.extend(
-            [
-                v
-                for v in [first_variables, second_variables, third_variables]
-                if v is not None
-            ]
-        )
+        target_progress = manga.last_chapter_read
+    else:
+        return []
+    variables_list = diff_entry_variables(
+        manga.id,
+        chapter_anilist,
+        manga_status,
+        target_progress,
+        manga.status,
+        manga.private_bool,
+    )
+    Logger.DEBUG(
+        f"Diffed the entry from progress {chapter_anilist} and status "
+        f"{manga_status} to progress {target_progress} and status {manga.status}: "
+        f"{len(variables_list)} mutations."
+    )
     return variables_list
 
 
 def update_manga_progress(
-    manga: object, app: object, variables_list: list, chapter_anilist: int
+    manga: object,
+    app: object,
+    variables_list: list,
+    chapter_anilist: int,
+    responses: Optional[list] = None,
 ) -> Optional[bool]:
     """
     Updates the progress of the given manga.
@@ -219,6 +292,9 @@ def update_manga_progress(
     and prints a message. If the response is not successful, it prints an error message
     and returns.
 
+    If the responses are given, the mutations have already been sent as part of a
+    batch and only their responses are checked.
+
     Args:
         manga: The manga object whose progress is to be updated. The manga object
             should have 'name', 'id', and 'last_chapter_read' attributes.
@@ -226,6 +302,8 @@ def update_manga_progress(
         variables_list: A list of dictionaries, each containing the variables for
             the mutation request.
         chapter_anilist: The current chapter of the manga from Anilist.
+        responses: The response of each mutation in variables_list, if they were
+            already sent.
 
     Returns:
         None
@@ -245,17 +323,25 @@ def update_manga_progress(
     """
 
     update_sent = False
+    # This runs for every manga, so only build the messages if logged
+    debug = Logger.is_enabled_for(logging.DEBUG)
 
     Logger.INFO("Function update_manga_progress called.")
-    for variables in variables_list:
-        Logger.DEBUG(f"Processing variables: {variables}")
+    for index, variables in enumerate(variables_list):
+        if debug:
+            Logger.DEBUG(f"Processing variables: {variables}")
         previous_mediaId = variables.get("mediaId")
-        response = api_request(query, app, variables)
-        Logger.DEBUG(f"Received response: {response}")
+        response = (
+            responses[index]
+            if responses is not None
+            else api_request(query, app, variables)
+        )
+        if debug:
+            Logger.DEBUG(f"Received response: {response}")
         if response:
             Logger.INFO("Response is successful.")
             if manga.last_chapter_read is not None and (
-                manga.last_chapter_read > chapter_anilist or chapter_anilist is None
+                chapter_anilist is None or manga.last_chapter_read > chapter_anilist
             ):
                 Logger.DEBUG(
                     "Last read chapter is greater than AniList chapter or AniList chapter is None."
@@ -269,8 +355,12 @@ def update_manga_progress(
                     )
                     Logger.INFO(message)
                     app.update_terminal(message)
-                    chapters_updated += manga.last_chapter_read - chapter_anilist
-                    Logger.DEBUG(f"Updated chapters_updated to: {chapters_updated}")
+                    with chapters_updated_lock:
+                        chapters_updated += manga.last_chapter_read - (
+                            chapter_anilist or 0
+                        )
+                    if debug:
+                        Logger.DEBUG(f"Updated chapters_updated to: {chapters_updated}")
                     update_sent = True
             else:
                 message = f"Manga: {manga.name}({manga.id}) Status has been set to {manga.status}\n"
@@ -0,0 +1,128 @@
+"""
+This module contains an asyncio client for Anilist's GraphQL endpoint.
+
+The client keeps a bounded number of requests in flight at once. Each request is
+sent through api_request on a worker thread, so it shares the pooled session and
+the process-wide rate limiter with every other request, and returns the same
+response as api_request.
+"""
+
+# pylint: disable=C0103, E0401
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar, Union
+
+from API.APIRequests import api_request
+from Utils.log import Logger
+
+T = TypeVar("T")
+
+# Default number of requests kept in flight at once
+DEFAULT_CONCURRENCY: int = 4
+
+
+class AsyncGraphQLClient:
+    """
+    An asyncio client that keeps at most `concurrency` blocking calls in flight.
+
+    Attributes:
+        concurrency (int): The maximum number of calls running at once.
+    """
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY) -> None:
+        self.concurrency: int = max(int(concurrency), 1)
+        self._semaphore: Union[asyncio.Semaphore, None] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="anilist"
+        )
+        Logger.INFO(f"AsyncGraphQLClient created with concurrency {self.concurrency}.")
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        Gets the semaphore bounding the calls in flight, creating it in the running loop.
+
+        Returns:
+            asyncio.Semaphore: The semaphore.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Runs a blocking function on a worker thread once a slot is free.
+
+        Parameters:
+            func (Callable): The blocking function to run.
+            *args: The arguments to pass to the function.
+
+        Returns:
+            The return value of the function.
+        """
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def request(
+        self,
+        query: str,
+        app: object,
+        variables: Optional[dict] = None,
+        retries: int = 3,
+    ) -> Optional[dict]:
+        """
+        Sends a GraphQL request without blocking the event loop.
+
+        Parameters:
+            query (str): The GraphQL query to send.
+            app: The application object used to update the terminal and progress.
+            variables (dict, optional): The variables for the GraphQL query.
+            retries (int, optional): The number of times to retry the request if a
+                500 status code is received.
+
+        Returns:
+            dict: The JSON response from the API if the request is successful,
+            None otherwise.
+        """
+        return await self.run(api_request, query, app, variables, retries)
+
+    def close(self) -> None:
+        """
+        Shuts down the worker threads.
+        """
+        self._executor.shutdown(wait=True)
+
+
+async def async_api_request(
+    query: str,
+    app: object,
+    variables: Optional[dict] = None,
+    retries: int = 3,
+    client: Optional[AsyncGraphQLClient] = None,
+) -> Optional[dict]:
+    """
+    Sends a GraphQL request without blocking the event loop.
+
+    This is the asyncio counterpart of api_request and returns the same response.
+
+    Parameters:
+        query (str): The GraphQL query to send.
+        app: The application object used to update the terminal and progress.
+        variables (dict, optional): The variables for the GraphQL query.
+        retries (int, optional): The number of times to retry the request if a
+            500 status code is received.
+        client (AsyncGraphQLClient, optional): The client bounding the requests
+            in flight. A single-use client is created if not given.
+
+    Returns:
+        dict: The JSON response from the API if the request is successful, None otherwise.
+    """
+    if client is not None:
+        return await client.request(query, app, variables, retries)
+    client = AsyncGraphQLClient(1)
+    try:
+        return await client.request(query, app, variables, retries)
+    finally:
+        client.close()
@@ -0,0 +1,218 @@
+"""
+This module contains the MutationBatcher class, which packs the SaveMediaListEntry
+mutations of many manga into a single aliased GraphQL document.
+
+Every set of variables produced by update_variables becomes one aliased
+SaveMediaListEntry field. GraphQL runs the fields of a mutation one after another
+in document order, and the mutations of one manga are always kept next to each
+other in the same document, so a manga that needs progress-then-status is still
+updated in that order. The result or error of each alias is mapped back to its
+manga, and the terminal messages and chapters_updated accounting are done by
+update_manga_progress exactly as for a single mutation. If a run journal is
+given, the mutations of each manga are recorded in it once they were applied.
+
+The number of mutations per document can be set with the optional configuration
+key MUTATION_BATCH_SIZE.
+"""
+
+# pylint: disable=C0103, E0401
+
+import logging
+import threading
+from typing import Optional
+
+from API.APIRequests import api_request
+from API.UpdateManga import update_manga_progress
+from Utils.log import Logger, correlate
+
+# Default number of SaveMediaListEntry mutations sent in a single document
+DEFAULT_MUTATION_BATCH_SIZE: int = 25
+
+# GraphQL types of the SaveMediaListEntry arguments
+MUTATION_VARIABLE_TYPES: dict[str, str] = {
+    "mediaId": "Int",
+    "status": "MediaListStatus",
+    "progress": "Int",
+    "private": "Boolean",
+}
+
+
+def build_batched_mutation(variables_list: list[dict]) -> tuple[str, dict]:
+    """
+    Builds a single GraphQL document with one aliased SaveMediaListEntry per variables.
+
+    Parameters:
+        variables_list (list): The variables of each mutation, in the order they run.
+
+    Returns:
+        tuple: The GraphQL document and its variables. The mutation built from
+        variables_list[i] has the alias f"m{i}".
+    """
+    definitions = []
+    fields = []
+    document_variables = {}
+    for index, variables in enumerate(variables_list):
+        arguments = []
+        for name, value in variables.items():
+            variable_name = f"{name}{index}"
+            definitions.append(f"${variable_name}: {MUTATION_VARIABLE_TYPES[name]}")
+            arguments.append(f"{name}: ${variable_name}")
+            document_variables[variable_name] = value
+        fields.append(
+            f"m{index}: SaveMediaListEntry ({', '.join(arguments)}) "
+            "{ id status progress private }"
+        )
+    query = f"mutation ({', '.join(definitions)}) {{\n" + "\n".join(fields) + "\n}"
+    return query, document_variables
+
+
+class MutationBatcher:
+    """
+    Collects the mutations of many manga and sends them in aliased batches.
+
+    Attributes:
+        app: The application instance.
+        batch_size (int): The number of mutations after which a batch is sent.
+        journal (RunJournal): The journal the applied mutations are recorded in,
+            or None.
+        batches_sent (int): The number of batched documents sent.
+        mutations_sent (int): The number of mutations sent in those documents.
+    """
+
+    def __init__(
+        self,
+        app: object,
+        batch_size: int = DEFAULT_MUTATION_BATCH_SIZE,
+        journal: Optional[object] = None,
+    ) -> None:
+        self.app = app
+        self.batch_size: int = max(int(batch_size), 1)
+        self.journal = journal
+        self.batches_sent: int = 0
+        self.mutations_sent: int = 0
+        self._pending: list[tuple[object, list[dict], int]] = []
+        self._pending_mutations: int = 0
+        self._lock = threading.Lock()
+
+    def add(
+        self, manga: object, variables_list: list[dict], chapter_anilist: int
+    ) -> None:
+        """
+        Queues the mutations of a manga, sending a batch once enough are queued.
+
+        Parameters:
+            manga: The manga object the mutations belong to.
+            variables_list (list): The variables of each mutation for the manga.
+            chapter_anilist (int): The current chapter of the manga from Anilist.
+        """
+        if not variables_list:
+            return
+        with self._lock:
+            self._pending.append((manga, variables_list, chapter_anilist))
+            self._pending_mutations += len(variables_list)
+            if Logger.is_enabled_for(logging.DEBUG):
+                Logger.DEBUG(
+                    f"Queued {len(variables_list)} mutations for {manga.name}. "
+                    f"{self._pending_mutations} mutations pending."
+                )
+            if self._pending_mutations < self.batch_size:
+                return
+            batch = self._take_pending()
+        self._send(batch)
+
+    def flush(self) -> None:
+        """
+        Sends every queued mutation.
+        """
+        with self._lock:
+            batch = self._take_pending()
+        if batch:
+            self._send(batch)
+
+    def _take_pending(self) -> list[tuple[object, list[dict], int]]:
+        """
+        Takes the queued mutations out of the queue. The lock must be held.
+
+        Returns:
+            list: The manga, variables and AniList chapter of each queued manga.
+        """
+        batch = self._pending
+        self._pending = []
+        self._pending_mutations = 0
+        return batch
+
+    def _send(self, batch: list[tuple[object, list[dict], int]]) -> None:
+        """
+        Sends a batch of mutations as one document and reports the result of each manga.
+
+        If the document as a whole fails, the mutations of each manga are sent
+        on their own instead so that one bad entry does not fail the others.
+
+        Parameters:
+            batch (list): The manga, variables and AniList chapter of each manga.
+        """
+        variables_list = [
+            variables
+            for _, manga_variables, _ in batch
+            for variables in manga_variables
+        ]
+        Logger.INFO(
+            f"Sending {len(variables_list)} mutations for {len(batch)} manga in one request."
+        )
+        query, document_variables = build_batched_mutation(variables_list)
+        response = api_request(query, self.app, document_variables)
+        with self._lock:
+            self.batches_sent += 1
+            self.mutations_sent += len(variables_list)
+
+        data = response.get("data") if response is not None else None
+        if response is None or not data:
+            Logger.WARNING("Batched mutation failed. Sending the mutations one by one.")
+            for manga, manga_variables, chapter_anilist in batch:
+                self._report(manga, manga_variables, chapter_anilist)
+            return
+
+        failed_aliases = {
+            error["path"][0]
+            for error in response.get("errors") or []
+            if error.get("path")
+        }
+        index = 0
+        for manga, manga_variables, chapter_anilist in batch:
+            responses: list[Optional[dict]] = []
+            for _ in manga_variables:
+                alias = f"m{index}"
+                index += 1
+                if alias in failed_aliases or data.get(alias) is None:
+                    Logger.ERROR(f"Mutation {alias} for {manga.name} failed.")
+                    responses.append(None)
+                else:
+                    responses.append({"data": {"SaveMediaListEntry": data[alias]}})
+            self._report(manga, manga_variables, chapter_anilist, responses)
+
+    def _report(
+        self,
+        manga: object,
+        manga_variables: list[dict],
+        chapter_anilist: int,
+        responses: Optional[list] = None,
+    ) -> None:
+        """
+        Reports the result of the mutations of a manga and records them in the
+        journal if they were applied.
+
+        Parameters:
+            manga: The manga object the mutations belong to.
+            manga_variables (list): The variables of each mutation for the manga.
+            chapter_anilist (int): The current chapter of the manga from Anilist.
+            responses (list, optional): The response of each mutation, if they
+                were sent in a batch. Otherwise they are sent one by one.
+        """
+        with correlate(manga.name):
+            updated = update_manga_progress(
+                manga, self.app, manga_variables, chapter_anilist, responses
+            )
+        if updated is None or self.journal is None:
+            return
+        chapters = manga.last_chapter_read - (chapter_anilist or 0) if updated else 0
+        self.journal.record_mutation(manga.id, manga.name, manga_variables, chapters)
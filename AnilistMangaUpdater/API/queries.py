@@ -5,10 +5,15 @@ Queries:
     - VIEWER:
         Fetches the viewer's ID and name.
     - MANGALIST:
-        Fetches a chunk of the viewer's manga list,
-        including media ID, progress, and status.
+        Fetches a chunk of the viewer's manga list, including media ID, progress,
+        status, format, titles and synonyms, and whether another chunk follows.
     - FORMAT:
         Fetches the format of a specific media item by ID.
+    - FORMATS:
+        Fetches the format of up to 50 media items by ID in a single request.
+    - MANGA_SEARCH:
+        Searches for manga by title, including the titles, synonyms and site URL
+        of each result.
 """
 
 VIEWER: str = """
@@ -23,11 +28,20 @@ query {
 MANGALIST: str = """
 query ($userId: Int, $chunk: Int, $perChunk: Int) {
         MediaListCollection (userId: $userId, type: MANGA, chunk: $chunk, perChunk: $perChunk) {
+            hasNextChunk
             lists {
                 entries {
                     mediaId
                     progress
                     status
+                    media {
+                        format
+                        title {
+                            romaji
+                            english
+                        }
+                        synonyms
+                    }
                 }
             }
         }
@@ -42,3 +56,34 @@ query ($id: Int) {
         }
     }
 """
+
+FORMATS: str = """
+query ($ids: [Int], $perPage: Int) {
+        Page (page: 1, perPage: $perPage) {
+            media (id_in: $ids) {
+                id
+                format
+            }
+        }
+    }
+"""
+
+MANGA_SEARCH: str = """
+query ($query: String, $page: Int, $perPage: Int) {
+        Page (page: $page, perPage: $perPage) {
+            pageInfo {
+                currentPage
+                hasNextPage
+            }
+            media (search: $query, type: MANGA) {
+                id
+                title {
+                    romaji
+                    english
+                }
+                synonyms
+                siteUrl
+            }
+        }
+    }
+"""
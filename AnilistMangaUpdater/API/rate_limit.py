@@ -0,0 +1,216 @@
+"""
+This module contains the process-wide rate limiter for requests sent to Anilist.
+
+The limiter is a token bucket that is kept in sync with the X-RateLimit-Limit,
+X-RateLimit-Remaining, Retry-After and X-RateLimit-Reset headers of every response.
+Every request reserves a token before it is sent, so searches, format lookups and
+mutations share one budget and are spaced out evenly instead of running into the
+rate limit and stalling for a minute.
+"""
+
+# pylint: disable=C0103, W0603, E0401
+
+import threading
+import time
+from typing import Mapping, Union
+
+from Utils.log import Logger
+
+# Anilist allows 90 requests per minute, but the limit is read from the responses
+DEFAULT_LIMIT: int = 90
+DEFAULT_PERIOD: float = 60
+# Number of requests that can be sent back to back before pacing kicks in
+DEFAULT_BURST: int = 5
+# Time to wait after a 429 response that did not say how long to wait
+DEFAULT_RETRY_AFTER: float = 60
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket driven by the Anilist rate-limit headers.
+
+    Attributes:
+        limit (int): The number of requests allowed per period.
+        period (float): The length of the rate-limit window in seconds.
+        burst (int): The maximum number of tokens the bucket can hold.
+        tokens (float): The tokens available. Negative values are reserved debt.
+        blocked_until (float): Monotonic time before which no request may be sent.
+    """
+
+    def __init__(
+        self,
+        limit: int = DEFAULT_LIMIT,
+        period: float = DEFAULT_PERIOD,
+        burst: int = DEFAULT_BURST,
+    ) -> None:
+        self._lock = threading.Lock()
+        self.limit: int = limit
+        self.period: float = period
+        self.burst: int = burst
+        self.tokens: float = float(min(burst, limit))
+        self.updated: float = time.monotonic()
+        self.blocked_until: float = 0
+        self.requests: int = 0
+        self.waits: int = 0
+        self.time_waited: float = 0
+        self.rate_limited: int = 0
+
+    @property
+    def rate(self) -> float:
+        """
+        Gets the number of tokens added to the bucket per second.
+
+        Returns:
+            float: The refill rate.
+        """
+        return self.limit / self.period
+
+    def _refill(self, now: float) -> None:
+        """
+        Adds the tokens earned since the last refill. Must be called with the lock held.
+
+        Parameters:
+            now (float): The current monotonic time.
+        """
+        capacity = min(self.burst, self.limit)
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self) -> float:
+        """
+        Reserves a token for one request.
+
+        Returns:
+            float: The number of seconds to wait before sending the request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            self.requests += 1
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0
+            wait_time = max(wait_time, self.blocked_until - now)
+            if wait_time > 0:
+                self.waits += 1
+                self.time_waited += wait_time
+            return wait_time
+
+    def acquire(self) -> None:
+        """
+        Reserves a token and sleeps until the request may be sent.
+        """
+        wait_time = self.reserve()
+        if wait_time > 0:
+            Logger.DEBUG(f"Rate limiter delaying request by {wait_time:.2f} seconds.")
+            time.sleep(wait_time)
+
+    def update(self, headers: Mapping[str, str], status_code: int) -> None:
+        """
+        Updates the bucket from the rate-limit headers of a response.
+
+        Parameters:
+            headers (Mapping): The response headers.
+            status_code (int): The response status code.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            limit = _header_number(headers, "X-RateLimit-Limit")
+            if limit is not None and limit > 0 and int(limit) != self.limit:
+                Logger.INFO(f"Rate limit changed from {self.limit} to {int(limit)}.")
+                self.limit = int(limit)
+
+            remaining = _header_number(headers, "X-RateLimit-Remaining")
+            if remaining is not None:
+                self.tokens = min(self.tokens, remaining)
+
+            if status_code == 429:
+                self.rate_limited += 1
+                retry_after = _header_number(headers, "Retry-After")
+                reset = _header_number(headers, "X-RateLimit-Reset")
+                if retry_after is None and reset is not None:
+                    retry_after = reset - time.time()
+                if retry_after is None or retry_after <= 0:
+                    retry_after = DEFAULT_RETRY_AFTER
+                Logger.WARNING(f"Rate limit hit. Blocking for {retry_after} seconds.")
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+                self.tokens = min(self.tokens, 0)
+
+    def wait_time(self) -> float:
+        """
+        Gets the time left before the limiter lets requests through again.
+
+        Returns:
+            float: The number of seconds until the next request can be sent.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            wait_time = -self.tokens / self.rate if self.tokens < 0 else 0
+            return max(wait_time, self.blocked_until - now, 0)
+
+    def stats(self) -> dict[str, Union[int, float]]:
+        """
+        Gets a snapshot of the limiter counters.
+
+        Returns:
+            dict: The number of requests, delayed requests, seconds waited,
+            429 responses and the current limit.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "waits": self.waits,
+                "time_waited": round(self.time_waited, 3),
+                "rate_limited": self.rate_limited,
+                "limit": self.limit,
+            }
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Union[float, None]:
+    """
+    Reads a numeric header value.
+
+    Parameters:
+        headers (Mapping): The response headers.
+        name (str): The name of the header.
+
+    Returns:
+        float: The header value, or None if it is missing or not a number.
+    """
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+_rate_limiter: Union[RateLimiter, None] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Gets the process-wide rate limiter, creating it if needed.
+
+    Returns:
+        RateLimiter: The shared rate limiter.
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+        return _rate_limiter
+
+
+def Get_Rate_Limit_Stats() -> dict[str, Union[int, float]]:
+    """
+    Gets the counters of the process-wide rate limiter.
+
+    Returns:
+        dict: The rate limiter counters.
+    """
+    return get_rate_limiter().stats()
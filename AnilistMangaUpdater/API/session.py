@@ -0,0 +1,293 @@
+"""
+This module contains the shared HTTP session used for every request sent to Anilist.
+
+All GraphQL traffic (searches, format lookups, list fetches and mutations) goes
+through a single connection-pooled session so that the TCP connection and TLS
+handshake to graphql.anilist.co are reused instead of being redone for every request.
+The session also keeps counters of how many requests reused a pooled connection
+and how many had to open a new one.
+
+Every request also goes through the process-wide rate limiter, which paces the
+requests and is updated from the rate-limit headers of each response.
+
+The pool can be tuned with the optional configuration keys POOL_SIZE,
+CONNECT_TIMEOUT, READ_TIMEOUT and KEEP_ALIVE (see configure_session).
+"""
+
+# pylint: disable=C0103, W0603, E0401
+
+import threading
+from typing import Optional, Union
+
+import requests
+from API.rate_limit import get_rate_limiter
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPSConnectionPool
+from Utils.log import Logger
+
+# Define the API endpoint
+url = "https://graphql.anilist.co"
+
+# Define the default settings for the connection pool
+DEFAULT_POOL_SIZE: int = 10
+DEFAULT_CONNECT_TIMEOUT: float = 5
+DEFAULT_READ_TIMEOUT: float = 10
+DEFAULT_KEEP_ALIVE: bool = True
+
+
+class ConnectionStats:
+    """
+    Thread-safe counters for the requests sent through an AniListSession.
+
+    Attributes:
+        requests (int): The number of requests sent.
+        connections_opened (int): The number of new connections opened.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests: int = 0
+        self.connections_opened: int = 0
+
+    def record_request(self) -> None:
+        """
+        Records a request sent through the session.
+        """
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self) -> None:
+        """
+        Records a new connection being opened by the connection pool.
+        """
+        with self._lock:
+            self.connections_opened += 1
+
+    def as_dict(self) -> dict[str, int]:
+        """
+        Gets a snapshot of the counters.
+
+        Returns:
+            dict: The number of requests, new connections and reused connections.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": max(self.requests - self.connections_opened, 0),
+            }
+
+
+def _counting_pool_class(stats: ConnectionStats) -> type:
+    """
+    Creates an HTTPS connection pool class that records every new connection.
+
+    Parameters:
+        stats (ConnectionStats): The counters to record the new connections in.
+
+    Returns:
+        type: A subclass of HTTPSConnectionPool.
+    """
+
+    class CountingHTTPSConnection(HTTPSConnection):  # pylint: disable=R0903
+        """An HTTPS connection that records when it opens a new socket."""
+
+        def connect(self) -> None:
+            super().connect()
+            stats.record_connect()
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):  # pylint: disable=R0903
+        """An HTTPS connection pool using CountingHTTPSConnection."""
+
+        ConnectionCls = CountingHTTPSConnection
+
+    return CountingHTTPSConnectionPool
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """
+    An HTTPAdapter whose connection pools record every new connection they open.
+    """
+
+    def __init__(self, stats: ConnectionStats, **kwargs) -> None:
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        pool_classes = dict(self.poolmanager.pool_classes_by_scheme)
+        pool_classes["https"] = _counting_pool_class(self.stats)
+        self.poolmanager.pool_classes_by_scheme = pool_classes
+
+
+class AniListSession:
+    """
+    A connection-pooled, keep-alive HTTP session for the Anilist GraphQL endpoint.
+
+    Attributes:
+        session (requests.Session): The underlying requests session.
+        timeout (tuple): The connect and read timeouts in seconds.
+        stats (ConnectionStats): The request and connection counters.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        keep_alive: bool = DEFAULT_KEEP_ALIVE,
+    ) -> None:
+        """
+        Initializes the session and mounts the connection pool.
+
+        Parameters:
+            pool_size (int): The maximum number of connections kept in the pool.
+            connect_timeout (float): The timeout for opening a connection in seconds.
+            read_timeout (float): The timeout for reading a response in seconds.
+            keep_alive (bool): Whether connections are kept open between requests.
+        """
+        Logger.INFO(
+            f"Creating AniList session. Pool size: {pool_size}, "
+            f"timeouts: ({connect_timeout}, {read_timeout}), keep-alive: {keep_alive}"
+        )
+        self.stats = ConnectionStats()
+        self.timeout: tuple[float, float] = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        self.session.mount(
+            "https://",
+            CountingHTTPAdapter(
+                self.stats,
+                pool_connections=1,
+                pool_maxsize=pool_size,
+                pool_block=True,
+            ),
+        )
+        self.session.headers.update(
+            {"Content-Type": "application/json", "Accept": "application/json"}
+        )
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def post(
+        self,
+        json: dict,
+        headers: Optional[dict[str, str]] = None,
+        timeout: Optional[Union[float, tuple[float, float]]] = None,
+    ) -> requests.Response:
+        """
+        Sends a POST request to the Anilist GraphQL endpoint.
+
+        The request waits for the shared rate limiter before it is sent, and the
+        rate-limit headers of the response are fed back into the limiter.
+
+        Parameters:
+            json (dict): The JSON body of the request.
+            headers (dict, optional): Extra headers for this request.
+            timeout (float or tuple, optional): Overrides the session timeouts.
+
+        Returns:
+            requests.Response: The response from the API.
+        """
+        rate_limiter = get_rate_limiter()
+        rate_limiter.acquire()
+        self.stats.record_request()
+        response = self.session.post(
+            url,
+            json=json,
+            headers=headers,
+            timeout=timeout if timeout is not None else self.timeout,
+        )
+        rate_limiter.update(response.headers, response.status_code)
+        return response
+
+    def close(self) -> None:
+        """
+        Closes every connection in the pool.
+        """
+        self.session.close()
+
+
+_session: Union[AniListSession, None] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> AniListSession:
+    """
+    Gets the shared AniList session, creating it with the default settings if needed.
+
+    Returns:
+        AniListSession: The shared session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = AniListSession()
+        return _session
+
+
+def configure_session(
+    pool_size: Optional[int] = None,
+    connect_timeout: Optional[float] = None,
+    read_timeout: Optional[float] = None,
+    keep_alive: Optional[bool] = None,
+) -> AniListSession:
+    """
+    Replaces the shared AniList session with one using the given settings.
+
+    Settings left as None use their default value.
+
+    Parameters:
+        pool_size (int, optional): The maximum number of pooled connections.
+        connect_timeout (float, optional): The connect timeout in seconds.
+        read_timeout (float, optional): The read timeout in seconds.
+        keep_alive (bool, optional): Whether connections are kept open.
+
+    Returns:
+        AniListSession: The new shared session.
+    """
+    global _session
+    Logger.INFO("Function configure_session called.")
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = AniListSession(
+            pool_size=int(pool_size) if pool_size else DEFAULT_POOL_SIZE,
+            connect_timeout=(
+                float(connect_timeout) if connect_timeout else DEFAULT_CONNECT_TIMEOUT
+            ),
+            read_timeout=float(read_timeout) if read_timeout else DEFAULT_READ_TIMEOUT,
+            keep_alive=DEFAULT_KEEP_ALIVE if keep_alive is None else bool(keep_alive),
+        )
+        return _session
+
+
+def configure_session_from_config(config: dict) -> AniListSession:
+    """
+    Configures the shared AniList session from the optional configuration keys.
+
+    Parameters:
+        config (dict): The configuration dictionary.
+
+    Returns:
+        AniListSession: The new shared session.
+    """
+    keep_alive = config.get("KEEP_ALIVE")
+    if isinstance(keep_alive, str):
+        keep_alive = keep_alive.lower() not in ("no", "false", "0")
+    return configure_session(
+        pool_size=config.get("POOL_SIZE"),
+        connect_timeout=config.get("CONNECT_TIMEOUT"),
+        read_timeout=config.get("READ_TIMEOUT"),
+        keep_alive=keep_alive,
+    )
+
+
+def Get_Connection_Stats() -> dict[str, int]:
+    """
+    Gets the request and connection counters of the shared session.
+
+    Returns:
+        dict: The number of requests, new connections and reused connections.
+    """
+    return get_session().stats.as_dict()
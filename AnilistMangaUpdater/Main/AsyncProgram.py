@@ -0,0 +1,188 @@
+"""
+This module contains the AsyncProgram class, a variant of Program that keeps several
+manga in flight at once.
+
+Getting the IDs and formats of the manga and sending their updates are run with
+asyncio, with at most CONCURRENCY requests in flight under the shared rate limit.
+Every other step of the run is the same as in Program.
+"""
+
+# pylint: disable=C0103, E0401
+
+import asyncio
+import time
+from typing import Union
+
+from API.AccessAPI import MangaList
+from API.async_requests import DEFAULT_CONCURRENCY, AsyncGraphQLClient
+from Main.Program import Program
+from Utils.Config import load_config
+from Utils.log import Logger
+
+
+class AsyncProgram(Program):  # pylint: disable=R0903
+    """
+    Runs the whole update process, resolving and updating several manga at once.
+
+    Attributes:
+        concurrency (int): The maximum number of manga processed at once.
+    """
+
+    def __init__(self, app: object, concurrency: Union[int, None] = None) -> None:
+        """
+        Initializes the AsyncProgram class. This goes through the entire process of the script.
+
+        Args:
+            app: The gui object.
+            concurrency: The maximum number of manga processed at once. Read from the
+                CONCURRENCY configuration key if not given.
+        """
+        if concurrency is None:
+            config = load_config("config.json") or {}
+            concurrency = int(config.get("CONCURRENCY") or DEFAULT_CONCURRENCY)
+        self.concurrency: int = max(concurrency, 1)
+        Logger.INFO(f"Running with a concurrency of {self.concurrency}.")
+        super().__init__(app)
+
+    def get_manga_ids(self, manga_names: dict) -> dict:
+        """
+        Gets the IDs of every manga, keeping several searches in flight at once.
+
+        Args:
+            manga_names: A dictionary mapping manga names to their details from the CSV file.
+
+        Returns:
+            dict: A dictionary mapping manga names to lists of ID information tuples,
+            in the same order as the CSV file.
+        """
+        return asyncio.run(self._get_manga_ids(manga_names))
+
+    async def _get_manga_ids(self, manga_names: dict) -> dict:
+        """
+        Gets the IDs of every manga concurrently.
+
+        Args:
+            manga_names: A dictionary mapping manga names to their details from the CSV file.
+
+        Returns:
+            dict: A dictionary mapping manga names to lists of ID information tuples.
+        """
+        client = AsyncGraphQLClient(self.concurrency)
+        total_ids = len(manga_names)
+        processed_ids = 0
+        # Time between two manga finishing, which reflects the overall throughput
+        times_ids: list = []
+        last_finished = time.time()
+
+        async def search(manga_name: str, manga_info: dict) -> tuple:
+            nonlocal processed_ids, last_finished
+            result = await client.run(self.search_manga_ids, manga_name, manga_info)
+            processed_ids += 1
+            finished = time.time()
+            times_ids.append(finished - last_finished)
+            last_finished = finished
+            self.app.update_progress_and_status(
+                f"Got ID for {manga_name}...",
+                (self.current_step + ((processed_ids / total_ids) * 3))
+                / self.total_steps,
+            )
+            self.update_ids_estimate(times_ids, total_ids - processed_ids)
+            return result
+
+        try:
+            searched_manga = await asyncio.gather(
+                *(
+                    search(manga_name, manga_info)
+                    for manga_name, manga_info in manga_names.items()
+                )
+            )
+        finally:
+            client.close()
+
+        return await asyncio.to_thread(self.assemble_manga_ids, list(searched_manga))
+
+    def update_manga_list(
+        self,
+        manga_names_ids: dict,
+        manga_list: MangaList,
+        months: str,
+        private: str,
+    ) -> list:
+        """
+        Updates every manga on the user's list, keeping several updates in flight at once.
+
+        Args:
+            manga_names_ids: A dictionary mapping manga names to lists of ID information.
+            manga_list: The user's manga list from AniList.
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entries are private.
+
+        Returns:
+            list: The IDs of the manga that were skipped because they did not change.
+        """
+        return asyncio.run(
+            self._update_manga_list(manga_names_ids, manga_list, months, private)
+        )
+
+    async def _update_manga_list(
+        self,
+        manga_names_ids: dict,
+        manga_list: MangaList,
+        months: str,
+        private: str,
+    ) -> list:
+        """
+        Updates every manga on the user's list concurrently.
+
+        Args:
+            manga_names_ids: A dictionary mapping manga names to lists of ID information.
+            manga_list: The user's manga list from AniList.
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entries are private.
+
+        Returns:
+            list: The IDs of the manga that were skipped because they did not change.
+        """
+        client = AsyncGraphQLClient(self.concurrency)
+        total_updates = sum(len(info_list) for info_list in manga_names_ids.values())
+        processed_updates = 0
+        times_updates: list = []
+        last_finished = time.time()
+
+        async def update(manga_name: str, manga_info: tuple) -> bool:
+            nonlocal processed_updates, last_finished
+            updated = await client.run(
+                self.update_entry, manga_name, manga_info, manga_list, months, private
+            )
+            if updated:
+                processed_updates += 1
+                finished = time.time()
+                times_updates.append(finished - last_finished)
+                last_finished = finished
+                self.update_updates_estimate(
+                    manga_name, times_updates, processed_updates, total_updates
+                )
+            return updated
+
+        entries = [
+            (manga_name, manga_info)
+            for manga_name, manga_info_list in manga_names_ids.items()
+            for manga_info in manga_info_list
+        ]
+        try:
+            results = await asyncio.gather(
+                *(update(manga_name, manga_info) for manga_name, manga_info in entries)
+            )
+        finally:
+            client.close()
+
+        # Send the mutations still waiting for a full batch
+        await asyncio.to_thread(self.mutation_batcher.flush)
+
+        skipped_ids = [
+            manga_info[0]
+            for (_, manga_info), updated in zip(entries, results)
+            if not updated
+        ]
+        Logger.DEBUG(f"Skipped IDs: {skipped_ids}")
+        return skipped_ids
@@ -22,13 +22,14 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 from API.APIRequests import Set_Access_Token  # noqa: E402
 from API.GetAccessToken import Get_Access_Token  # noqa: E402
+from Utils.cache import close_caches  # noqa: E402
 from Utils.Config import (  # noqa: E402
     Get_Config,
     create_config,
     load_config,
     save_config,
 )
-from Utils.GetFromFile import alternative_titles_dict  # noqa: E402
+from Utils.dictionaries import alternative_titles_dict  # noqa: E402
 from Utils.log import Logger  # noqa: E402
 from Utils.WriteToFile import (  # noqa: E402
     Get_Alt_Titles_From_File,
@@ -777,8 +778,11 @@ class SettingsPopup(customtkinter.CTkToplevel):
             Logger.ERROR("Number of Months is not a digit.")
             return
 
-        # Create/update config
+        # Create/update config, keeping optional keys such as the pool settings
+        existing_config = config or {}
         config = create_config(client_id, secret_id)
+        for key, value in existing_config.items():
+            config.setdefault(key, value)
         config["ACCESS_TOKEN"] = access_token
         if months:
             config["MONTHS"] = months
@@ -907,6 +911,8 @@ class App(customtkinter.CTk):  # pylint: disable=C0115, R0902
         if program_thread and program_thread.is_alive():
             Logger.INFO("Stopping program thread before closing.")
             program_thread.join()
+        # Save and close the caches shared by the runs
+        close_caches()
         self.destroy()
         Logger.INFO("Application closed.")
 
@@ -942,11 +948,28 @@ class App(customtkinter.CTk):  # pylint: disable=C0115, R0902
 
         # Import the AnilistMangaUpdater class
         Logger.INFO("Importing the AnilistMangaUpdater class.")
+        from Main.AsyncProgram import AsyncProgram  # pylint: disable=C0415, E0611
+        from Main.PipelineProgram import (  # pylint: disable=C0415, E0611
+            PipelineProgram,
+        )
         from Main.Program import Program  # pylint: disable=C0415, E0611
 
+        # Run the manga through the staged pipeline if it is enabled, or process
+        # several manga at once if a concurrency is configured
+        config: dict = load_config(config_path) or {}
+        concurrency = int(config.get("CONCURRENCY") or 1)
+        program_class: type[Program]
+        if config.get("PIPELINE"):
+            program_class = PipelineProgram
+        elif concurrency > 1:
+            program_class = AsyncProgram
+        else:
+            program_class = Program
+        Logger.INFO(f"Using {program_class.__name__} with concurrency {concurrency}.")
+
         # Create a new thread for the program
         Logger.INFO("Creating a new thread for the program.")
-        program_thread = threading.Thread(target=Program, args=(self,))
+        program_thread = threading.Thread(target=program_class, args=(self,))
 
         # Start the program thread
         Logger.INFO("Starting the program thread.")
@@ -1097,7 +1120,7 @@ class App(customtkinter.CTk):  # pylint: disable=C0115, R0902
             None
         """
         Logger.INFO("Starting to manage alternative titles.")
-        alt_titles_dict = Get_Alt_Titles_From_File(alternative_titles_dict)
+        alt_titles_dict = Get_Alt_Titles_From_File(alternative_titles_dict())
         Logger.INFO("Retrieved alternative titles from file.")
         action = self.get_action()
         if action is None:
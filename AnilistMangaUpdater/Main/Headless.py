@@ -0,0 +1,283 @@
+"""
+This module runs the update process without the GUI, for scheduled runs on
+machines without a display (for example from cron on a Linux server).
+
+HeadlessApp has the attributes and reporting methods Program uses on the GUI, so
+Program, AsyncProgram and PipelineProgram run unchanged. Instead of updating the
+window, the terminal messages and the progress are printed to stdout, as plain
+text or, with --json, as one JSON object per line. The log messages are only
+written to the log files so they do not mix with the output.
+
+Nothing in this module imports tkinter, customtkinter or PIL.
+
+Usage:
+    python AnilistMangaUpdater/Main/Headless.py kenmei.csv
+        [--previous previous.csv] [--concurrency 8] [--cache-dir Manga_Data]
+        [--pipeline] [--json]
+
+With --plan, the mutations are written to a plan file instead of being sent
+(see PlanProgram), and with --apply the mutations of a plan file are sent:
+
+    python AnilistMangaUpdater/Main/Headless.py kenmei.csv --plan plan.json
+    python AnilistMangaUpdater/Main/Headless.py --apply plan.json
+
+The exit status is 0 if the run finished and 1 if it stopped early, for example
+because the access token needs to be refreshed.
+"""
+
+# pylint: disable=C0103, E0401, C0413
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import threading
+import time
+from typing import Optional, Union
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from Main.AsyncProgram import AsyncProgram  # noqa: E402
+from Main.PipelineProgram import PipelineProgram  # noqa: E402
+from Main.PlanProgram import (  # noqa: E402
+    DEFAULT_PLAN_FILE,
+    PlanProgram,
+    apply_mutation_plan,
+)
+from Main.Program import Program  # noqa: E402
+from Utils.cache import close_caches, set_cache_directory  # noqa: E402
+from Utils.Config import load_config  # noqa: E402
+from Utils.log import Logger  # noqa: E402
+
+# Define the path for the configuration file
+config_path: str = "config.json"
+
+
+class HeadlessApp:
+    """
+    Reports the progress of a run to stdout, in place of the GUI.
+
+    Attributes:
+        file_path (str): The path to the Kenmei export file.
+        previous_file_path (str): The path to the previous Kenmei export file, or "".
+        json_output (bool): Whether the output is written as JSON lines.
+        progress (float): The last progress reported, between 0 and 1.
+        status (str): The last status reported.
+        estimated_time_remaining (float): The last estimate of the seconds left.
+    """
+
+    def __init__(
+        self, file_path: str, previous_file_path: str = "", json_output: bool = False
+    ) -> None:
+        self.file_path: str = file_path
+        self.previous_file_path: str = previous_file_path
+        self.json_output: bool = json_output
+        self.progress: float = 0
+        self.status: str = "Waiting..."
+        self.estimated_time_remaining: float = 0
+        self._lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        """
+        Whether the run reached the end of the script.
+        """
+        return self.progress >= 1.0
+
+    def write(self, event: str, message: str, **fields) -> None:
+        """
+        Writes a line to stdout.
+
+        Parameters:
+            event (str): The kind of line (terminal, progress or estimate).
+            message (str): The line printed in plain text mode.
+            **fields: The fields of the JSON object in JSON mode.
+        """
+        if self.json_output:
+            line = json.dumps(
+                {"time": round(time.time(), 3), "event": event, **fields},
+                ensure_ascii=False,
+            )
+        else:
+            line = message
+        # Several workers report at once, so each line is written whole
+        with self._lock:
+            sys.stdout.write(f"{line}\n")
+            sys.stdout.flush()
+
+    def update_terminal(self, text: str) -> None:
+        """
+        Prints a message that the GUI shows in its terminal.
+
+        Parameters:
+            text (str): The message.
+        """
+        self.write("terminal", text, text=text.strip("\n"))
+
+    def update_progress_and_status(
+        self, status: str, program_progress: Optional[float] = None
+    ) -> None:
+        """
+        Prints the progress and status of the program.
+
+        Parameters:
+            status (str): The new status of the program.
+            program_progress (float, optional): The new progress value. Keeps the
+                last progress if not provided.
+        """
+        if program_progress is not None:
+            self.progress = program_progress
+        self.status = status
+        remaining = (
+            f" ({datetime.timedelta(seconds=int(self.estimated_time_remaining))} left)"
+            if self.estimated_time_remaining > 0
+            else ""
+        )
+        self.write(
+            "progress",
+            f"[{self.progress:6.1%}] {status}{remaining}",
+            progress=round(self.progress, 4),
+            status=status,
+        )
+
+    def update_estimated_time_remaining(
+        self,
+        new_estimated_time_remaining: Optional[float] = None,
+        add_time: Optional[float] = None,
+    ) -> None:
+        """
+        Records the estimated time remaining, which is printed with the progress.
+
+        Parameters:
+            new_estimated_time_remaining (float, optional): The new estimated time
+                remaining in seconds.
+            add_time (float, optional): The time to add to the estimated time
+                remaining in seconds.
+        """
+        if new_estimated_time_remaining is not None:
+            self.estimated_time_remaining = new_estimated_time_remaining
+        if add_time is not None:
+            self.estimated_time_remaining += add_time
+        self.estimated_time_remaining = max(self.estimated_time_remaining, 0)
+        if self.json_output:
+            self.write("estimate", "", seconds=round(self.estimated_time_remaining, 3))
+
+    def update_idletasks(self) -> None:
+        """
+        Does nothing, there is no window to redraw.
+        """
+
+
+def parse_arguments(arguments: Optional[list[str]] = None) -> argparse.Namespace:
+    """
+    Parses the command-line arguments.
+
+    Parameters:
+        arguments (list, optional): The arguments, sys.argv[1:] if not given.
+
+    Returns:
+        Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Update an Anilist manga list from a Kenmei export without the GUI."
+    )
+    parser.add_argument(
+        "file_path",
+        nargs="?",
+        default="",
+        help="The path to the Kenmei export file. Not needed with --apply.",
+    )
+    parser.add_argument(
+        "--previous",
+        default="",
+        help="The path to the previous Kenmei export file, to only update the "
+        "manga that changed since.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="The number of manga processed at once. Read from the CONCURRENCY "
+        "configuration key if not given.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="The directory of the caches and the title index (Manga_Data by default).",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Run the manga through the staged pipeline, as the PIPELINE "
+        "configuration key does.",
+    )
+    parser.add_argument(
+        "--plan",
+        nargs="?",
+        const=DEFAULT_PLAN_FILE,
+        help="Write the mutations to a plan file instead of sending them "
+        f"({DEFAULT_PLAN_FILE} by default).",
+    )
+    parser.add_argument(
+        "--apply",
+        nargs="?",
+        const=DEFAULT_PLAN_FILE,
+        help="Send the mutations of a plan file instead of reading an export "
+        f"({DEFAULT_PLAN_FILE} by default).",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Write the output as JSON lines instead of plain text.",
+    )
+    args = parser.parse_args(arguments)
+    if args.plan and args.apply:
+        parser.error("--plan and --apply cannot be used together")
+    if not args.apply and not args.file_path:
+        parser.error("the path to the Kenmei export file is required")
+    return args
+
+
+def run(arguments: Optional[list[str]] = None) -> int:
+    """
+    Runs the update process with the command-line arguments.
+
+    Parameters:
+        arguments (list, optional): The arguments, sys.argv[1:] if not given.
+
+    Returns:
+        int: The exit status, 0 if the run finished.
+    """
+    args = parse_arguments(arguments)
+    Logger.disable_console_log()
+    Logger.INFO(f"Starting a headless run with arguments: {vars(args)}")
+
+    # Move the caches before the program opens them
+    if args.cache_dir:
+        os.makedirs(args.cache_dir, exist_ok=True)
+        set_cache_directory(args.cache_dir)
+
+    app = HeadlessApp(args.file_path, args.previous, args.json)
+
+    # Pick the program the same way as the GUI does
+    config = load_config(config_path) or {}
+    concurrency: Union[int, None] = args.concurrency
+    try:
+        if args.apply:
+            apply_mutation_plan(app, args.apply, concurrency)
+        elif args.plan:
+            PlanProgram(app, args.plan, concurrency)
+        elif args.pipeline or config.get("PIPELINE"):
+            PipelineProgram(app, concurrency)
+        elif (concurrency or int(config.get("CONCURRENCY") or 1)) > 1:
+            AsyncProgram(app, concurrency)
+        else:
+            Program(app)
+    finally:
+        close_caches()
+
+    Logger.INFO(f"Headless run ended with status: {app.status}")
+    return 0 if app.finished else 1
+
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,263 @@
+"""
+This module contains the PipelineProgram class, a variant of Program that runs the
+manga through a staged pipeline.
+
+Instead of getting the IDs of every manga before updating any of them, each manga
+goes through these stages as soon as the previous one is done with it:
+
+    resolve: search for the IDs of the manga (MangaSearch)
+    classify: fetch the formats of the IDs in batches, leave out novels and manga
+        with more than one ID. The rows of the CSV file whose names are the same
+        once processed are held back until all of them are classified, and their
+        IDs are checked together, as Clean_Manga_IDs does for Program
+    diff: compare the manga with its entry on the user's list
+    mutate: queue the update of the entry with the mutation batcher
+
+The manga parsed from the CSV file are fed to the first stage. The stages are
+connected by bounded queues and each has its own number of workers, so updates
+are sent while later manga are still being searched and the network is kept busy
+for the whole run. The number of workers of each stage can be set with the
+optional STAGE_WORKERS configuration key (for example {"resolve": 8}), which
+defaults to CONCURRENCY workers for resolve, and the size of the queues with
+PIPELINE_QUEUE_SIZE. The metrics of each stage are printed at the end of the run.
+"""
+
+# pylint: disable=C0103, E0401
+
+import threading
+import time
+from collections import Counter
+from typing import Iterator, Union
+
+from API.AccessAPI import FORMAT_BATCH_SIZE, MangaList
+from API.async_requests import DEFAULT_CONCURRENCY
+from Main.Program import Program
+from Manga.GetID import Clean_Manga_IDs, Get_Unique_IDs
+from Utils.Config import load_config
+from Utils.log import Logger, correlate
+from Utils.pipeline import DEFAULT_QUEUE_SIZE, Pipeline, Stage
+
+# Default number of workers of each stage, resolve defaults to CONCURRENCY
+DEFAULT_STAGE_WORKERS: dict[str, int] = {
+    "resolve": DEFAULT_CONCURRENCY,
+    "classify": 1,
+    "diff": 1,
+    "mutate": 2,
+}
+
+
+class PipelineProgram(Program):  # pylint: disable=R0903
+    """
+    Runs the whole update process, passing each manga through the stages of a
+    pipeline as soon as it is ready.
+
+    Attributes:
+        stage_workers (dict): The number of workers of each stage.
+        queue_size (int): The most manga waiting in front of each stage.
+    """
+
+    # The pipeline needs the manga from the CSV file and the user's list until
+    # it finished
+    ids_stage: str = "pipeline"
+    updates_stage: str = "pipeline"
+
+    def __init__(self, app: object, concurrency: Union[int, None] = None) -> None:
+        """
+        Initializes the PipelineProgram class. This goes through the entire process of the script.
+
+        Args:
+            app: The gui object.
+            concurrency: The number of workers of the resolve stage. Read from the
+                CONCURRENCY configuration key if not given.
+        """
+        config: dict = load_config("config.json") or {}
+        self.stage_workers: dict[str, int] = dict(DEFAULT_STAGE_WORKERS)
+        if concurrency is None and config.get("CONCURRENCY"):
+            concurrency = int(config["CONCURRENCY"])
+        if concurrency is not None:
+            self.stage_workers["resolve"] = max(concurrency, 1)
+        self.stage_workers.update(
+            {
+                name: int(workers)
+                for name, workers in (config.get("STAGE_WORKERS") or {}).items()
+                if name in DEFAULT_STAGE_WORKERS
+            }
+        )
+        self.queue_size: int = int(
+            config.get("PIPELINE_QUEUE_SIZE") or DEFAULT_QUEUE_SIZE
+        )
+        Logger.INFO(
+            f"Running a pipeline with stage workers: {self.stage_workers}, "
+            f"queue size: {self.queue_size}."
+        )
+        self._lock = threading.Lock()
+        super().__init__(app)
+
+    def process_manga(  # pylint: disable=R0913, R0914
+        self,
+        manga_names: dict,
+        manga_list: MangaList,
+        months: str,
+        private: str,
+        start_time: float,
+    ) -> tuple[float, float]:
+        """
+        Gets the IDs of the manga and updates them on the user's list in a pipeline.
+
+        Args:
+            manga_names: A dictionary mapping manga names to their details from the CSV file.
+            manga_list: The user's manga list from AniList.
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entries are private.
+            start_time: The time the run started getting the manga data.
+
+        Returns:
+            tuple: The time taken to get and update the manga data and the time
+            the pipeline finished.
+        """
+        if self.updates_stage in self.journal.stages:
+            self.current_step += 6
+            self.app.update_terminal(
+                "Every manga was updated before the run was resumed."
+            )
+            return self.print_time_taken(start_time, "resume the run"), time.time()
+
+        total_ids = len(manga_names)
+        processed_ids = 0
+        times_ids: list = []
+        last_finished = time.time()
+        # The ID information of each manga by its position in the CSV file, and
+        # the IDs of the entries that did not change
+        id_infos_by_position: dict[int, tuple[str, list]] = {}
+        skipped_ids: list = []
+        # The rows of each processed manga name still to be classified, and the
+        # ID information of the rows already classified
+        rows_left: Counter = Counter(
+            self.process_manga_name(manga_name) for manga_name in manga_names
+        )
+        pending_id_infos: dict[str, list] = {}
+
+        def resolve(item: tuple) -> Iterator[tuple]:
+            nonlocal processed_ids, last_finished
+            position, manga_name, manga_info = item
+            result = self.search_manga_ids(manga_name, manga_info)
+            with self._lock:
+                processed_ids += 1
+                finished = time.time()
+                times_ids.append(finished - last_finished)
+                last_finished = finished
+                self.app.update_progress_and_status(
+                    f"Got ID for {manga_name}...",
+                    (self.current_step + ((processed_ids / total_ids) * 6))
+                    / self.total_steps,
+                )
+                self.update_ids_estimate(times_ids, total_ids - processed_ids)
+            yield (position, *result)
+
+        def classify(batch: list[tuple]) -> Iterator[tuple]:
+            # Fetch the formats of the whole batch in as few requests as possible
+            self.prefetch_formats(
+                [manga_id for _, _, _, manga_ids in batch for manga_id in manga_ids]
+            )
+            for position, manga_name, manga_info, manga_ids in batch:
+                with correlate(manga_name):
+                    id_infos = self.get_id_infos(manga_info, manga_ids)
+                with self._lock:
+                    if id_infos is not None:
+                        id_infos_by_position[position] = (manga_name, id_infos)
+                        pending_id_infos.setdefault(manga_name, []).extend(id_infos)
+                    rows_left[manga_name] -= 1
+                    if rows_left[manga_name] > 0:
+                        # Wait for the other rows with the same name
+                        continue
+                    name_id_infos = pending_id_infos.pop(manga_name, None)
+                if name_id_infos is None:
+                    continue
+                # Manga with more than one ID are reported and not updated
+                unique_ids = Get_Unique_IDs(name_id_infos)
+                if len(unique_ids) == 1:
+                    yield manga_name, unique_ids[0]
+
+        def diff(item: tuple) -> Iterator[tuple]:
+            manga_name, manga_info = item
+            with correlate(manga_name):
+                change = self.diff_entry(
+                    manga_name, manga_info, manga_list, months, private
+                )
+            if change is None:
+                with self._lock:
+                    skipped_ids.append(manga_info[0])
+                return
+            yield change
+
+        def mutate(change: tuple) -> Iterator[int]:
+            with correlate(change[0].name):
+                self.mutate_entry(*change)
+            yield change[0].id
+
+        pipeline = Pipeline(
+            [
+                Stage("resolve", resolve, self.stage_workers["resolve"]),
+                Stage(
+                    "classify",
+                    classify,
+                    self.stage_workers["classify"],
+                    batch_size=FORMAT_BATCH_SIZE,
+                ),
+                Stage("diff", diff, self.stage_workers["diff"]),
+                Stage("mutate", mutate, self.stage_workers["mutate"]),
+            ],
+            self.queue_size,
+        )
+        try:
+            pipeline.run(
+                (position, manga_name, manga_info)
+                for position, (manga_name, manga_info) in enumerate(manga_names.items())
+            )
+        finally:
+            # Send the mutations still waiting for a full batch
+            self.mutation_batcher.flush()
+            self.title_index.save()
+
+        self.current_step += 6
+        self.app.update_progress_and_status(
+            "Cleaning manga IDs...", self.current_step / self.total_steps
+        )
+
+        # Report the IDs of the manga in the order of the CSV file
+        manga_names_ids: dict = {}
+        for position in sorted(id_infos_by_position):
+            manga_name, id_infos = id_infos_by_position[position]
+            manga_names_ids.setdefault(manga_name, []).extend(id_infos)
+        self.report_manga_ids(Clean_Manga_IDs(manga_names_ids, self.app))
+        self.report_skipped_ids(skipped_ids)
+        self.report_stage_metrics(pipeline)
+        self.journal.record_stage(self.updates_stage)
+
+        manga_data_time_taken: float = self.print_time_taken(
+            start_time, "get and update Manga data"
+        )
+        return manga_data_time_taken, time.time()
+
+    def report_stage_metrics(self, pipeline: Pipeline) -> None:
+        """
+        Prints the metrics of each stage of the pipeline.
+
+        Args:
+            pipeline: The pipeline that was run.
+        """
+        for metrics in pipeline.metrics:
+            stats = metrics.as_dict()
+            Logger.INFO(f"Stage metrics: {stats}")
+            first_output = (
+                f"{stats['first_output']}s"
+                if stats["first_output"] is not None
+                else "-"
+            )
+            self.app.update_terminal(
+                f"Stage {stats['name']} ({stats['workers']} workers): "
+                f"{stats['items_in']} in, {stats['items_out']} out, "
+                f"{stats['errors']} errors, busy {stats['busy_time']}s, "
+                f"waited {stats['wait_time']}s, blocked {stats['blocked_time']}s, "
+                f"max backlog {stats['max_backlog']}, first out after {first_output}"
+            )
@@ -0,0 +1,364 @@
+"""
+This module contains the PlanProgram class, which works out every mutation of a run
+without sending any of them, and apply_mutation_plan, which sends the mutations of
+such a plan in bulk.
+
+Planning goes through the same steps as AsyncProgram: the manga are read from the
+CSV file, their IDs are found (mostly from the title cache and the title index)
+and compared with a single snapshot of the user's list. Instead of being sent,
+the variables of every SaveMediaListEntry mutation are written to a plan file,
+Manga_Data/mutation_plan.json by default, together with the progress and status
+each entry had on AniList. The plan can be reviewed before anything is changed.
+
+apply_mutation_plan then reads a plan and fetches the user's list again. The
+entries whose progress or status changed since the plan was made are skipped,
+so a plan is never applied over newer changes, and the entries that already
+have the state the plan brings them to are skipped as well. The mutations
+of every other manga are queued in the MutationBatcher from several threads, so
+several aliased batches are in flight at once. The mutations of one manga are
+kept in order in the same batch, and the terminal messages and chapters updated
+are reported as in a normal run. The applied mutations are recorded in a run
+journal of the plan file, so an apply that stopped halfway resumes where it
+stopped.
+"""
+
+# pylint: disable=C0103, E0401
+
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+from API.AccessAPI import Get_User_Manga_List, Manga, MangaList
+from API.APIRequests import Set_Access_Token, needs_refresh
+from API.async_requests import DEFAULT_CONCURRENCY
+from API.mutation_batcher import DEFAULT_MUTATION_BATCH_SIZE, MutationBatcher
+from API.session import configure_session_from_config
+from API.UpdateManga import (
+    Get_Chapters_Updated,
+    Set_Chapters_Updated,
+    plan_manga_update,
+)
+from Main.AsyncProgram import AsyncProgram
+from Utils.Config import Get_Config, load_config
+from Utils.log import RUN_ID, Logger, configure_logging_from_config
+from Utils.run_journal import RunJournal, input_fingerprint, open_run_journal
+from Utils.WriteToFile import (
+    read_mutation_plan_from_file,
+    write_chapters_updated_to_file,
+    write_mutation_plan_to_file,
+)
+
+# Define the version of the plan files and where they are written by default
+PLAN_VERSION: int = 1
+DEFAULT_PLAN_FILE: str = "Manga_Data/mutation_plan.json"
+
+
+class PlanProgram(AsyncProgram):  # pylint: disable=R0903
+    """
+    Runs the whole update process, but writes the mutations to a plan file instead
+    of sending them.
+
+    Attributes:
+        plan_file (str): The path of the plan file.
+        plan_entries (list): The planned mutations of each manga.
+    """
+
+    def __init__(
+        self,
+        app: object,
+        plan_file: str = DEFAULT_PLAN_FILE,
+        concurrency: Union[int, None] = None,
+    ) -> None:
+        """
+        Initializes the PlanProgram class. This goes through the entire process of the script.
+
+        Args:
+            app: The gui object.
+            plan_file: The path of the plan file to write.
+            concurrency: The maximum number of manga processed at once. Read from the
+                CONCURRENCY configuration key if not given.
+        """
+        self.plan_file: str = plan_file
+        self.plan_entries: list[dict] = []
+        self._plan_lock = threading.Lock()
+        self._settings: tuple[str, str] = ("", "")
+        super().__init__(app, concurrency)
+
+    def open_journal(self, months: str, private: str) -> RunJournal:
+        """
+        Opens the journal of the planning run. Planning never applies mutations,
+        so it keeps a journal apart from the runs that do.
+
+        Args:
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entries are private.
+
+        Returns:
+            RunJournal: The journal of the planning run.
+        """
+        self._settings = (months, private)
+        return open_run_journal(
+            input_fingerprint(
+                [self.app.file_path, self.app.previous_file_path],
+                months,
+                private,
+                "plan",
+            )
+        )
+
+    def mutate_entry(
+        self, manga: Manga, chapter_anilist: int, status_anilist: Union[str, None]
+    ) -> None:
+        """
+        Adds the mutations that update a single manga to the plan.
+
+        Args:
+            manga: The manga to update.
+            chapter_anilist: The progress of the manga on AniList.
+            status_anilist: The status of the manga on AniList, or None if it is
+                not on the user's list.
+        """
+        variables_list = plan_manga_update(manga, chapter_anilist, status_anilist)
+        if not variables_list:
+            return
+        with self._plan_lock:
+            self.plan_entries.append(
+                {
+                    "title": manga.name,
+                    "id": manga.id,
+                    "chapter_anilist": chapter_anilist,
+                    "status_anilist": status_anilist,
+                    "last_chapter_read": manga.last_chapter_read,
+                    "status": manga.status,
+                    "variables": variables_list,
+                }
+            )
+        Logger.DEBUG(f"Planned {len(variables_list)} mutations for {manga.name}.")
+
+    def report_chapters_updated(self) -> None:
+        """
+        Writes the plan file and prints how many mutations and chapters it holds.
+        """
+        months, private = self._settings
+        entries = sorted(self.plan_entries, key=lambda entry: entry["id"])
+        mutations = sum(len(entry["variables"]) for entry in entries)
+        # Count the chapters the same way update_manga_progress does
+        chapters = sum(
+            entry["last_chapter_read"] - (entry["chapter_anilist"] or 0)
+            for entry in entries
+            if entry["last_chapter_read"] is not None
+            and (
+                entry["chapter_anilist"] is None
+                or entry["last_chapter_read"] > entry["chapter_anilist"]
+            )
+        )
+        write_mutation_plan_to_file(
+            {
+                "version": PLAN_VERSION,
+                "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+                "run_id": RUN_ID,
+                "file_path": self.app.file_path,
+                "previous_file_path": self.app.previous_file_path,
+                "months": months,
+                "private": private,
+                "mutations": mutations,
+                "chapters": chapters,
+                "entries": entries,
+            },
+            self.plan_file,
+        )
+        Logger.INFO(
+            f"Planned {mutations} mutations for {len(entries)} manga, "
+            f"updating {chapters} chapters."
+        )
+        self.app.update_terminal(
+            f"\nPlanned {mutations} mutations for {len(entries)} manga, updating "
+            f"{chapters} chapters. The plan was written to {self.plan_file}"
+        )
+
+
+def apply_mutation_plan(  # pylint: disable=R0911
+    app: object,
+    plan_file: str = DEFAULT_PLAN_FILE,
+    concurrency: Union[int, None] = None,
+) -> bool:
+    """
+    Sends the mutations of a plan written by PlanProgram.
+
+    Args:
+        app: The gui object.
+        plan_file: The path of the plan file to apply.
+        concurrency: The maximum number of batches sent at once. Read from the
+            CONCURRENCY configuration key if not given.
+
+    Returns:
+        bool: True if every mutation of the plan was sent.
+    """
+    app.update_progress_and_status("Loading configuration...", 0.05)
+    config: Union[dict, None] = load_config("config.json")
+    if config is None:
+        Get_Config(app)
+        Logger.WARNING("Config is None. Called Get_Config.")
+        return False
+    configure_logging_from_config(config)
+    configure_session_from_config(config)
+
+    # Set the access token and check if it needs to be refreshed
+    if Set_Access_Token(app) is False:
+        return False
+    if needs_refresh(app):
+        app.update_terminal("Access Token needs to be refreshed")
+        app.update_progress_and_status("Token needs to be refreshed...", 0)
+        Logger.WARNING("Access token needs to be refreshed.")
+        return False
+
+    app.update_progress_and_status("Reading the mutation plan...", 0.05)
+    try:
+        plan = read_mutation_plan_from_file(plan_file)
+    except (OSError, ValueError) as e:
+        Logger.ERROR(f"Could not read the mutation plan {plan_file}: {e}")
+        app.update_terminal(f"Error: Could not read the mutation plan {plan_file}")
+        return False
+    if plan.get("version") != PLAN_VERSION:
+        Logger.ERROR(f"Unknown mutation plan version: {plan.get('version')}")
+        app.update_terminal(f"Error: {plan_file} is not a supported mutation plan")
+        return False
+
+    if concurrency is None:
+        concurrency = int(config.get("CONCURRENCY") or DEFAULT_CONCURRENCY)
+    entries: list[dict] = plan["entries"]
+    Logger.INFO(
+        f"Applying {plan['mutations']} mutations for {len(entries)} manga from "
+        f"{plan_file}, planned at {plan['created_at']}, with a concurrency of "
+        f"{concurrency}."
+    )
+    app.update_terminal(
+        f"Applying {plan['mutations']} mutations for {len(entries)} manga "
+        f"planned at {plan['created_at']}"
+    )
+
+    # Open the journal of the plan, resuming an apply of it that stopped
+    journal = open_run_journal(input_fingerprint([plan_file], "apply"))
+    if journal.resumed:
+        app.update_terminal(
+            f"Resuming the previous apply: {len(journal.mutations)} manga updated "
+            "already."
+        )
+
+    # Only apply the entries that are still as they were when the plan was made
+    app.update_progress_and_status("Getting the user's manga list...", 0.1)
+    manga_list: MangaList = Get_User_Manga_List(app)
+    applied_ids: list[int] = []
+    changed_ids: list[int] = []
+    pending: list[dict] = []
+    for entry in entries:
+        state = (
+            "applied"
+            if journal.is_mutated(entry["id"])
+            else planned_entry_state(entry, manga_list)
+        )
+        if state == "applied":
+            applied_ids.append(entry["id"])
+        elif state == "changed":
+            changed_ids.append(entry["id"])
+        else:
+            pending.append(entry)
+    if applied_ids:
+        Logger.INFO(
+            f"Skipping {len(applied_ids)} manga already updated as planned: "
+            f"{', '.join(map(str, applied_ids))}"
+        )
+        app.update_terminal(
+            f"Skipped the following manga IDs because they were already updated "
+            f"as planned: {', '.join(map(str, applied_ids))}"
+        )
+    if changed_ids:
+        Logger.WARNING(
+            f"Skipping {len(changed_ids)} manga changed on AniList since the plan "
+            f"was made: {', '.join(map(str, changed_ids))}"
+        )
+        app.update_terminal(
+            f"Skipped the following manga IDs because their entries changed since "
+            f"the plan was made: {', '.join(map(str, changed_ids))}"
+        )
+
+    Set_Chapters_Updated()
+    mutation_batcher = MutationBatcher(
+        app,
+        int(config.get("MUTATION_BATCH_SIZE") or DEFAULT_MUTATION_BATCH_SIZE),
+        journal,
+    )
+
+    def apply(entry: dict) -> None:
+        manga = Manga(
+            name=entry["title"],
+            manga_id=entry["id"],
+            last_chapter_read=entry["last_chapter_read"],
+            private_bool=plan["private"],
+            status=entry["status"],
+            last_read_at=None,
+            months=plan["months"],
+        )
+        mutation_batcher.add(manga, entry["variables"], entry["chapter_anilist"])
+
+    # Queue the manga from several threads, so a thread that fills a batch sends
+    # it while the others keep queueing and sending the next ones
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        for applied, _ in enumerate(executor.map(apply, pending), 1):
+            app.update_progress_and_status(
+                f"Applying the plan: {applied} of {len(pending)} manga queued",
+                0.15 + 0.75 * applied / len(pending),
+            )
+    # Send the mutations still waiting for a full batch
+    mutation_batcher.flush()
+
+    # Count the chapters updated before the apply was resumed as well
+    chapters_updated = Get_Chapters_Updated() + sum(journal.mutations.values())
+    Logger.INFO(f"\nTotal chapters updated: {chapters_updated}")
+    app.update_terminal(f"\nTotal chapters updated: {chapters_updated}")
+    write_chapters_updated_to_file("chapters_updated", chapters_updated)
+    Logger.INFO(
+        f"Mutation batches sent: {mutation_batcher.batches_sent}, "
+        f"mutations sent: {mutation_batcher.mutations_sent}"
+    )
+    app.update_terminal(
+        f"Mutations sent: {mutation_batcher.mutations_sent} "
+        f"in {mutation_batcher.batches_sent} requests"
+    )
+    journal.finish()
+    app.update_progress_and_status("Script Finished...", 1.0)
+    return True
+
+
+def planned_entry_state(entry: dict, manga_list: MangaList) -> str:
+    """
+    Compares the entry of a planned manga on AniList with the state it had when
+    the plan was made and the state the plan brings it to.
+
+    Args:
+        entry: The planned entry, with the progress and status it had on AniList
+            and the variables of its mutations.
+        manga_list: The user's manga list from AniList.
+
+    Returns:
+        str: "planned" if the entry is as it was when the plan was made,
+        "applied" if it already has the progress and status of the plan, and
+        "changed" otherwise.
+    """
+    manga_entry = manga_list.get(entry["id"])
+    current = (
+        (manga_entry.progress, manga_entry.status) if manga_entry is not None else None
+    )
+    start = (
+        (entry["chapter_anilist"] or 0, entry["status_anilist"])
+        if entry["status_anilist"] is not None
+        else None
+    )
+    if current == start:
+        return "planned"
+    progress, status = start if start is not None else (0, None)
+    for variables in entry["variables"]:
+        progress = variables.get("progress", progress)
+        status = variables.get("status", status)
+    return "applied" if current == (progress, status) else "changed"
@@ -1,26 +1,53 @@
 # pylint: disable=C0103, C0114, E0401
 # Import necessary modules
+import logging
 import time
 from concurrent.futures import ThreadPoolExecutor
 from typing import Union
 
-from API.AccessAPI import Get_Format, Get_User_Manga_List, Manga
+from API.AccessAPI import (
+    Get_Format,
+    Get_Formats,
+    Get_User_Manga_List,
+    Manga,
+    MangaList,
+    MangaListEntry,
+)
 from API.APIRequests import Set_Access_Token, needs_refresh
+from API.mutation_batcher import DEFAULT_MUTATION_BATCH_SIZE, MutationBatcher
+from API.rate_limit import Get_Rate_Limit_Stats
+from API.session import Get_Connection_Stats, configure_session_from_config
 from API.UpdateManga import Get_Chapters_Updated, Set_Chapters_Updated, Update_Manga
 from Manga.GetID import Clean_Manga_IDs, Get_No_Manga_Found
 from Manga.manga_search import MangaSearch
-from Utils.cache import Cache
+from Manga.title_index import get_title_index
+from Utils.cache import (
+    Get_Cache_Stats,
+    configure_caches_from_config,
+    flush_caches,
+    get_format_cache,
+    get_title_cache,
+)
 from Utils.Config import Get_Config, load_config
 from Utils.GetFromFile import (
     Get_Manga_Names,
     Manga_Found_In_CSV,
-    alternative_titles_dict,
+    get_alternative_titles,
+)
+from Utils.log import Logger, configure_logging_from_config, correlate
+from Utils.run_journal import RunJournal, input_fingerprint, open_run_journal
+from Utils.WriteToFile import (
+    write_cache_stats_to_file,
+    write_chapters_updated_to_file,
 )
-from Utils.log import Logger
-from Utils.WriteToFile import write_chapters_updated_to_file
 
 
 class Program:  # pylint: disable=R0903, C0115
+    # The stage of the run journal after which the manga from the CSV file are no
+    # longer needed, and the one after which the user's list is no longer needed
+    ids_stage: str = "ids"
+    updates_stage: str = "updates"
+
     # Function to print the time taken for a task
     def print_time_taken(self, start_time: float, task_name: str) -> float:
         """
@@ -55,13 +82,15 @@ class Program:  # pylint: disable=R0903, C0115
         """
         Logger.INFO("Initializing the class.")
         self.app = app
-        self.cache = Cache("Manga_Data/format_cache.json")
+        self.cache = get_format_cache()
+        self.title_cache = get_title_cache()
+        self.title_index = get_title_index()
 
         Set_Chapters_Updated()
         Logger.DEBUG("Set_Chapters_Updated called.")
 
-        total_steps: int = 10  # Total number of steps in your program
-        current_step: float = 0  # Current step number
+        self.total_steps: int = 10  # Total number of steps in your program
+        self.current_step: float = 0  # Current step number
 
         self.start_time_total = time.time()
         self.times_total = []
@@ -70,10 +99,10 @@ class Program:  # pylint: disable=R0903, C0115
         self.time_remaining_total = 0
 
         # Update progress and status
-        current_step += 0.5
+        self.current_step += 0.5
         app.update_progress_and_status(
             "Setting access token & Loading configuration...",
-            current_step / total_steps,
+            self.current_step / self.total_steps,
         )
         Logger.DEBUG("Updated progress and status.")
 
@@ -104,6 +133,16 @@ class Program:  # pylint: disable=R0903, C0115
             )
             return
 
+        # Apply the optional log level before the run logs anything else
+        configure_logging_from_config(config)
+
+        # Apply the optional connection pool settings to the shared session
+        configure_session_from_config(config)
+        Logger.DEBUG("Configured the shared AniList session.")
+
+        # Apply the optional expiry and size settings to the shared caches
+        configure_caches_from_config(config)
+
         # If the configuration is loaded successfully, get the client ID, secret ID,
         # access token, months, and private from the configuration
         client: str = config["ANILIST_CLIENT_ID"]
@@ -144,9 +183,9 @@ class Program:  # pylint: disable=R0903, C0115
             return
 
         # Update progress and status
-        current_step += 0.5
+        self.current_step += 0.5
         app.update_progress_and_status(
-            "Checking file path...", current_step / total_steps
+            "Checking file path...", self.current_step / self.total_steps
         )
         Logger.INFO("Checking file path...")
 
@@ -158,16 +197,48 @@ class Program:  # pylint: disable=R0903, C0115
             Logger.ERROR("File path not set.")
             return
 
+        # Open the journal of the run, resuming the run with the same inputs if
+        # it stopped before finishing
+        self.journal = self.open_journal(months, private)
+        # The IDs of the manga skipped because they were updated before the run
+        # was resumed
+        self.resumed_ids: list = []
+        if self.journal.resumed:
+            self.cache.update(
+                {
+                    f"{manga_id}_format": media_format
+                    for manga_id, media_format in self.journal.formats.items()
+                }
+            )
+            app.update_terminal(
+                f"Resuming the previous run: {len(self.journal.resolved)} titles "
+                f"resolved and {len(self.journal.mutations)} manga updated already."
+            )
+
+        # Send the SaveMediaListEntry mutations in aliased batches
+        self.mutation_batcher = MutationBatcher(
+            app,
+            int(config.get("MUTATION_BATCH_SIZE") or DEFAULT_MUTATION_BATCH_SIZE),
+            self.journal,
+        )
+
         # Update progress and status
-        current_step += 0.5
+        self.current_step += 0.5
         app.update_progress_and_status(
-            "Getting manga from CSV...", current_step / total_steps
+            "Getting manga from CSV...", self.current_step / self.total_steps
         )
         Logger.INFO("Getting manga from CSV...")
 
-        # Get the manga found in the CSV file
-        Manga_Found_In_CSV(app)
-        Logger.INFO("Manga found in CSV.")
+        # A resumed run that already got the IDs does not read the CSV file again
+        ids_finished = self.ids_stage in self.journal.stages
+        alt_titles_dict: dict = {}
+        if not ids_finished:
+            # Read the alternative titles once for the whole run
+            alt_titles_dict = get_alternative_titles()
+
+            # Get the manga found in the CSV file
+            Manga_Found_In_CSV(app, alt_titles_dict)
+            Logger.INFO("Manga found in CSV.")
 
         # Record the start time
         manga_data_start_time: float = time.time()
@@ -178,155 +249,271 @@ class Program:  # pylint: disable=R0903, C0115
         self.processed_steps_total = 0
 
         # Update progress and status
-        current_step += 0.5
+        self.current_step += 0.5
         app.update_progress_and_status(
-            "Getting manga IDs...", current_step / total_steps
+            "Getting manga IDs...", self.current_step / self.total_steps
         )
         Logger.INFO("Getting manga IDs...")
 
         # Get the manga found in the CSV file
-        manga_names_ids: dict = {}
-        manga_names: dict = Get_Manga_Names(app, alternative_titles_dict)
-        Logger.DEBUG(f"Manga names: {manga_names}")
+        manga_names: dict = {}
+        if not ids_finished:
+            manga_names = Get_Manga_Names(app, alt_titles_dict)
+            Logger.DEBUG(f"Manga names: {manga_names}")
+
+        # Get the entire manga list from AniList, along with the format and titles
+        # of each manga on it, unless the run was resumed after every update
+        manga_list = MangaList()
+        if self.updates_stage not in self.journal.stages:
+            manga_list = Get_User_Manga_List(app)
+            Logger.INFO("Got user manga list from AniList.")
+            self.index_manga_list(manga_list)
+
+        # Get the IDs of the manga and update them on the user's list
+        manga_data_time_taken, manga_update_start_time = self.process_manga(
+            manga_names, manga_list, months, private, manga_data_start_time
+        )
 
-        # Initialize estimation variables for Getting IDs
-        total_ids = len(manga_names)
-        processed_ids = 0
-        times_ids = []
+        Logger.INFO("Finished updating manga!")
+        # After the loop, the progress should be exactly 90%
+        app.update_progress_and_status("Finished updating manga!", 0.9)
 
-        # Iterate through the manga_names dictionary
-        for manga_name, manga_info in manga_names.items():
-            Logger.INFO(f"Processing manga: {manga_name}")
-            try:
-                app.update_progress_and_status(
-                    f"Getting ID for {manga_name}...",
-                    (current_step + ((processed_ids / total_ids) * 3)) / total_steps,
-                )
-                Logger.DEBUG("Updated progress and status.")
-            except UnboundLocalError:
-                app.update_progress_and_status(f"Getting ID for {manga_name}...")
-                Logger.ERROR("UnboundLocalError occurred. Updated progress and status.")
-            app.update_idletasks()
-            Logger.DEBUG("Updated idle tasks.")
+        # Update progress and status
+        app.update_progress_and_status("Writing chapters updated...", 0.95)
+        Logger.INFO("Writing chapters updated...")
 
-            # Record the time before finding the ID
-            time_before: float = time.time()
-            Logger.DEBUG(f"Time before finding ID: {time_before}")
+        self.report_chapters_updated()
 
-            # Replace all occurrences of U+2019 with U+0060 in manga_name
-            manga_name = manga_name.replace("\u2019", "\u0060")
-            manga_name = manga_name.replace("-", " ")
-            manga_name = manga_name.replace("`", "'")
-            Logger.DEBUG(f"Processed manga name: {manga_name}")
+        # Save everything the shared caches and the title index have gathered
+        flush_caches()
+        self.title_index.save()
+        Logger.INFO("Flushed the shared caches.")
 
-            status: str = manga_info["status"]
-            Logger.DEBUG(f"Manga status: {status}")
+        # Nothing is left to resume once everything is saved
+        self.journal.finish()
 
-            # Get the manga IDs regardless of the status
-            if status != "plan_to_read":
-                if "last_chapter_read" in manga_info:
-                    last_chapter_read = manga_info["last_chapter_read"]
-                    manga_search = MangaSearch(manga_name, last_chapter_read, app)
-                    Logger.DEBUG("Created MangaSearch instance with last chapter read.")
-                else:
-                    manga_search = MangaSearch(manga_name, None, app)
-                    Logger.DEBUG(
-                        "Created MangaSearch instance without last chapter read."
-                    )
-            else:
-                manga_search = MangaSearch(manga_name, None, app)
-                Logger.DEBUG("Created MangaSearch instance without last chapter read.")
+        time.sleep(0.3)
 
-            manga_ids: list = manga_search.get_manga_id()
-            Logger.DEBUG(f"Got manga IDs: {manga_ids}")
-
-            for manga_id in manga_ids:
-                # Check if the media format is in the cache
-                media_info: Union[str, None] = self.cache.get(f"{manga_id}_format")
-                if media_info is None:
-                    # Get the format of the manga regardless of the status
-                    media_info = Get_Format(manga_id, app)
-                    Logger.DEBUG(f"Got media info: {media_info}")
-                    # Add the media format to the cache
-                    self.cache.set(f"{manga_id}_format", media_info)
-
-                # If the format of the manga is not a novel
-                if media_info != "NOVEL":
-                    Logger.DEBUG("Media info is not a novel.")
-
-                    # If the manga name is not already in the manga_names_ids dictionary
-                    if manga_name not in manga_names_ids:
-                        # Add the manga name to the manga_names_ids dictionary
-                        manga_names_ids[manga_name] = []
-                        Logger.DEBUG("Added manga name to manga_names_ids.")
-
-                    # If the status is not 'plan_to_read', append additional information
-                    if status != "plan_to_read":
-                        if "last_chapter_read" in manga_info:
-                            last_chapter_read = manga_info["last_chapter_read"]
-                            last_read_at = manga_info["last_read_at"]
-                            manga_names_ids[manga_name].append(
-                                (
-                                    manga_id,
-                                    last_chapter_read,
-                                    manga_info["status"],
-                                    last_read_at,
-                                )
-                            )
-                        else:
-                            manga_names_ids[manga_name].append(
-                                (manga_id, None, manga_info["status"], None)
-                            )
-                        Logger.DEBUG(
-                            "Appended additional information to manga_names_ids."
-                        )
-            # Increment the counter for the number of manga processed
-            processed_ids += 1
+        # Script has finished, update progress and status
+        app.update_progress_and_status("Script Finished...", 1.0)
+        Logger.INFO("Script Finished...")
 
-            # Record the time after finding the ID
-            time_after = time.time()
-            Logger.DEBUG(f"Time after finding ID: {time_after}")
+        time.sleep(0.3)
 
-            operation_time: float = time_after - time_before
-            Logger.DEBUG(f"Operation time: {operation_time}")
+        # Calculate and print the time taken
+        manga_update_time_taken = self.print_time_taken(
+            manga_update_start_time, "update Manga data"
+        )
+        Logger.INFO(
+            f"Time taken to update Manga data: {manga_update_time_taken} seconds"
+        )
 
-            # Append the operation time to the list
-            times_ids.append(operation_time)
-            Logger.DEBUG("Appended operation time to times_ids.")
+        # Calculate the total time taken by adding the time taken to get manga data
+        # and the time taken to update manga data
+        total_time = round((manga_data_time_taken + manga_update_time_taken), 3)
+        Logger.INFO(f"\nTotal time taken: {total_time} seconds")
+        self.app.update_terminal(f"\nTotal time taken: {total_time} seconds")
 
-            # Calculate the average time per manga ID
-            average_time_ids = sum(times_ids) / len(times_ids)
-            Logger.DEBUG(f"Average time per manga ID: {average_time_ids}")
+        # Print how often the pooled connections were reused
+        connection_stats = Get_Connection_Stats()
+        Logger.INFO(f"Connection stats: {connection_stats}")
+        self.app.update_terminal(
+            f"Requests sent: {connection_stats['requests']}, "
+            f"connections reused: {connection_stats['connections_reused']}, "
+            f"connections opened: {connection_stats['connections_opened']}"
+        )
 
-            # Calculate the estimated time remaining for Getting IDs
-            remaining_ids = total_ids - processed_ids
-            estimated_time_remaining_ids = average_time_ids * remaining_ids
-            Logger.INFO(
-                f"Estimated time remaining for Getting IDs: {estimated_time_remaining_ids} seconds"
+        # Print how many mutations were sent in each batched request
+        Logger.INFO(
+            f"Mutation batches sent: {self.mutation_batcher.batches_sent}, "
+            f"mutations sent: {self.mutation_batcher.mutations_sent}"
+        )
+        self.app.update_terminal(
+            f"Mutations sent: {self.mutation_batcher.mutations_sent} "
+            f"in {self.mutation_batcher.batches_sent} requests"
+        )
+
+        # Print how well the caches performed and save their stats for tuning
+        cache_stats = Get_Cache_Stats()
+        for cache_name, stats in cache_stats.items():
+            Logger.INFO(f"Cache stats for {cache_name}: {stats}")
+            lookups = stats["hits"] + stats["misses"]
+            hit_rate = round(stats["hits"] / lookups * 100, 1) if lookups else 0
+            self.app.update_terminal(
+                f"{cache_name}: {stats['hits']} hits, {stats['misses']} misses "
+                f"({hit_rate}% hit rate), {stats['sets']} sets, "
+                f"{stats['evictions']} evicted, {stats['expirations']} expired, "
+                f"{stats['entries']} entries, {stats['bytes_on_disk']} bytes, "
+                f"loaded in {stats['load_time']}s, flushed in {stats['flush_time']}s"
             )
+        write_cache_stats_to_file(cache_stats)
 
-            # Update the terminal with estimation
-            app.update_estimated_time_remaining(estimated_time_remaining_ids)
-            Logger.DEBUG("Updated estimated time remaining for Getting IDs.")
+        # Print how much the rate limiter had to hold requests back
+        rate_limit_stats = Get_Rate_Limit_Stats()
+        Logger.INFO(f"Rate limit stats: {rate_limit_stats}")
+        self.app.update_terminal(
+            f"Requests delayed by the rate limiter: {rate_limit_stats['waits']}, "
+            f"time waited: {rate_limit_stats['time_waited']} seconds, "
+            f"rate limit responses: {rate_limit_stats['rate_limited']}"
+        )
 
-        # After the loop, estimate the total updates
-        total_updates = sum(len(info_list) for info_list in manga_names_ids.values())
-        Logger.INFO(f"Total updates to perform: {total_updates}")
+        # Print a message indicating that the script has finished and provide
+        # information about the generated text files
+        Logger.INFO(
+            "\nScript has finished, the 2 txt files generated by the program have manga "
+            "that was not found on anilist and manga that had multiple id's associated to it."
+            "\nPlease check the 2 files to see if there is anything that you need to do manually.\n"
+        )
+        self.app.update_terminal(
+            "\nScript has finished, the 2 txt files generated by the program have manga "
+            "that was not found on anilist and manga that had multiple id's associated to it."
+            "\nPlease check the 2 files to see if there is anything that you need to do manually.\n"
+        )
 
-        # Add the update phase to estimated total steps
-        self.total_steps_total = total_updates
+    def process_manga(  # pylint: disable=R0913
+        self,
+        manga_names: dict,
+        manga_list: MangaList,
+        months: str,
+        private: str,
+        start_time: float,
+    ) -> tuple[float, float]:
+        """
+        Gets the IDs of every manga and then updates them on the user's list.
+
+        Args:
+            manga_names: A dictionary mapping manga names to their details from the CSV file.
+            manga_list: The user's manga list from AniList.
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entries are private.
+            start_time: The time the run started getting the manga data.
+
+        Returns:
+            tuple: The time taken to get the manga data and the time the updates started.
+        """
+        if self.ids_stage in self.journal.stages:
+            manga_names_ids = self.resume_manga_ids()
+        else:
+            # Get the IDs of the manga
+            manga_names_ids = self.get_manga_ids(manga_names)
+
+            # After the loop, estimate the total updates
+            total_updates = sum(
+                len(info_list) for info_list in manga_names_ids.values()
+            )
+            Logger.INFO(f"Total updates to perform: {total_updates}")
+
+            # Add the update phase to estimated total steps
+            self.total_steps_total = total_updates
+
+            # Update progress and status
+            self.current_step += 3.5
+            self.app.update_progress_and_status(
+                "Cleaning manga IDs...", self.current_step / self.total_steps
+            )
+            Logger.INFO("Cleaning manga IDs...")
+
+            # Clean the manga_names_ids dictionary
+            manga_names_ids = Clean_Manga_IDs(manga_names_ids, self.app)
+            Logger.DEBUG("Cleaned manga_names_ids.")
+
+            # Print the IDs of the manga and the manga that were not found
+            self.report_manga_ids(manga_names_ids)
+            self.journal.record_stage(self.ids_stage, manga_names_ids)
+
+        # Calculate and print the time taken
+        manga_data_time_taken: float = self.print_time_taken(
+            start_time, "get Manga data"
+        )
+        Logger.INFO(f"Time taken to get manga data: {manga_data_time_taken}")
+        self.app.update_terminal("")
+
+        # Record the start time for updating manga
+        manga_update_start_time = time.time()
+        Logger.DEBUG(f"Start time for manga update: {manga_update_start_time}")
 
         # Update progress and status
-        current_step += 3.5
-        app.update_progress_and_status(
-            "Cleaning manga IDs...", current_step / total_steps
+        self.app.update_progress_and_status("Updating manga...", 0.6)
+        Logger.INFO("Updating manga...")
+
+        # Update the manga on the user's list
+        skipped_ids: list = []
+        if self.updates_stage in self.journal.stages:
+            self.app.update_terminal(
+                "Every manga was updated before the run was resumed."
+            )
+        else:
+            skipped_ids = self.update_manga_list(
+                manga_names_ids, manga_list, months, private
+            )
+            self.journal.record_stage(self.updates_stage)
+
+        # After the loop, print the IDs of the manga that were not updated
+        self.report_skipped_ids(skipped_ids)
+        return manga_data_time_taken, manga_update_start_time
+
+    def resume_manga_ids(self) -> dict:
+        """
+        Gets the cleaned IDs of the manga from the run journal, for a resumed run
+        that already got and reported them.
+
+        Returns:
+            dict: A dictionary mapping manga names to lists of ID information.
+        """
+        manga_names_ids = {
+            manga_name: [tuple(id_info) for id_info in id_infos]
+            for manga_name, id_infos in self.journal.stages[self.ids_stage].items()
+        }
+        self.total_steps_total = sum(
+            len(info_list) for info_list in manga_names_ids.values()
         )
-        Logger.INFO("Cleaning manga IDs...")
+        self.current_step += 3.5
+        Logger.INFO(
+            f"Reusing the IDs of {len(manga_names_ids)} manga from the journal."
+        )
+        self.app.update_terminal(
+            f"Reusing the IDs of {len(manga_names_ids)} manga found before the run "
+            "was resumed."
+        )
+        return manga_names_ids
+
+    def open_journal(self, months: str, private: str) -> RunJournal:
+        """
+        Opens the journal of the run, resuming the run with the same inputs if it
+        stopped before finishing.
+
+        Args:
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entries are private.
+
+        Returns:
+            RunJournal: The journal of the run.
+        """
+        return open_run_journal(
+            input_fingerprint(
+                [self.app.file_path, self.app.previous_file_path], months, private
+            )
+        )
+
+    def report_chapters_updated(self) -> None:
+        """
+        Prints the number of chapters updated and writes it to a file.
+        """
+        # Get the number of chapters updated, including those updated before the
+        # run was resumed
+        chapters_updated = Get_Chapters_Updated() + sum(self.journal.mutations.values())
+        Logger.INFO(f"\nTotal chapters updated: {chapters_updated}")
+        self.app.update_terminal(f"\nTotal chapters updated: {chapters_updated}")
+        # Write the number of chapters updated to a file
+        write_chapters_updated_to_file("chapters_updated", chapters_updated)
 
-        # Clean the manga_names_ids dictionary
-        manga_names_ids = Clean_Manga_IDs(manga_names_ids, app)
-        Logger.DEBUG("Cleaned manga_names_ids.")
+    def report_manga_ids(self, manga_names_ids: dict) -> None:
+        """
+        Prints the IDs found for each manga and writes the file of manga not found.
 
+        Args:
+            manga_names_ids: A dictionary mapping manga names to lists of ID information.
+        """
         # Print the dictionary containing manga names and associated IDs
         self.app.update_terminal("\nManga Names With Associated IDs & Chapters Read:")
 
@@ -351,214 +538,548 @@ class Program:  # pylint: disable=R0903, C0115
             self.app.update_terminal("\n".join(messages))
         self.app.update_terminal("\n\n")
 
-        app.update_progress_and_status(
+        self.app.update_progress_and_status(
             "Writing no manga found file...",
-            (current_step + (0.5 / 3) * 2) / total_steps,
+            (self.current_step + (0.5 / 3) * 2) / self.total_steps,
         )
         Logger.INFO("Writing no manga found file...")
-        Get_No_Manga_Found(app)
+        Get_No_Manga_Found(self.app)
 
-        # Calculate and print the time taken
-        manga_data_time_taken: float = self.print_time_taken(
-            manga_data_start_time, "get Manga data"
+    def report_skipped_ids(self, skipped_ids: list) -> None:
+        """
+        Prints the IDs of the manga that were not updated because they did not
+        change, apart from those already updated before the run was resumed.
+
+        Args:
+            skipped_ids: The IDs of the manga that were skipped.
+        """
+        if self.resumed_ids:
+            Logger.INFO(
+                f"Skipped updating the following manga IDs because they were already "
+                f"updated before the run was resumed: "
+                f"{', '.join(map(str, self.resumed_ids))}"
+            )
+            self.app.update_terminal(
+                f"Skipped updating the following manga IDs because they were already "
+                f"updated before the run was resumed: "
+                f"{', '.join(map(str, self.resumed_ids))}"
+            )
+            resumed_ids = set(self.resumed_ids)
+            skipped_ids = [
+                manga_id for manga_id in skipped_ids if manga_id not in resumed_ids
+            ]
+        if skipped_ids:
+            Logger.WARNING(
+                f"Skipped updating the following manga IDs because their entries "
+                f"did not change: {', '.join(map(str, skipped_ids))}"
+            )
+            self.app.update_terminal(
+                f"Skipped updating the following manga IDs because their entries "
+                f"did not change: {', '.join(map(str, skipped_ids))}"
+            )
+            Logger.DEBUG(f"Skipped IDs: {skipped_ids}")
+
+    def get_manga_ids(self, manga_names: dict) -> dict:
+        """
+        Gets the IDs of every manga, one manga after another.
+
+        The formats of all IDs missing from the format cache are then fetched
+        together in batches before novels are filtered out.
+
+        Args:
+            manga_names: A dictionary mapping manga names to their details from the CSV file.
+
+        Returns:
+            dict: A dictionary mapping manga names to lists of ID information tuples.
+        """
+        searched_manga: list = []
+
+        # Initialize estimation variables for Getting IDs
+        total_ids = len(manga_names)
+        processed_ids = 0
+        times_ids: list = []
+
+        # Iterate through the manga_names dictionary
+        for manga_name, manga_info in manga_names.items():
+            Logger.INFO(f"Processing manga: {manga_name}")
+            self.app.update_progress_and_status(
+                f"Getting ID for {manga_name}...",
+                (self.current_step + ((processed_ids / total_ids) * 3))
+                / self.total_steps,
+            )
+            Logger.DEBUG("Updated progress and status.")
+            self.app.update_idletasks()
+            Logger.DEBUG("Updated idle tasks.")
+
+            # Record the time before finding the ID
+            time_before: float = time.time()
+            if Logger.is_enabled_for(logging.DEBUG):
+                Logger.DEBUG(f"Time before finding ID: {time_before}")
+
+            searched_manga.append(self.search_manga_ids(manga_name, manga_info))
+
+            # Increment the counter for the number of manga processed
+            processed_ids += 1
+
+            # Record the time taken to find the ID and update the estimation
+            times_ids.append(time.time() - time_before)
+            self.update_ids_estimate(times_ids, total_ids - processed_ids)
+
+        return self.assemble_manga_ids(searched_manga)
+
+    def update_ids_estimate(self, times_ids: list, remaining_ids: int) -> None:
+        """
+        Updates the estimated time remaining for getting the manga IDs.
+
+        Args:
+            times_ids: The time taken to get the IDs of each manga processed so far.
+            remaining_ids: The number of manga left to process.
+        """
+        # Calculate the average time per manga ID
+        average_time_ids = sum(times_ids) / len(times_ids)
+        if Logger.is_enabled_for(logging.DEBUG):
+            Logger.DEBUG(f"Average time per manga ID: {average_time_ids}")
+
+        # Calculate the estimated time remaining for Getting IDs
+        estimated_time_remaining_ids = average_time_ids * remaining_ids
+        Logger.INFO(
+            f"Estimated time remaining for Getting IDs: {estimated_time_remaining_ids} seconds"
         )
-        Logger.INFO(f"Time taken to get manga data: {manga_data_time_taken}")
-        self.app.update_terminal("")
 
-        # Record the start time for updating manga
-        manga_update_start_time = time.time()
-        Logger.DEBUG(f"Start time for manga update: {manga_update_start_time}")
+        # Update the terminal with estimation
+        self.app.update_estimated_time_remaining(estimated_time_remaining_ids)
+        Logger.DEBUG("Updated estimated time remaining for Getting IDs.")
 
-        # Update progress and status
-        app.update_progress_and_status("Updating manga...", 0.6)
-        Logger.INFO("Updating manga...")
+    def index_manga_list(self, manga_list: MangaList) -> None:
+        """
+        Adds the formats and titles of the manga on the user's list to the format
+        cache and the title index, so they need no format request or search.
+
+        Args:
+            manga_list: The user's manga list from AniList.
+        """
+        formats: dict = {}
+        for entry in manga_list:
+            self.title_index.add(entry.mediaId, entry.titles)
+            if entry.format and self.cache.get(f"{entry.mediaId}_format") is None:
+                formats[f"{entry.mediaId}_format"] = entry.format
+        if formats:
+            # Add the media formats to the cache
+            self.cache.update(formats)
+        Logger.INFO(
+            f"Indexed {len(self.title_index)} manga from the user's list and "
+            f"cached {len(formats)} formats."
+        )
+
+    def search_manga_ids(self, manga_name: str, manga_info: dict) -> tuple:
+        """
+        Searches for the IDs of a single manga.
+
+        Args:
+            manga_name: The name of the manga from the CSV file.
+            manga_info: The details of the manga from the CSV file.
+
+        Returns:
+            tuple: The processed manga name, the details of the manga and the
+            list of IDs found.
+        """
+        # This runs for every manga, so only build the messages if logged
+        debug = Logger.is_enabled_for(logging.DEBUG)
+        with correlate(manga_name):
+            manga_name = self.process_manga_name(manga_name)
+            if debug:
+                Logger.DEBUG(f"Processed manga name: {manga_name}")
+
+            # Reuse the IDs found before the run was resumed
+            resolved_ids = self.journal.resolved_ids(manga_name)
+            if resolved_ids is not None:
+                Logger.INFO(f"Reusing the IDs from the run journal: {resolved_ids}")
+                return manga_name, manga_info, resolved_ids
+
+            status: str = manga_info["status"]
+            if debug:
+                Logger.DEBUG(f"Manga status: {status}")
+
+            # Get the manga IDs regardless of the status
+            if status != "plan_to_read" and "last_chapter_read" in manga_info:
+                manga_search = MangaSearch(
+                    manga_name,
+                    manga_info["last_chapter_read"],
+                    self.app,
+                    title_index=self.title_index,
+                    cache=self.title_cache,
+                )
+                Logger.DEBUG("Created MangaSearch instance with last chapter read.")
+            else:
+                manga_search = MangaSearch(
+                    manga_name,
+                    None,
+                    self.app,
+                    title_index=self.title_index,
+                    cache=self.title_cache,
+                )
+                Logger.DEBUG("Created MangaSearch instance without last chapter read.")
+
+            manga_ids: list = manga_search.get_manga_id()
+            if debug:
+                Logger.DEBUG(f"Got manga IDs: {manga_ids}")
+            # Titles that were not found are searched again, so they are still
+            # reported in the file of manga not found
+            if manga_ids:
+                self.journal.record_resolved(manga_name, manga_ids)
+            return manga_name, manga_info, manga_ids
+
+    def prefetch_formats(self, manga_ids: list[int]) -> None:
+        """
+        Fetches the formats of every ID missing from the format cache in batches.
 
+        Args:
+            manga_ids: The IDs whose formats are needed.
+        """
+        missing_ids = [
+            manga_id
+            for manga_id in dict.fromkeys(manga_ids)
+            if self.cache.get(f"{manga_id}_format") is None
+        ]
+        if not missing_ids:
+            return
+        Logger.INFO(f"Fetching the formats of {len(missing_ids)} manga.")
+        formats = Get_Formats(missing_ids, self.app)
+        self.journal.record_formats(formats)
+        # Add the media formats to the cache
+        self.cache.update(
+            {
+                f"{manga_id}_format": media_info
+                for manga_id, media_info in formats.items()
+            }
+        )
+
+    def assemble_manga_ids(self, searched_manga: list) -> dict:
+        """
+        Builds the dictionary of manga names and IDs from the search results.
+
+        The formats of the IDs are fetched in batches first, and novels are left out.
+
+        Args:
+            searched_manga: The processed name, details and IDs of each manga.
+
+        Returns:
+            dict: A dictionary mapping manga names to lists of ID information tuples.
+        """
+        # Save the titles seen in the searches and on the user's list
+        self.title_index.save()
+
+        self.prefetch_formats(
+            [manga_id for _, _, manga_ids in searched_manga for manga_id in manga_ids]
+        )
+
+        manga_names_ids: dict = {}
+        for manga_name, manga_info, manga_ids in searched_manga:
+            with correlate(manga_name):
+                id_infos = self.get_id_infos(manga_info, manga_ids)
+            if id_infos is not None:
+                manga_names_ids.setdefault(manga_name, []).extend(id_infos)
+        return manga_names_ids
+
+    def get_id_infos(self, manga_info: dict, manga_ids: list) -> Union[list, None]:
+        """
+        Gets the ID information tuples of a single manga, leaving out novels.
+
+        Args:
+            manga_info: The details of the manga from the CSV file.
+            manga_ids: The IDs found for the manga.
+
+        Returns:
+            list: The list of ID information tuples, or None if no ID that is not
+            a novel was found.
+        """
+        status: str = manga_info["status"]
+        id_infos: Union[list, None] = None
+        for manga_id in manga_ids:
+            # Check if the media format is in the cache
+            media_info: Union[str, None] = self.cache.get(f"{manga_id}_format")
+            if media_info is None:
+                # Get the format of the manga regardless of the status
+                media_info = Get_Format(manga_id, self.app)
+                if Logger.is_enabled_for(logging.DEBUG):
+                    Logger.DEBUG(f"Got media info: {media_info}")
+                self.journal.record_formats({manga_id: media_info})
+                # Add the media format to the cache
+                self.cache.set(f"{manga_id}_format", media_info)
+
+            # If the format of the manga is a novel, skip it
+            if media_info == "NOVEL":
+                continue
+            Logger.DEBUG("Media info is not a novel.")
+
+            if id_infos is None:
+                id_infos = []
+
+            # If the status is not 'plan_to_read', append additional information
+            if status != "plan_to_read":
+                if "last_chapter_read" in manga_info:
+                    id_infos.append(
+                        (
+                            manga_id,
+                            manga_info["last_chapter_read"],
+                            manga_info["status"],
+                            manga_info["last_read_at"],
+                        )
+                    )
+                else:
+                    id_infos.append((manga_id, None, manga_info["status"], None))
+                Logger.DEBUG("Appended additional information to manga_names_ids.")
+        return id_infos
+
+    def update_manga_list(
+        self,
+        manga_names_ids: dict,
+        manga_list: MangaList,
+        months: str,
+        private: str,
+    ) -> list:
+        """
+        Updates every manga on the user's list, one entry after another.
+
+        Args:
+            manga_names_ids: A dictionary mapping manga names to lists of ID information.
+            manga_list: The user's manga list from AniList.
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entries are private.
+
+        Returns:
+            list: The IDs of the manga that were skipped because they did not change.
+        """
         # Initialize estimation variables for Updating Manga
         processed_updates = 0
         total_updates = sum(len(info_list) for info_list in manga_names_ids.values())
-        times_updates = []
+        times_updates: list = []
         skipped_ids: list = []
         Logger.DEBUG("Created list for skipped IDs.")
-
-        # Get the entire manga list from AniList
-        manga_list: list[dict[str, Union[int, str]]] = Get_User_Manga_List(app)
-        Logger.INFO("Got user manga list from AniList.")
+        # Only build the messages logged for every manga if they are logged
+        debug = Logger.is_enabled_for(logging.DEBUG)
 
         # Iterate over entries in the cleaned manga_names_ids dictionary
         for manga_name, manga_info_list in manga_names_ids.items():
             Logger.INFO(f"Processing manga: {manga_name}")
             # For each manga, there is a list of information (manga_info_list)
             for manga_info in manga_info_list:
-                # Unpack the manga_info list into individual variables
-                manga_id, last_chapter_read, status, last_read_at = manga_info
-                Logger.DEBUG(f"Processing manga info: {manga_info}")
-                # Find the manga in the manga list
-                manga_entry: Union[dict[str, Union[int, str]], None] = next(
-                    (entry for entry in manga_list if entry["mediaId"] == manga_id),
-                    None,
-                )
-                # If the manga was not found in the manga list
-                if manga_entry is None:
-                    self.app.update_terminal(
-                        f"Manga: {manga_name} (ID: {manga_id}) was not "
-                        "found on user list. Adding..."
-                    )
+                # Record the time taken for this update
+                update_time_before = time.time()
 
-                    Logger.WARNING(
-                        f"Manga: {manga_name} "
-                        f"(ID: {manga_id}) was not found "
-                        "on user list. Adding..."
-                    )
-                    chapter_anilist, status_anilist = 0, None
-                else:
-                    # Get the current progress and status of the manga from the manga entry
-                    chapter_anilist, status_anilist = (
-                        (
-                            int(manga_entry["progress"])
-                            if isinstance(manga_entry["progress"], str)
-                            else manga_entry["progress"]
-                        ),
-                        manga_entry["status"],
-                    )
-                    Logger.DEBUG(
-                        f"Got current progress and status from manga entry: {manga_entry}"
-                    )
-
-                # If the progress or status has changed or the manga was not found in the manga list
-
-                if (
-                    manga_entry is None
-                    or chapter_anilist != last_chapter_read
-                    or status_anilist != status
+                if not self.update_entry(
+                    manga_name, manga_info, manga_list, months, private
                 ):
-                    Logger.INFO(f"Updating manga: {manga_name}")
-                    manga = Manga(
-                        name=manga_name,
-                        manga_id=manga_id,
-                        last_chapter_read=last_chapter_read,
-                        private_bool=private,
-                        status=status,
-                        last_read_at=last_read_at,
-                        months=months,
-                    )
-                    Logger.DEBUG(f"Created Manga instance: {manga}")
-
-                    # Record the time taken for this update
-                    update_time_before = time.time()
-
-                    Update_Manga(manga, app, chapter_anilist, status_anilist)
-                    Logger.DEBUG("Updated manga.")
-
-                    # After updating the manga, increment the counter
-                    processed_updates += 1
+                    # If the progress and status have not changed, add the manga ID to list
+                    skipped_ids.append(manga_info[0])
+                    if debug:
+                        Logger.DEBUG(f"Added manga ID: {manga_info[0]} to skipped_ids.")
+                    continue
+
+                # After updating the manga, increment the counter
+                processed_updates += 1
+                if debug:
                     Logger.DEBUG(
                         f"Incremented processed_updates to: {processed_updates}"
                     )
 
-                    # Assume Update_Manga is synchronous; if not, adjust accordingly
-                    update_time_after = time.time()
-                    operation_time_update = update_time_after - update_time_before
-                    times_updates.append(operation_time_update)
-                    Logger.DEBUG(f"Operation time for update: {operation_time_update}")
+                times_updates.append(time.time() - update_time_before)
+                self.update_updates_estimate(
+                    manga_name, times_updates, processed_updates, total_updates
+                )
 
-                    # Calculate the average time per update
-                    average_time_update = sum(times_updates) / len(times_updates)
-                    Logger.DEBUG(f"Average time per update: {average_time_update}")
+        # Send the mutations still waiting for a full batch
+        self.mutation_batcher.flush()
+        return skipped_ids
+
+    def update_updates_estimate(
+        self,
+        manga_name: str,
+        times_updates: list,
+        processed_updates: int,
+        total_updates: int,
+    ) -> None:
+        """
+        Updates the estimated time remaining and the progress for updating manga.
 
-                    # Calculate the estimated time remaining for Updating Manga
-                    remaining_updates = total_updates - processed_updates
-                    estimated_time_remaining_update = (
-                        average_time_update * remaining_updates
-                    )
-                    Logger.INFO(
-                        "Estimated time remaining for Updating Manga: "
-                        + f"{estimated_time_remaining_update} seconds"
-                    )
+        Args:
+            manga_name: The name of the manga that was just updated.
+            times_updates: The time taken by each update sent so far.
+            processed_updates: The number of updates sent so far.
+            total_updates: The total number of updates to send.
+        """
+        # Calculate the average time per update
+        average_time_update = sum(times_updates) / len(times_updates)
+        if Logger.is_enabled_for(logging.DEBUG):
+            Logger.DEBUG(f"Average time per update: {average_time_update}")
+
+        # Calculate the estimated time remaining for Updating Manga
+        remaining_updates = total_updates - processed_updates
+        estimated_time_remaining_update = average_time_update * remaining_updates
+        Logger.INFO(
+            "Estimated time remaining for Updating Manga: "
+            + f"{estimated_time_remaining_update} seconds"
+        )
 
-                    # Calculate total estimated time remaining
-                    total_estimated_time_remaining = estimated_time_remaining_update
-                    Logger.DEBUG(
-                        f"Total estimated time remaining: {total_estimated_time_remaining}"
-                    )
+        # Update the estimated time remaining in the app
+        self.app.update_estimated_time_remaining(estimated_time_remaining_update)
+        Logger.DEBUG("Updated estimated time remaining for Updating Manga.")
 
-                    # Update the estimated time remaining in the app
-                    app.update_estimated_time_remaining(total_estimated_time_remaining)
-                    Logger.DEBUG("Updated estimated time remaining for Updating Manga.")
+        # Update the progress and status
+        self.app.update_progress_and_status(
+            f"Updating manga: {manga_name}",
+            (self.current_step + (processed_updates / total_updates) * 3)
+            / self.total_steps,
+        )
+        Logger.DEBUG("Updated progress and status for Updating Manga.")
+
+    def update_entry(  # pylint: disable=R0913
+        self,
+        manga_name: str,
+        manga_info: tuple,
+        manga_list: MangaList,
+        months: str,
+        private: str,
+    ) -> bool:
+        """
+        Updates a single manga on the user's list if its progress or status changed.
 
-                    # Update the progress and status
-                    app.update_progress_and_status(
-                        f"Updating manga: {manga_name}",
-                        (current_step + (processed_updates / total_updates) * 3)
-                        / total_steps,
-                    )
-                    Logger.DEBUG("Updated progress and status for Updating Manga.")
+        Args:
+            manga_name: The name of the manga.
+            manga_info: The ID, last chapter read, status and last read date of the manga.
+            manga_list: The user's manga list from AniList.
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entry is private.
 
-                else:
-                    # If the progress and status have not changed, add the manga ID to list
-                    skipped_ids.append(manga_id)
-                    Logger.DEBUG(f"Added manga ID: {manga_id} to skipped_ids.")
+        Returns:
+            bool: True if an update was sent, False if the entry did not change.
+        """
+        with correlate(manga_name):
+            change = self.diff_entry(
+                manga_name, manga_info, manga_list, months, private
+            )
+            if change is None:
+                return False
+            self.mutate_entry(*change)
+            return True
+
+    def diff_entry(  # pylint: disable=R0913
+        self,
+        manga_name: str,
+        manga_info: tuple,
+        manga_list: MangaList,
+        months: str,
+        private: str,
+    ) -> Union[tuple[Manga, int, Union[str, None]], None]:
+        """
+        Compares a single manga with its entry on the user's list.
 
-        # After the loop, print the IDs of the manga that were not updated
-        if skipped_ids:
-            Logger.WARNING(
-                f"Skipped updating the following manga IDs because their entries "
-                f"did not change: {', '.join(map(str, skipped_ids))}"
+        Args:
+            manga_name: The name of the manga.
+            manga_info: The ID, last chapter read, status and last read date of the manga.
+            manga_list: The user's manga list from AniList.
+            months: The number of months after which a manga is set to paused.
+            private: Whether the updated entry is private.
+
+        Returns:
+            tuple: The manga to update with the progress and status of its entry
+            on AniList, or None if the entry did not change.
+        """
+        # Unpack the manga_info list into individual variables
+        manga_id, last_chapter_read, status, last_read_at = manga_info
+        # This runs for every manga, so only build the messages if logged
+        debug = Logger.is_enabled_for(logging.DEBUG)
+        if debug:
+            Logger.DEBUG(f"Processing manga info: {manga_info}")
+        # The mutations of the manga were applied before the run was resumed
+        if self.journal.is_mutated(manga_id):
+            Logger.INFO(
+                f"Manga {manga_id} was already updated according to the run journal."
             )
+            self.resumed_ids.append(manga_id)
+            return None
+        # Find the manga in the manga list
+        manga_entry: Union[MangaListEntry, None] = manga_list.get(manga_id)
+        # If the manga was not found in the manga list
+        if manga_entry is None:
             self.app.update_terminal(
-                f"Skipped updating the following manga IDs because their entries "
-                f"did not change: {', '.join(map(str, skipped_ids))}"
+                f"Manga: {manga_name} (ID: {manga_id}) was not "
+                "found on user list. Adding..."
             )
-            Logger.DEBUG(f"Skipped IDs: {skipped_ids}")
-
-        Logger.INFO("Finished updating manga!")
-        # After the loop, the progress should be exactly 90%
-        app.update_progress_and_status("Finished updating manga!", 0.9)
-
-        # Update progress and status
-        app.update_progress_and_status("Writing chapters updated...", 0.95)
-        Logger.INFO("Writing chapters updated...")
 
-        # Get the number of chapters updated
-        chapters_updated = Get_Chapters_Updated()
-        Logger.INFO(f"\nTotal chapters updated: {chapters_updated}")
-        self.app.update_terminal(f"\nTotal chapters updated: {chapters_updated}")
-        # Write the number of chapters updated to a file
-        write_chapters_updated_to_file("chapters_updated", chapters_updated)
+            Logger.WARNING(
+                f"Manga: {manga_name} "
+                f"(ID: {manga_id}) was not found "
+                "on user list. Adding..."
+            )
+            chapter_anilist, status_anilist = 0, None
+        else:
+            # Get the current progress and status of the manga from the manga entry
+            chapter_anilist, status_anilist = manga_entry.progress, manga_entry.status
+            if debug:
+                Logger.DEBUG(
+                    f"Got current progress and status from manga entry: {manga_entry}"
+                )
 
-        time.sleep(0.3)
+        # If the progress and status have not changed, there is nothing to update
+        if (
+            manga_entry is not None
+            and chapter_anilist == last_chapter_read
+            and status_anilist == status
+        ):
+            return None
+
+        Logger.INFO(f"Updating manga: {manga_name}")
+        manga = Manga(
+            name=manga_name,
+            manga_id=manga_id,
+            last_chapter_read=last_chapter_read,
+            private_bool=private,
+            status=status,
+            last_read_at=last_read_at,
+            months=months,
+        )
+        if debug:
+            Logger.DEBUG(f"Created Manga instance: {manga}")
 
-        # Script has finished, update progress and status
-        app.update_progress_and_status("Script Finished...", 1.0)
-        Logger.INFO("Script Finished...")
+        return manga, chapter_anilist, status_anilist
 
-        time.sleep(0.3)
+    def mutate_entry(
+        self, manga: Manga, chapter_anilist: int, status_anilist: Union[str, None]
+    ) -> None:
+        """
+        Queues the mutations that update a single manga on the user's list.
 
-        # Calculate and print the time taken
-        manga_update_time_taken = self.print_time_taken(
-            manga_update_start_time, "update Manga data"
-        )
-        Logger.INFO(
-            f"Time taken to update Manga data: {manga_update_time_taken} seconds"
+        Args:
+            manga: The manga to update.
+            chapter_anilist: The progress of the manga on AniList.
+            status_anilist: The status of the manga on AniList, or None if it is
+                not on the user's list.
+        """
+        Update_Manga(
+            manga,
+            self.app,
+            chapter_anilist,
+            status_anilist,
+            batcher=self.mutation_batcher,
         )
+        Logger.DEBUG("Updated manga.")
 
-        # Calculate the total time taken by adding the time taken to get manga data
-        # and the time taken to update manga data
-        total_time = round((manga_data_time_taken + manga_update_time_taken), 3)
-        Logger.INFO(f"\nTotal time taken: {total_time} seconds")
-        self.app.update_terminal(f"\nTotal time taken: {total_time} seconds")
+    @staticmethod
+    def process_manga_name(manga_name: str) -> str:
+        """
+        Processes the name of a manga from the CSV file the way it is searched for.
 
-        # Print a message indicating that the script has finished and provide
-        # information about the generated text files
-        Logger.INFO(
-            "\nScript has finished, the 2 txt files generated by the program have manga "
-            "that was not found on anilist and manga that had multiple id's associated to it."
-            "\nPlease check the 2 files to see if there is anything that you need to do manually.\n"
-        )
-        self.app.update_terminal(
-            "\nScript has finished, the 2 txt files generated by the program have manga "
-            "that was not found on anilist and manga that had multiple id's associated to it."
-            "\nPlease check the 2 files to see if there is anything that you need to do manually.\n"
-        )
+        Args:
+            manga_name (str): The name of the manga.
+
+        Returns:
+            str: The processed name.
+        """
+        # Replace all occurrences of U+2019 with U+0060 in manga_name
+        manga_name = manga_name.replace("\u2019", "\u0060")
+        manga_name = manga_name.replace("-", " ")
+        return manga_name.replace("`", "'")
 
     @staticmethod
     def process_id_info(manga_name: str, id_info: tuple) -> str:
@@ -578,5 +1099,6 @@ class Program:  # pylint: disable=R0903, C0115
             f"{manga_name}, ID: {manga_id}, Last Chapter Read: "
             f"{last_chapter_read}, Status: {status}, Last Read At: {last_read_at}"
         )
-        Logger.DEBUG(f"Processed info for manga: {manga_name}")
+        if Logger.is_enabled_for(logging.DEBUG):
+            Logger.DEBUG(f"Processed info for manga: {manga_name}")
         return message
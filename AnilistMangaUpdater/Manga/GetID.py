@@ -17,11 +17,26 @@ Functions:
 # Import necessary modules and functions
 from typing import Union
 
-from Manga.manga_search import return_no_manga_found
+from Manga.manga_search import return_cached_misses, return_no_manga_found
 from Utils.log import Logger
 from Utils.WriteToFile import formatter_multiple_ids, formatter_not_found, write_to_file
 
 
+# Function to remove the duplicate IDs of a manga
+def Get_Unique_IDs(id_list: list) -> list:
+    """
+    Removes the duplicate IDs of a single manga.
+
+    Parameters:
+        id_list (list): The ID information tuples of the manga.
+
+    Returns:
+        list: The unique ID information tuples. The manga is left out of the
+        update if there is more than one.
+    """
+    return list(set(id_list))
+
+
 # Function to clean the manga IDs
 def Clean_Manga_IDs(manga_names_ids: dict, app: object) -> dict:
     """
@@ -44,7 +59,7 @@ def Clean_Manga_IDs(manga_names_ids: dict, app: object) -> dict:
     for manga_name, id_list in manga_names_ids.items():
         Logger.DEBUG(f"Processing manga: {manga_name}.")
         # Remove duplicates within the same manga name
-        unique_ids = list(set(id_list))
+        unique_ids = Get_Unique_IDs(id_list)
         Logger.DEBUG(f"Unique IDs for {manga_name}: {unique_ids}.")
 
         # Check if there are multiple unique IDs
@@ -103,8 +118,13 @@ def Get_No_Manga_Found(app: object) -> None:
     """
     Logger.INFO("Function Get_No_Manga_Found called.")
     no_manga_found: list[tuple[str, Union[int, None]]] = return_no_manga_found()
+    cached_misses: set[str] = return_cached_misses()
     # Write the manga not found to a file
-    write_to_file("not_found", no_manga_found, formatter_not_found)
+    write_to_file(
+        "not_found",
+        no_manga_found,
+        lambda data: formatter_not_found(data, cached_misses),
+    )
     Logger.DEBUG("Wrote the list of manga not found to a file.")
     # Print the manga not found
     app.update_terminal("\nNot Found Manga:")
@@ -115,8 +135,9 @@ def Get_No_Manga_Found(app: object) -> None:
     else:
         for manga in no_manga_found:
             name, last_chapter_read = manga
+            status = "Not Found (Cached Miss)" if name in cached_misses else "Not Found"
             app.update_terminal(
-                f"{name}, Last Chapter Read: {last_chapter_read}, Status: Not Found"
+                f"{name}, Last Chapter Read: {last_chapter_read}, Status: {status}"
             )
             Logger.DEBUG(f"Printed info for manga not found: {name}.")
         app.update_terminal("\n")
@@ -3,16 +3,77 @@ This module contains the MangaSearch class which is used to search for a manga o
 """
 
 import json
+import logging
 import string
 import time
+from datetime import datetime
 from typing import List, Optional, Union
 
+import API.queries as Queries  # pylint: disable=E0401
 import pymoe  # type: ignore
-from Utils.cache import Cache  # pylint: disable=E0401
+import requests
+from API.rate_limit import get_rate_limiter  # pylint: disable=E0401
+from API.session import get_session  # pylint: disable=E0401
+from Utils.cache import (  # pylint: disable=E0401
+    Cache,
+    get_not_found_cache,
+    get_title_cache,
+)
 from Utils.log import Logger  # pylint: disable=E0401
 
 no_manga_found: list[tuple[str, Union[int, None]]] = []
 
+# Names of the manga not found that were not searched again because of an earlier miss
+cached_misses: set[str] = set()
+
+# Define how long to wait before searching again for a title not found, after the
+# first, second and any later miss
+NOT_FOUND_BACKOFF: tuple[float, ...] = (
+    24 * 60 * 60,
+    7 * 24 * 60 * 60,
+    30 * 24 * 60 * 60,
+)
+
+
+def anilist_manga_search(term: str, page: int = 1, per_page: int = 3) -> list[dict]:
+    """
+    Searches Anilist for manga matching the term through the shared session.
+
+    This sends the same search pymoe.manga.search.anilist.manga does, but over the
+    pooled AniList session, and raises pymoe's serverError on failure so the
+    existing error handling keeps working.
+
+    Parameters:
+        term (str): The search term.
+        page (int): The page of results to get. Defaults to 1.
+        per_page (int): The number of results per page. Defaults to 3.
+
+    Returns:
+        list: The media items found for the term.
+
+    Raises:
+        pymoe.utils.errors.serverError: If the response is not valid JSON or
+            contains errors.
+    """
+    Logger.INFO(f"Function anilist_manga_search called with term: {term}")
+    response = get_session().post(
+        {
+            "query": Queries.MANGA_SEARCH,
+            "variables": {"query": term, "page": page, "perPage": per_page},
+        }
+    )
+    try:
+        data = response.json()
+    except ValueError as e:
+        raise pymoe.utils.errors.serverError(  # pylint: disable=E1101
+            response.text, response.status_code
+        ) from e
+    if "errors" in data:
+        raise pymoe.utils.errors.serverError(  # pylint: disable=E1101
+            response.text, response.status_code
+        )
+    return data["data"]["Page"]["media"]
+
 
 def check_title_match(title: str, name: str) -> bool:
     """
@@ -30,20 +91,26 @@ def check_title_match(title: str, name: str) -> bool:
         bool: True if all words in the search name are in the title, False otherwise.
     """
     Logger.INFO("Function check_title_match called.")
-    Logger.DEBUG(f"Checking if all words in '{name}' are in '{title}'.")
+    # This runs for every title of every result, so only build the messages if logged
+    debug = Logger.is_enabled_for(logging.DEBUG)
+    if debug:
+        Logger.DEBUG(f"Checking if all words in '{name}' are in '{title}'.")
     # Remove punctuation from the title and the search name
     title = title.translate(str.maketrans("", "", string.punctuation))
     name = name.translate(str.maketrans("", "", string.punctuation))
-    Logger.DEBUG(f"Removed punctuation from '{title}' and '{name}'.")
+    if debug:
+        Logger.DEBUG(f"Removed punctuation from '{title}' and '{name}'.")
 
     # Split the title and the search name into words
     title_words = set(title.lower().split())
     name_words = set(name.lower().split())
-    Logger.DEBUG(f"Split '{title}' and '{name}' into words.")
+    if debug:
+        Logger.DEBUG(f"Split '{title}' and '{name}' into words.")
 
     # Check if all words in the search name are in the title
     match = name_words.issubset(title_words)
-    Logger.DEBUG(f"Match result: {match}")
+    if debug:
+        Logger.DEBUG(f"Match result: {match}")
     return match
 
 
@@ -58,6 +125,33 @@ def return_no_manga_found() -> list[tuple[str, Union[int, None]]]:
     return no_manga_found
 
 
+def return_cached_misses() -> set[str]:
+    """
+    Returns the names of the manga not found that were not searched again
+    because they were not found on an earlier run.
+
+    Returns:
+        set: The names of the manga.
+    """
+    Logger.INFO("Function return_cached_misses called.")
+    return cached_misses
+
+
+def normalize_title(title: str) -> str:
+    """
+    Normalizes a title by removing punctuation, lowercasing it and collapsing whitespace.
+
+    Parameters:
+        title (str): The title to normalize.
+
+    Returns:
+        str: The normalized title.
+    """
+    return " ".join(
+        title.translate(str.maketrans("", "", string.punctuation)).lower().split()
+    )
+
+
 class MangaSearch:  # pylint: disable=R0902
     """
     A class used to search for a manga on Anilist.
@@ -67,7 +161,6 @@ class MangaSearch:  # pylint: disable=R0902
         last_chapter_read (int): The last chapter read of the manga.
         app: The application object used to update the terminal and progress.
         max_retries (int, optional): The maximum number of retries. Defaults to 5.
-        delay (int, optional): The delay between retries in seconds. Defaults to 15.
         retry_count (int): The current number of retries.
         matches (list): The list of matches from the search results.
         id_list (list): The list of IDs for the matches.
@@ -90,7 +183,9 @@ class MangaSearch:  # pylint: disable=R0902
         last_chapter_read: Union[int, None],
         app: object,
         max_retries: int = 3,
-        delay: float = 60,
+        title_index: Optional[object] = None,
+        cache: Optional[Cache] = None,
+        not_found_cache: Optional[Cache] = None,
     ) -> None:
         """
         Initializes the MangaSearch object.
@@ -100,28 +195,35 @@ class MangaSearch:  # pylint: disable=R0902
             last_chapter_read (int): The last chapter read of the manga.
             app: The application object used to update the terminal and progress.
             max_retries (int, optional): The maximum number of retries. Defaults to 5.
-            delay (float, optional): The delay between retries in seconds. Defaults to 15.
             retry_count (int): The current number of retries.
             matches (list): The list of matches from the search results.
             id_list (list): The list of IDs for the matches.
             cache: The cache object used to store the manga data.
+            title_index (TitleIndex, optional): The index of the titles on the user's
+                list, checked before searching Anilist.
+            cache (Cache, optional): The title cache. The cache shared by the whole
+                process is used if not given.
+            not_found_cache (Cache, optional): The cache of the titles not found on
+                earlier runs. The cache shared by the whole process is used if not given.
         """
         Logger.INFO("Function __init__ called.")
         Logger.DEBUG(
             f"Parameters - name: {name}, "
             f"last_chapter_read: {last_chapter_read}, "
-            f"max_retries: {max_retries}, "
-            f"delay: {delay}"
+            f"max_retries: {max_retries}"
         )
         self.name: str = name
         self.last_chapter_read: Union[int, None] = last_chapter_read
         self.app: object = app
         self.max_retries: int = max_retries
-        self.delay: float = delay
         self.retry_count: int = 0
         self.matches: list = []
         self.id_list: list = []
-        self.cache = Cache("Manga_Data/title_cache.json")
+        self.cache = cache if cache is not None else get_title_cache()
+        self.not_found_cache = (
+            not_found_cache if not_found_cache is not None else get_not_found_cache()
+        )
+        self.title_index = title_index
         Logger.DEBUG("MangaSearch object initialized.")
 
     def search_manga(self):  # pylint: disable=R1710
@@ -139,7 +241,7 @@ class MangaSearch:  # pylint: disable=R0902
                 f"Attempt {attempt+1} of {max_retries} to search for manga: {self.name}"
             )
             try:
-                result = pymoe.manga.search.anilist.manga(self.name)
+                result = anilist_manga_search(self.name)
                 Logger.DEBUG(f"Search successful. Found {len(result)} results.")
                 return result[:100]
             except (
@@ -149,12 +251,13 @@ class MangaSearch:  # pylint: disable=R0902
                 # Handle server error
                 Logger.ERROR(f"Error encountered: {e}")
                 if "Too Many Requests" in str(e):
+                    # The rate limiter holds back the next attempt until it is allowed
+                    wait_time = round(get_rate_limiter().wait_time())
                     self.app.update_terminal(
-                        f"\nToo Many Requests For Pymoe. Retrying in {self.delay} seconds..."
+                        f"\nToo Many Requests For Search. Retrying in {wait_time} seconds..."
                     )
                     Logger.WARNING("Too many requests. Delaying next attempt.")
-                    self.app.update_estimated_time_remaining(add_time=self.delay)
-                    time.sleep(self.delay)
+                    self.app.update_estimated_time_remaining(add_time=wait_time)
                     self.retry_count += 1
                 else:
                     self.app.update_terminal(
@@ -163,6 +266,17 @@ class MangaSearch:  # pylint: disable=R0902
                     )
                     Logger.WARNING("Unexpected error. Retrying in 2 seconds.")
                     time.sleep(2)
+            except requests.exceptions.RequestException as e:
+                # A timeout or a dropped connection, wait longer after each one
+                wait_time = 2 ** (attempt + 1)
+                Logger.ERROR(f"Request failed: {e}")
+                self.app.update_terminal(
+                    f"\nThe search for {self.name} failed: {e}. "
+                    f"Retrying in {wait_time} seconds..."
+                )
+                Logger.WARNING(f"Request failed. Retrying in {wait_time} seconds.")
+                self.app.update_estimated_time_remaining(add_time=wait_time)
+                time.sleep(wait_time)
         self.app.update_terminal(
             f"Failed to search for {self.name} after {max_retries} attempts."
         )
@@ -182,19 +296,24 @@ class MangaSearch:  # pylint: disable=R0902
         Logger.INFO("Function process_manga_item called.")
         title = manga_item["title"]
         match = False
+        # This runs for every search result, so only build the messages if logged
+        debug = Logger.is_enabled_for(logging.DEBUG)
         if "english" in title and title["english"]:
             english_title = self.process_title(title["english"])
             match = match or self._check_title_match(english_title)
-            Logger.DEBUG(f"Checked English title: {english_title}. Match: {match}")
+            if debug:
+                Logger.DEBUG(f"Checked English title: {english_title}. Match: {match}")
         if "romaji" in title and title["romaji"]:
             romaji_title = self.process_title(title["romaji"])
             match = match or self._check_title_match(romaji_title)
-            Logger.DEBUG(f"Checked Romaji title: {romaji_title}. Match: {match}")
+            if debug:
+                Logger.DEBUG(f"Checked Romaji title: {romaji_title}. Match: {match}")
         if "synonyms" in manga_item:
             for synonym in manga_item["synonyms"]:
                 synonym = self.process_title(synonym)
                 match = match or self._check_title_match(synonym)
-                Logger.DEBUG(f"Checked synonym: {synonym}. Match: {match}")
+                if debug:
+                    Logger.DEBUG(f"Checked synonym: {synonym}. Match: {match}")
         if match:
             self.matches.append((match, manga_item))
             Logger.INFO("Match found. Added to matches.")
@@ -211,11 +330,14 @@ class MangaSearch:  # pylint: disable=R0902
             str: The processed title.
         """
         Logger.INFO("Function process_title called.")
-        Logger.DEBUG(f"Processing title: {title}")
+        debug = Logger.is_enabled_for(logging.DEBUG)
+        if debug:
+            Logger.DEBUG(f"Processing title: {title}")
         title = title.replace("-", " ")
         title = title.replace("\u2019", "\u0060")
         title = title.replace("`", "'")
-        Logger.DEBUG(f"Processed title: {title}")
+        if debug:
+            Logger.DEBUG(f"Processed title: {title}")
         return title
 
     def _check_title_match(self, title: str) -> bool:
@@ -229,9 +351,12 @@ class MangaSearch:  # pylint: disable=R0902
             bool: True if the title matches the name, False otherwise.
         """
         Logger.INFO("Function _check_title_match called.")
-        Logger.DEBUG(f"Checking if title: {title} matches name: {self.name}")
+        debug = Logger.is_enabled_for(logging.DEBUG)
+        if debug:
+            Logger.DEBUG(f"Checking if title: {title} matches name: {self.name}")
         match = check_title_match(title, self.name)
-        Logger.DEBUG(f"Match result: {match}")
+        if debug:
+            Logger.DEBUG(f"Match result: {match}")
         return match
 
     def get_id_list(self) -> None:
@@ -280,15 +405,66 @@ class MangaSearch:  # pylint: disable=R0902
         if not self.id_list:
             self.app.update_terminal(f"\nNo manga found for '{self.name}'.")
             Logger.WARNING(f"No manga found for '{self.name}'.")
-            no_manga_found.append((self.name, self.last_chapter_read))
-            Logger.DEBUG(f"Added '{self.name}' to the list of manga not found.")
+            self.record_not_found()
+
+    def record_not_found(self) -> None:
+        """
+        Adds the manga to the list of manga not found and records the miss in the
+        not found cache.
+        """
+        no_manga_found.append((self.name, self.last_chapter_read))
+        Logger.DEBUG(f"Added '{self.name}' to the list of manga not found.")
+        self.cache_miss()
+
+    def cache_miss(self) -> None:
+        """
+        Records a miss in the not found cache, so the title is only searched again
+        after a backoff of one day, then one week, then one month.
+        """
+        key = normalize_title(self.name)
+        miss = self.not_found_cache.get(key) or {}
+        attempts = miss.get("attempts", 0) + 1
+        backoff = NOT_FOUND_BACKOFF[min(attempts, len(NOT_FOUND_BACKOFF)) - 1]
+        self.not_found_cache.set(
+            key, {"attempts": attempts, "next_attempt": time.time() + backoff}
+        )
+        Logger.DEBUG(
+            f"Recorded miss {attempts} for '{self.name}'. "
+            f"Searching again in {backoff} seconds."
+        )
+
+    def check_cached_miss(self) -> bool:
+        """
+        Checks if the manga was not found on an earlier run and should not be
+        searched again yet. If so, it is added to the list of manga not found as a
+        cached miss.
+
+        Returns:
+            bool: True if the search should be skipped, False otherwise.
+        """
+        miss = self.not_found_cache.get(normalize_title(self.name))
+        if not miss or miss.get("next_attempt", 0) <= time.time():
+            return False
+        next_attempt = datetime.fromtimestamp(miss["next_attempt"])
+        self.app.update_terminal(
+            f"\nNo manga found for '{self.name}' on an earlier run. "
+            f"Searching again after {next_attempt:%Y-%m-%d %H:%M}."
+        )
+        Logger.INFO(
+            f"Skipping search for '{self.name}', not found {miss.get('attempts')} "
+            f"times. Next search after {next_attempt}."
+        )
+        no_manga_found.append((self.name, self.last_chapter_read))
+        cached_misses.add(self.name)
+        return True
 
     def handle_server_error(self, e: Exception) -> None:
         """
         Handles server errors.
 
         This method checks if the error is a "Too Many Requests" error.
-        If so, it waits for a delay and increments the retry count.
+        If so, it reports how long the rate limiter will hold back the next attempt
+        and increments the retry count.
         If the error is not a "Too Many Requests" error, it prints an error message.
 
         Parameters:
@@ -296,11 +472,12 @@ class MangaSearch:  # pylint: disable=R0902
         """
         Logger.INFO("Function handle_server_error called.")
         if "Too Many Requests" in str(e):
+            # The rate limiter holds back the next attempt until it is allowed
+            wait_time = round(get_rate_limiter().wait_time())
             self.app.update_terminal(
-                f"\nToo Many Requests For Pymoe. Retrying in {self.delay} seconds..."
+                f"\nToo Many Requests For Search. Retrying in {wait_time} seconds..."
             )
-            Logger.WARNING("Too Many Requests For Pymoe. Retrying.")
-            time.sleep(self.delay)
+            Logger.WARNING("Too Many Requests For Search. Retrying.")
             self.retry_count += 1
             Logger.DEBUG(f"Incremented retry count to {self.retry_count}.")
         else:
@@ -321,8 +498,14 @@ class MangaSearch:  # pylint: disable=R0902
             Logger.DEBUG(f"Search results for manga: {manga}.")
         if manga is None or not manga:
             Logger.DEBUG("No search results for manga.")
+            if manga is not None:
+                # The search succeeded but found nothing, so the title is not on Anilist
+                self.cache_miss()
             return False
         for manga_item in manga:
+            if self.title_index is not None:
+                # Remember the titles of every result for the next runs
+                self.title_index.add_media(manga_item)
             self.process_manga_item(manga_item)
         self.retry_count = 0  # Reset the retry count after a successful search
         Logger.DEBUG("Reset retry count after a successful search.")
@@ -340,8 +523,7 @@ class MangaSearch:  # pylint: disable=R0902
         elif isinstance(error, IndexError):
             self.app.update_terminal(f"\nNo search results found for '{self.name}'.")
             Logger.WARNING(f"No search results found for '{self.name}'.")
-            no_manga_found.append((self.name, self.last_chapter_read))
-            Logger.DEBUG(f"Added '{self.name}' to the list of manga not found.")
+            self.record_not_found()
         elif isinstance(error, KeyError):
             self.app.update_terminal(
                 f"\nFailed to get data for '{self.name}', retrying..."
@@ -373,6 +555,18 @@ class MangaSearch:  # pylint: disable=R0902
             Logger.INFO(f"Found manga: {self.name} in cache.")
             return cached_result
 
+        # Check if the manga is in the index of the titles seen before
+        if self.title_index is not None and self.name != "Skipping Title":
+            result = self.title_index.find(self.name)
+            if result:
+                self.app.update_terminal(f"\nFound manga: {self.name} in title index.")
+                Logger.INFO(f"Found manga: {self.name} in title index: {result}.")
+                return result
+
+        # Check if the manga was not found on an earlier run
+        if self.name != "Skipping Title" and self.check_cached_miss():
+            return result
+
         while self.retry_count < self.max_retries:
             Logger.DEBUG(
                 f"Retry count: {self.retry_count}. Max retries: {self.max_retries}."
@@ -394,8 +588,7 @@ class MangaSearch:  # pylint: disable=R0902
                         f"\nNo search results found for '{self.name}'."
                     )
                     Logger.WARNING(f"No search results found for '{self.name}'.")
-                    no_manga_found.append((self.name, self.last_chapter_read))
-                    Logger.DEBUG(f"Added '{self.name}' to the list of manga not found.")
+                    self.record_not_found()
                     break
                 self.get_id_list()
                 self.print_details()
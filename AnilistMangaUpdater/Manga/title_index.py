@@ -0,0 +1,230 @@
+"""
+This module contains the TitleIndex class, a persistent index of manga titles.
+
+The index maps every word of the English and Romaji titles and the synonyms of a
+manga to its ID, so that the manga whose titles contain all the words of a name
+can be found without searching Anilist. A title matches a name the same way as
+in MangaSearch: punctuation is removed and every word of the name must be one of
+the words of the title.
+
+Every search result and every manga on the user's list is added to the shared
+index, which is saved to title_index.json in the cache directory (Manga_Data by
+default) and loaded again on the next run, so titles seen before no longer need
+a search.
+
+Several runs can share the index file. Saving takes a file lock, merges the
+titles other runs saved since the index was loaded and writes the union, so no
+run overwrites another's titles. Before each lookup the index also picks up the
+titles other runs saved in the meantime.
+"""
+
+# pylint: disable=W0603
+
+import json
+import os
+import string
+import threading
+from typing import Iterable, Optional, Union
+
+from Manga.manga_search import MangaSearch  # pylint: disable=E0401
+from Utils import cache  # pylint: disable=E0401
+from Utils.file_lock import file_lock  # pylint: disable=E0401
+from Utils.log import Logger  # pylint: disable=E0401
+
+# Define the name of the file the shared title index is saved to, in the cache directory
+TITLE_INDEX_NAME: str = "title_index.json"
+
+_punctuation_table = str.maketrans("", "", string.punctuation)
+
+
+def title_words(title: str) -> frozenset[str]:
+    """
+    Splits a title into the words used to match it against a name.
+
+    Parameters:
+        title (str): The title to split.
+
+    Returns:
+        frozenset: The lowercase words of the title without punctuation.
+    """
+    return frozenset(
+        MangaSearch.process_title(title).translate(_punctuation_table).lower().split()
+    )
+
+
+class TitleIndex:
+    """
+    An inverted index from title words to manga IDs.
+
+    Attributes:
+        index_file (str): The file the index is saved to, if any.
+        postings (dict): The IDs of the manga with a title containing each word.
+        titles (dict): The words of each title of each manga, by manga ID.
+    """
+
+    def __init__(self, index_file: Optional[str] = None) -> None:
+        self.index_file: Union[str, None] = index_file
+        self.postings: dict[str, set[int]] = {}
+        self.titles: dict[int, set[frozenset[str]]] = {}
+        self._raw_titles: dict[int, list[str]] = {}
+        self._positions: dict[int, int] = {}
+        self._dirty: bool = False
+        # The modification time of the file when it was last loaded or saved
+        self._mtime: Union[float, None] = None
+        self._lock = threading.RLock()
+        if self.index_file is not None:
+            self.load()
+
+    def load(self) -> None:
+        """
+        Loads the index from its file, merging it into the titles already indexed.
+        """
+        if self.index_file is None:
+            return
+        Logger.INFO(f"Loading title index from file: {self.index_file}")
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                mtime = os.fstat(f.fileno()).st_mtime
+                raw_titles: dict[str, list[str]] = json.load(f)
+        except FileNotFoundError:
+            Logger.INFO("Title index file not found. Starting with an empty index.")
+            return
+        except json.JSONDecodeError:
+            Logger.WARNING(
+                "Title index file is not valid. Starting with an empty index."
+            )
+            return
+        with self._lock:
+            # The titles from the file do not need saving, only those added here
+            dirty = self._dirty
+            for media_id, titles in raw_titles.items():
+                self.add(int(media_id), titles)
+            self._dirty = dirty
+            self._mtime = mtime
+        Logger.INFO(f"Loaded {len(self.titles)} manga into the title index.")
+
+    def refresh(self) -> None:
+        """
+        Loads the titles saved to the index file by other runs since it was last
+        loaded or saved.
+        """
+        if self.index_file is None:
+            return
+        try:
+            mtime = os.stat(self.index_file).st_mtime
+        except FileNotFoundError:
+            return
+        if mtime != self._mtime:
+            Logger.INFO("Title index file changed. Merging the new titles.")
+            self.load()
+
+    def save(self) -> None:
+        """
+        Saves the index to its file if it changed since it was loaded or saved,
+        keeping the titles saved by other runs in the meantime.
+        """
+        if self.index_file is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            Logger.INFO(f"Saving title index to file: {self.index_file}")
+            with file_lock(self.index_file):
+                self.refresh()
+                temp_file = f"{self.index_file}.tmp"
+                with open(temp_file, "w", encoding="utf-8") as f:
+                    json.dump(self._raw_titles, f)
+                os.replace(temp_file, self.index_file)
+                self._mtime = os.stat(self.index_file).st_mtime
+            self._dirty = False
+
+    def add(self, media_id: int, titles: Iterable[Union[str, None]]) -> None:
+        """
+        Adds the titles of a manga to the index.
+
+        Parameters:
+            media_id (int): The ID of the manga.
+            titles (iterable): The English and Romaji titles and synonyms of the
+                manga. Missing titles are skipped.
+        """
+        with self._lock:
+            self._positions.setdefault(media_id, len(self._positions))
+            manga_titles = self.titles.setdefault(media_id, set())
+            for title in titles:
+                if not title:
+                    continue
+                words = title_words(title)
+                if not words or words in manga_titles:
+                    continue
+                manga_titles.add(words)
+                self._raw_titles.setdefault(media_id, []).append(title)
+                self._dirty = True
+                for word in words:
+                    self.postings.setdefault(word, set()).add(media_id)
+
+    def add_media(self, media: dict) -> None:
+        """
+        Adds the titles of a media item from an Anilist response to the index.
+
+        Parameters:
+            media (dict): The media item, with 'id', 'title' and 'synonyms' keys.
+        """
+        title = media.get("title") or {}
+        self.add(
+            media["id"],
+            [
+                title.get("english"),
+                title.get("romaji"),
+                *(media.get("synonyms") or []),
+            ],
+        )
+
+    def find(self, name: str) -> list[int]:
+        """
+        Finds the manga with a title containing every word of the name.
+
+        Parameters:
+            name (str): The name to look for.
+
+        Returns:
+            list: The IDs of the matching manga, in the order they were added.
+        """
+        name_words = title_words(name)
+        if not name_words:
+            return []
+        self.refresh()
+        with self._lock:
+            # Only the manga with every word of the name in one of their titles match
+            candidates = set.intersection(
+                *(self.postings.get(word, set()) for word in name_words)
+            )
+            matches = [
+                media_id
+                for media_id in sorted(candidates, key=self._positions.__getitem__)
+                if any(name_words <= words for words in self.titles[media_id])
+            ]
+        Logger.DEBUG(f"Found {len(matches)} manga in the title index for: {name}")
+        return matches
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+
+_title_index: Union[TitleIndex, None] = None
+_title_index_lock = threading.Lock()
+
+
+def get_title_index() -> TitleIndex:
+    """
+    Gets the shared title index, loading it from its file if needed.
+
+    Returns:
+        TitleIndex: The shared title index.
+    """
+    global _title_index
+    with _title_index_lock:
+        if _title_index is None:
+            _title_index = TitleIndex(
+                os.path.join(cache.CACHE_DIRECTORY, TITLE_INDEX_NAME)
+            )
+        return _title_index
@@ -2,6 +2,10 @@
 This module contains functions for reading manga data from a CSV file,
 getting the difference between the current and previous file,
 getting the manga names and their details, and printing the manga found in the CSV file.
+
+The alternative titles are read from Manga_Data/alternative_titles.json only when
+a run needs them, through get_alternative_titles, and are passed to the functions
+that use them.
 """
 
 # pylint: disable=C0103, W0602, W0603, E0401
@@ -10,17 +14,30 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Union
 
 import pandas as pd
-from Utils.dictionaries import alternative_titles_dict
-from Utils.log import Logger
+from Utils import dictionaries
+from Utils.log import Logger, correlate
 from Utils.WriteToFile import Get_Alt_Titles_From_File
 
 # Initialize an empty dictionary to store the manga names and chapters
 manga_names_chapters = {}
 
-alternative_titles_dict = Get_Alt_Titles_From_File(alternative_titles_dict)
 
+def get_alternative_titles() -> dict:
+    """
+    Gets the alternative titles, creating the file from the bundled ones if needed.
+
+    The file is read on every call so that titles edited in the GUI are used by
+    the next run.
 
-def Manga_Found_In_CSV(app: object) -> None:  # pylint: disable=R1710
+    Returns:
+        dict: The alternative titles.
+    """
+    return Get_Alt_Titles_From_File(dictionaries.alternative_titles_dict())
+
+
+def Manga_Found_In_CSV(  # pylint: disable=R1710
+    app: object, alt_titles_dict: dict
+) -> None:
     """
     Prints the manga found in the CSV file.
 
@@ -29,12 +46,14 @@ def Manga_Found_In_CSV(app: object) -> None:  # pylint: disable=R1710
 
     Parameters:
         app (App): The application object.
+        alt_titles_dict (dict): A dictionary where keys are manga names and
+        values are alternative titles.
 
     Returns:
         None
     """
     Logger.INFO("Function Manga_Found_In_CSV called.")
-    manga_with_last_chapter = Get_Manga_Names(app, alternative_titles_dict)
+    manga_with_last_chapter = Get_Manga_Names(app, alt_titles_dict)
     Logger.DEBUG("Retrieved manga with last chapter from CSV file.")
 
     with ThreadPoolExecutor(max_workers=1) as executor:
@@ -127,39 +146,42 @@ def Get_Manga_Names(app: object, alt_titles_dict: dict):
                 title: str = str(row.title)
                 # Get the alternative title
                 alt_title: str = get_alternative_title(title, alt_titles_dict)
-                last_chapter_read = row.last_chapter_read
-                status = row.status
-                last_read_at = row.last_read_at
-                Logger.DEBUG(
-                    f"Processing row: {title}, {last_chapter_read}, {status}, {last_read_at}"
-                )
-
-                try:
-                    # Add the alternative title and its details to the manga_names_chapters
-                    manga_names_chapters[alt_title] = {
-                        "last_chapter_read": (
-                            int(last_chapter_read)
-                            if isinstance(last_chapter_read, (int, float, str))
-                            else None
-                        ),
-                        "status": status,
-                        "last_read_at": last_read_at,
-                    }
+                with correlate(alt_title):
+                    last_chapter_read = row.last_chapter_read
+                    status = row.status
+                    last_read_at = row.last_read_at
                     Logger.DEBUG(
-                        f"Added {alt_title} to manga_names_chapters dictionary."
+                        f"Processing row: {title}, {last_chapter_read}, {status}, {last_read_at}"
                     )
-                except (ValueError, AttributeError):
-                    # If no last chapter read, print a message and add the alternative title
-                    Logger.DEBUG(f"Title: {alt_title}, Has no Last Chapter Read")
-                    Logger.DEBUG(f"Title: {alt_title}, Status: {status}")
-                    app.update_terminal(f"Title: {alt_title}, Has no Last Chapter Read")
-                    app.update_terminal(status)
-                    if status in ("plan_to_read", "on_hold"):
-                        manga_names_chapters[alt_title] = {"status": status}
+
+                    try:
+                        # Add the alternative title and its details to the manga_names_chapters
+                        manga_names_chapters[alt_title] = {
+                            "last_chapter_read": (
+                                int(last_chapter_read)
+                                if isinstance(last_chapter_read, (int, float, str))
+                                else None
+                            ),
+                            "status": status,
+                            "last_read_at": last_read_at,
+                        }
                         Logger.DEBUG(
-                            f"Added {alt_title} to manga_names_chapters dictionary "
-                            f"with status {status}."
+                            f"Added {alt_title} to manga_names_chapters dictionary."
+                        )
+                    except (ValueError, AttributeError):
+                        # If no last chapter read, print a message and add the alternative title
+                        Logger.DEBUG(f"Title: {alt_title}, Has no Last Chapter Read")
+                        Logger.DEBUG(f"Title: {alt_title}, Status: {status}")
+                        app.update_terminal(
+                            f"Title: {alt_title}, Has no Last Chapter Read"
                         )
+                        app.update_terminal(status)
+                        if status in ("plan_to_read", "on_hold"):
+                            manga_names_chapters[alt_title] = {"status": status}
+                            Logger.DEBUG(
+                                f"Added {alt_title} to manga_names_chapters dictionary "
+                                f"with status {status}."
+                            )
         except AttributeError:
             Logger.ERROR("AttributeError encountered. Returning None.")
             return None
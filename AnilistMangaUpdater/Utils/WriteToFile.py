@@ -3,7 +3,8 @@ This module contains functions to manage and write data to files.
 
 It includes functions to save and retrieve alternative titles of manga,
 manage files in a directory, write names of not found manga and manga with
-multiple IDs to files, and write the number of chapters updated to a file.
+multiple IDs to files, write the number of chapters updated to a file, write
+the cache stats of the last run to a JSON file, and write and read mutation plans.
 """
 
 # pylint: disable=C0103
@@ -167,13 +168,17 @@ def write_to_file(filename: str, data: Optional[Union[list, dict]], formatter) -
     Logger.INFO("Managed files in directory.")
 
 
-def formatter_not_found(not_found_manga_names: list) -> list:
+def formatter_not_found(
+    not_found_manga_names: list, cached_misses: Optional[set] = None
+) -> list:
     """
     Formats not found manga names for writing to a file.
 
     Parameters:
         not_found_manga_names (list): A list of tuples, where each tuple contains a
         manga name and the last chapter read.
+        cached_misses (set, optional): The names of the manga that were not searched
+        again because they were not found on an earlier run.
 
     Returns:
         list: A list of strings formatted for writing to a file.
@@ -193,9 +198,14 @@ def formatter_not_found(not_found_manga_names: list) -> list:
             search_link = (
                 f"https://anilist.co/search/manga?search={name.replace(' ', '%20')}"
             )
+            # Mark the manga not searched again because of an earlier miss
+            cached_miss = (
+                " (Cached Miss)" if cached_misses and name in cached_misses else ""
+            )
             # Write manga name, last chapter read, and search link to file
             lines.append(
-                f"{name} - Last Chapter Read: {last_chapter_read}, Search Link: {search_link}\n"
+                f"{name}{cached_miss} - Last Chapter Read: {last_chapter_read}, "
+                f"Search Link: {search_link}\n"
             )
     return lines
 
@@ -263,3 +273,70 @@ def write_chapters_updated_to_file(filename: str, data: int) -> None:
         timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         file.write(f"{timestamp} | Chapters Updated: {data}\n")
     Logger.INFO("Finished appending to file.")
+
+
+def write_cache_stats_to_file(stats: dict, filename: str = "cache_stats") -> None:
+    """
+    Writes the cache stats of the run to a JSON file, replacing the previous ones.
+
+    Parameters:
+        stats (dict): The stats of each cache, by cache name.
+        filename (str): The name of the file to write to, without extension.
+
+    Returns:
+        None
+    """
+    Logger.INFO(f"Function write_cache_stats_to_file called with filename: {filename}")
+    create_directory_if_not_exists(directory)
+    path = f"{directory}/{filename}.json"
+    # Write to a temporary file first so the stats are never left half written
+    with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+        Logger.DEBUG(f"Writing to file: {path}")
+        json.dump(
+            {
+                "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                "caches": stats,
+            },
+            file,
+            indent=4,
+        )
+    os.replace(f"{path}.tmp", path)
+    Logger.INFO("Finished writing to file.")
+
+
+def write_mutation_plan_to_file(plan: dict, file_path: str) -> None:
+    """
+    Writes a mutation plan to a JSON file, replacing the previous one.
+
+    Parameters:
+        plan (dict): The mutation plan.
+        file_path (str): The path of the file to write to.
+
+    Returns:
+        None
+    """
+    Logger.INFO(f"Function write_mutation_plan_to_file called with path: {file_path}")
+    create_directory_if_not_exists(os.path.dirname(file_path) or ".")
+    # Write to a temporary file first so the plan is never left half written
+    with open(f"{file_path}.tmp", "w", encoding="utf-8") as file:
+        Logger.DEBUG(f"Writing to file: {file_path}")
+        json.dump(plan, file, indent=4, ensure_ascii=False)
+    os.replace(f"{file_path}.tmp", file_path)
+    Logger.INFO("Finished writing to file.")
+
+
+def read_mutation_plan_from_file(file_path: str) -> dict:
+    """
+    Reads a mutation plan written by write_mutation_plan_to_file.
+
+    Parameters:
+        file_path (str): The path of the file to read.
+
+    Returns:
+        dict: The mutation plan.
+    """
+    Logger.INFO(f"Function read_mutation_plan_from_file called with path: {file_path}")
+    with open(file_path, "r", encoding="utf-8") as file:
+        plan: dict = json.load(file)
+    Logger.INFO(f"Read a mutation plan with {len(plan.get('entries', []))} entries.")
+    return plan
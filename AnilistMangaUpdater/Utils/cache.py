@@ -1,11 +1,46 @@
 """
 This module contains the Cache class which provides a simple caching mechanism.
-It stores key-value pairs in a JSON file located in the Manga_Data directory.
+It stores key-value pairs in an SQLite database located in the Manga_Data directory.
+
+The database is kept in WAL mode and the keys are the primary key of the table,
+so getting or setting a value costs a single indexed lookup instead of rewriting
+the whole cache. On first open, the values of the JSON cache file used before
+(or the bundled defaults if there is none) are migrated into the database.
+
+Values are written behind: a set only updates the values kept in memory, and a
+background thread writes the changed values to the database every few seconds
+or once enough of them have changed. Each flush is a single transaction, so a
+crash leaves either all or none of a flush in the database, never a truncated cache.
+
+Every value records when it was set and when it was last read. Values older than
+the cache's time to live are treated as missing so they are looked up again, and
+once the cache holds more than its maximum number of values, the least recently
+read ones are evicted. The values are only counted once the values written since
+the last count could have taken the cache over its maximum.
+
+Each cache counts its hits, misses, sets, evictions and expirations, along with
+its size on disk and the time spent loading and flushing it. Get_Cache_Stats
+collects them for every shared cache so they can be reported after a run.
+
+Several runs can share the caches at once. A run waits for another run's write
+to finish instead of failing, every get reads the database so it sees the values
+other runs saved, and a flush only writes the values changed by this run, so the
+values of other runs are merged rather than overwritten. When two runs set the
+same key, the value set last is kept. Each cache has its own lock, and a flush
+writes through a connection of its own without holding it, so a flush waiting
+for another run's write never holds up the gets and sets of this run.
+
+Each cache file is opened once per process with open_cache, and the same
+thread-safe instance is shared by every caller. flush_caches and close_caches
+are the lifecycle hooks called at the end of a run and when the application closes.
 """
 
 import json
 import os
-from typing import Any, Union
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Union
 
 from Utils.dictionaries import (  # pylint: disable=E0401
     cache_format_dict,
@@ -13,53 +48,386 @@ from Utils.dictionaries import (  # pylint: disable=E0401
 )
 from Utils.log import Logger  # pylint: disable=E0401
 
+# Define the directory and the files of the caches shared by the whole process
+CACHE_DIRECTORY: str = "Manga_Data"
+TITLE_CACHE_FILE: str = "Manga_Data/title_cache.json"
+FORMAT_CACHE_FILE: str = "Manga_Data/format_cache.json"
+NOT_FOUND_CACHE_FILE: str = "Manga_Data/not_found_cache.json"
+
+# Define after how many seconds, or how many changed values, the changes are flushed
+DEFAULT_FLUSH_INTERVAL: float = 5
+DEFAULT_FLUSH_SIZE: int = 100
+
+# Define how long a title is trusted before it is searched again, and how many
+# values a cache keeps at most
+SECONDS_PER_DAY: int = 24 * 60 * 60
+DEFAULT_TITLE_CACHE_TTL: Union[float, None] = 90 * SECONDS_PER_DAY
+DEFAULT_FORMAT_CACHE_TTL: Union[float, None] = None
+DEFAULT_MAX_ENTRIES: Union[int, None] = 20000
+
+# Define how many seconds to wait for another process writing to a cache
+BUSY_TIMEOUT: float = 30
+
+# Serializes opening and closing the shared caches
+_cache_lock = threading.RLock()
+
 
 class Cache:
     """
-    A simple caching class that stores key-value pairs in a JSON file.
+    A simple caching class that stores key-value pairs in an SQLite database.
 
     Attributes:
-        cache_file (str): The path to the file where the cache is stored.
-        cache (dict): The cache data.
+        cache_file (str): The path to the JSON file the cache was stored in before.
+        db_file (str): The path to the database where the cache is stored.
+        connection (sqlite3.Connection): The connection the values are read through.
+        flush_interval (float): The seconds between two flushes of the changes.
+        flush_size (int): The number of changed values that triggers a flush.
+        ttl (float): The seconds a value is kept before it expires, or None to
+            keep values forever.
+        max_entries (int): The maximum number of values kept, or None for no limit.
+        hits (int): The number of gets that found a value.
+        misses (int): The number of gets that found no value or an expired one.
+        sets (int): The number of values set.
+        evictions (int): The number of values evicted to stay under max_entries.
+        expirations (int): The number of values removed because they expired.
+        flushes (int): The number of times the changes were saved to the database.
+        load_time (float): The seconds spent opening the database.
+        flush_time (float): The seconds spent saving the changes to the database.
     """
 
-    def __init__(self, cache_file: str) -> None:
+    def __init__(  # pylint: disable=R0913
+        self,
+        cache_file: str,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_size: int = DEFAULT_FLUSH_SIZE,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = DEFAULT_MAX_ENTRIES,
+    ) -> None:
         self.cache_file: str = cache_file
-        self.cache: dict = {}  # Initialize cache as an empty dictionary
-        Logger.INFO(f"Cache initialized with file: {self.cache_file}")
+        self.db_file: str = f"{os.path.splitext(cache_file)[0]}.db"
+        self.connection: Union[sqlite3.Connection, None] = None
+        self._write_connection: Union[sqlite3.Connection, None] = None
+        self.flush_interval: float = flush_interval
+        self.flush_size: int = max(flush_size, 1)
+        self.ttl: Union[float, None] = ttl
+        self.max_entries: Union[int, None] = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self.sets: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self.flushes: int = 0
+        self.load_time: float = 0
+        self.flush_time: float = 0
+        # Values set since the last flush with the time they were set, and the
+        # keys read since the last flush with the time they were read
+        self._dirty: dict[str, tuple[Any, float]] = {}
+        self._accessed: dict[str, float] = {}
+        # Values being written by a flush, read from memory until they are written
+        self._flushing: dict[str, tuple[Any, float]] = {}
+        # The values in the database when they were last counted, plus the
+        # values written since, so they are only counted again past max_entries
+        self._entries_bound: int = 0
+        # _lock guards the values in memory and the reads, and _write_lock the
+        # writes, so a write waiting for another process does not block the reads
+        self._lock = threading.RLock()
+        self._write_lock = threading.RLock()
+        self._flush_event = threading.Event()
+        self._flusher: Union[threading.Thread, None] = None
+        Logger.INFO(f"Cache initialized with file: {self.db_file}")
         self.load_cache()
 
     def load_cache(self) -> None:
         """
-        Loads the cache from a file.
+        Opens the database, migrating the JSON cache into it on first open.
         """
         Logger.INFO("Loading cache from file.")
+        start_time = time.perf_counter()
+        with self._write_lock, self._lock:
+            os.makedirs(os.path.dirname(self.db_file) or ".", exist_ok=True)
+            connection = self.connect()
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache "
+                    "(key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "updated_at REAL, accessed_at REAL)"
+                )
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS metadata "
+                    "(name TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+                self.add_timestamps(connection)
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS cache_updated_at ON cache (updated_at)"
+                )
+                connection.execute(
+                    "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+                )
+            migrated = connection.execute(
+                "SELECT value FROM metadata WHERE name = 'migrated'"
+            ).fetchone()
+            if migrated is None:
+                self.migrate(connection)
+            (self._entries_bound,) = connection.execute(
+                "SELECT COUNT(*) FROM cache"
+            ).fetchone()
+            self._write_connection = connection
+            self.connection = self.connect()
+            self._flush_event.clear()
+            self._flusher = threading.Thread(
+                target=self._flush_periodically,
+                name=f"cache-flusher-{os.path.basename(self.db_file)}",
+                daemon=True,
+            )
+            self._flusher.start()
+            self.load_time += time.perf_counter() - start_time
+        Logger.INFO("Cache loaded successfully.")
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Opens a connection to the database.
+
+        Returns:
+            sqlite3.Connection: The connection.
+        """
+        # Writes take the lock on the database when they begin, and wait for
+        # other processes holding it rather than failing
+        connection = sqlite3.connect(
+            self.db_file,
+            timeout=BUSY_TIMEOUT,
+            isolation_level="IMMEDIATE",
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _flush_periodically(self) -> None:
+        """
+        Flushes the changes every flush_interval seconds, or sooner once
+        flush_size values have changed, until the cache is closed.
+        """
+        connection = self.connection
+        while connection is not None and connection is self.connection:
+            self._flush_event.wait(self.flush_interval)
+            self._flush_event.clear()
+            if connection is self.connection:
+                self.save_cache()
+
+    def add_timestamps(self, connection: sqlite3.Connection) -> None:
+        """
+        Adds the timestamp columns to a cache created before values had timestamps.
+        The values already in the cache are timestamped with the current time.
+
+        Parameters:
+            connection (sqlite3.Connection): The connection to write through.
+        """
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(cache)")}
+        if "updated_at" in columns and "accessed_at" in columns:
+            return
+        Logger.INFO("Adding timestamps to the values in cache.")
+        for column in ("updated_at", "accessed_at"):
+            if column not in columns:
+                connection.execute(f"ALTER TABLE cache ADD COLUMN {column} REAL")
+        now = time.time()
+        connection.execute(
+            "UPDATE cache SET updated_at = ?, accessed_at = ? WHERE updated_at IS NULL",
+            (now, now),
+        )
+
+    def migrate(self, connection: sqlite3.Connection) -> None:
+        """
+        Copies the JSON cache file, or the bundled defaults if there is none,
+        into the database.
+
+        Parameters:
+            connection (sqlite3.Connection): The connection to write through.
+        """
         try:
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
             with open(self.cache_file, "r", encoding="utf-8") as f:
-                self.cache.update(json.load(f))
-            Logger.INFO("Cache loaded successfully.")
-        except FileNotFoundError:
+                values: dict = json.load(f)
+            Logger.INFO(f"Migrating {len(values)} values from {self.cache_file}.")
+        except (FileNotFoundError, json.JSONDecodeError):
             Logger.WARNING(
                 "Cache file not found. Initializing cache with default values."
             )
-            if "format_cache.json" in self.cache_file:
-                self.cache.update(cache_format_dict)
+            if "format_cache" in self.cache_file:
+                values = cache_format_dict()
+            elif "title_cache" in self.cache_file:
+                values = cache_title_dict()
             else:
-                self.cache.update(cache_title_dict)
-            self.save_cache()
+                values = {}
+        now = time.time()
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO cache (key, value, updated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                ((key, json.dumps(value), now, now) for key, value in values.items()),
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO metadata (name, value) VALUES ('migrated', '1')"
+            )
 
     def save_cache(self) -> None:
         """
-        Saves the cache to a file.
+        Saves the values changed since the last flush to the database in a
+        single transaction.
+
+        The changes are taken out of memory under the lock of the cache, and
+        written without holding it, so the cache can be read and set while the
+        write waits for another process.
         """
-        Logger.INFO("Saving cache to file.")
-        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-        with open(self.cache_file, "w", encoding="utf-8") as f:
-            json.dump(self.cache, f)
+        with self._write_lock:
+            connection = self._write_connection
+            with self._lock:
+                if (not self._dirty and not self._accessed) or connection is None:
+                    return
+                dirty, self._dirty = self._dirty, {}
+                accessed, self._accessed = self._accessed, {}
+                self._flushing = dirty
+            Logger.INFO(f"Saving {len(dirty)} values in cache to file.")
+            start_time = time.perf_counter()
+            try:
+                self.write_changes(connection, dirty, accessed)
+            except sqlite3.OperationalError as e:
+                # Keep the changes for the next flush if another process held
+                # the database for too long, behind the values set since
+                Logger.WARNING(f"Could not save cache, will retry: {e}")
+                with self._lock:
+                    self._dirty = {**dirty, **self._dirty}
+                    for key, accessed_at in accessed.items():
+                        self._accessed[key] = max(
+                            accessed_at, self._accessed.get(key, accessed_at)
+                        )
+                    self._flushing = {}
+                return
+            with self._lock:
+                self._flushing = {}
+                self.flushes += 1
+                self.flush_time += time.perf_counter() - start_time
         Logger.INFO("Cache saved successfully.")
 
-    def get(self, key: str) -> Union[str, None]:
+    def write_changes(
+        self,
+        connection: sqlite3.Connection,
+        dirty: dict[str, tuple[Any, float]],
+        accessed: dict[str, float],
+    ) -> None:
+        """
+        Writes the values and accesses changed since the last flush in a single
+        transaction. A value is only replaced by a value set at the same time or
+        later, so a newer value saved by another process is kept.
+
+        Parameters:
+            connection (sqlite3.Connection): The connection to write through.
+            dirty (dict): The values set, with the time they were set, by key.
+            accessed (dict): The time each key was last read.
+        """
+        with connection:
+            connection.executemany(
+                "UPDATE cache SET accessed_at = MAX(accessed_at, ?) WHERE key = ?",
+                (
+                    (accessed_at, key)
+                    for key, accessed_at in accessed.items()
+                    if key not in dirty
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO cache (key, value, updated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET "
+                "value = excluded.value, updated_at = excluded.updated_at, "
+                "accessed_at = MAX(accessed_at, excluded.accessed_at) "
+                "WHERE excluded.updated_at >= cache.updated_at",
+                (
+                    (
+                        key,
+                        json.dumps(value),
+                        updated_at,
+                        accessed.get(key, updated_at),
+                    )
+                    for key, (value, updated_at) in dirty.items()
+                ),
+            )
+            self._entries_bound += len(dirty)
+            self.evict(connection)
+
+    def evict(self, connection: sqlite3.Connection) -> None:
+        """
+        Removes the expired values and then the least recently read values above
+        max_entries. Must be called inside a transaction. The values are only
+        counted if the values written since the last count may exceed max_entries.
+
+        Parameters:
+            connection (sqlite3.Connection): The connection to write through.
+        """
+        if self.ttl is not None:
+            expired = connection.execute(
+                "DELETE FROM cache WHERE updated_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+            if expired:
+                self.expirations += expired
+                self._entries_bound = max(self._entries_bound - expired, 0)
+                Logger.INFO(f"Removed {expired} expired values from cache.")
+        if self.max_entries is not None and self._entries_bound > self.max_entries:
+            (entries,) = connection.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if entries > self.max_entries:
+                evicted = connection.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (entries - self.max_entries,),
+                ).rowcount
+                self.evictions += evicted
+                entries -= evicted
+                Logger.INFO(f"Evicted {evicted} least recently used values from cache.")
+            self._entries_bound = entries
+
+    def bytes_on_disk(self) -> int:
+        """
+        Gets the size of the database, including its write-ahead log.
+
+        Returns:
+            int: The size in bytes.
+        """
+        return sum(
+            os.path.getsize(path)
+            for path in (self.db_file, f"{self.db_file}-wal", f"{self.db_file}-shm")
+            if os.path.exists(path)
+        )
+
+    def stats(self) -> dict[str, Union[int, float]]:
+        """
+        Gets the counters of the cache, after saving its pending changes.
+
+        Returns:
+            dict: The number of values, hits, misses, sets, evictions, expirations
+            and flushes, the size on disk in bytes, and the load and flush times
+            in seconds.
+        """
+        with self._write_lock:
+            self.save_cache()
+            if self._write_connection is not None:
+                with self._write_connection:
+                    self.evict(self._write_connection)
+        with self._lock:
+            entries = (
+                self.connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+                if self.connection is not None
+                else 0
+            )
+            return {
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "sets": self.sets,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "flushes": self.flushes,
+                "bytes_on_disk": self.bytes_on_disk(),
+                "load_time": round(self.load_time, 4),
+                "flush_time": round(self.flush_time, 4),
+            }
+
+    def get(self, key: str) -> Any:
         """
         Gets a value from the cache.
 
@@ -70,21 +438,222 @@ class Cache:
             The value for the key, or None if the key is not in the cache.
         """
         Logger.INFO(f"Getting value for key: {key} from cache.")
-        value = self.cache.get(key)
+        now = time.time()
+        with self._lock:
+            if key in self._dirty:
+                value, updated_at = self._dirty[key]
+            elif key in self._flushing:
+                value, updated_at = self._flushing[key]
+            else:
+                row = (
+                    self.connection.execute(
+                        "SELECT value, updated_at FROM cache WHERE key = ?", (key,)
+                    ).fetchone()
+                    if self.connection is not None
+                    else None
+                )
+                # A missing key has no value, so its timestamp is never compared
+                value, updated_at = (
+                    (json.loads(row[0]), row[1]) if row is not None else (None, 0.0)
+                )
+            if (
+                value is not None
+                and self.ttl is not None
+                and updated_at < now - self.ttl
+            ):
+                Logger.INFO(f"Value for key: {key} in cache has expired.")
+                value = None
+            elif value is not None:
+                self._accessed[key] = now
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
         if value is None:
-            Logger.WARNING(f"No value found in cache for key: {key}.")
+            Logger.DEBUG(f"No value found in cache for key: {key}.")
         else:
             Logger.INFO(f"Found value in cache for key: {key}.")
         return value
 
     def set(self, key: str, value: Any) -> None:
         """
-        Sets a value in the cache and saves the cache to a file.
+        Sets a value in the cache. The value is saved to the database by the
+        next flush.
 
         Parameters:
             key (str): The key to set the value for.
             value: The value to set.
         """
         Logger.INFO(f"Setting value for key: {key} in cache.")
-        self.cache[key] = value
-        self.save_cache()
+        self.update({key: value})
+
+    def update(self, values: dict) -> None:
+        """
+        Sets many values in the cache. The values are saved to the database by
+        the next flush.
+
+        Parameters:
+            values (dict): The keys and values to set.
+        """
+        Logger.INFO(f"Setting {len(values)} values in cache.")
+        now = time.time()
+        with self._lock:
+            self._dirty.update((key, (value, now)) for key, value in values.items())
+            self.sets += len(values)
+            if len(self._dirty) >= self.flush_size:
+                # Wake the flusher instead of writing on the caller's thread
+                self._flush_event.set()
+
+    def close(self) -> None:
+        """
+        Saves the changed values and closes the connections to the database.
+        """
+        with self._write_lock:
+            self.save_cache()
+            with self._lock:
+                for connection in (self.connection, self._write_connection):
+                    if connection is not None:
+                        connection.close()
+                self.connection = None
+                self._write_connection = None
+        # Wake the flusher so it sees the cache is closed and stops
+        self._flush_event.set()
+
+
+_caches: dict[str, Cache] = {}
+
+
+def open_cache(cache_file: str, ttl: Optional[float] = None) -> Cache:
+    """
+    Gets the shared cache for a file, opening it if it is not open yet.
+
+    Parameters:
+        cache_file (str): The path to the cache file.
+        ttl (float, optional): The seconds a value is kept before it expires,
+            used when the cache is opened.
+
+    Returns:
+        Cache: The cache shared by the whole process.
+    """
+    cache_path = os.path.abspath(cache_file)
+    with _cache_lock:
+        cache = _caches.get(cache_path)
+        if cache is None:
+            cache = Cache(cache_file, ttl=ttl)
+            _caches[cache_path] = cache
+        elif cache.connection is None:
+            cache.load_cache()
+        return cache
+
+
+def get_title_cache() -> Cache:
+    """
+    Gets the shared cache of the IDs found for each manga title.
+
+    Returns:
+        Cache: The shared title cache.
+    """
+    return open_cache(TITLE_CACHE_FILE, ttl=DEFAULT_TITLE_CACHE_TTL)
+
+
+def get_format_cache() -> Cache:
+    """
+    Gets the shared cache of the format of each manga ID.
+
+    Returns:
+        Cache: The shared format cache.
+    """
+    return open_cache(FORMAT_CACHE_FILE, ttl=DEFAULT_FORMAT_CACHE_TTL)
+
+
+def get_not_found_cache() -> Cache:
+    """
+    Gets the shared cache of the titles that were not found on Anilist.
+
+    Returns:
+        Cache: The shared not found cache.
+    """
+    return open_cache(NOT_FOUND_CACHE_FILE)
+
+
+def set_cache_directory(directory: str) -> None:
+    """
+    Moves the shared caches to another directory.
+
+    The caches already open keep their files, so this is called before the run
+    opens any of them.
+
+    Parameters:
+        directory (str): The path to the directory the cache files are stored in.
+    """
+    global CACHE_DIRECTORY, TITLE_CACHE_FILE  # pylint: disable=W0603
+    global FORMAT_CACHE_FILE, NOT_FOUND_CACHE_FILE  # pylint: disable=W0603
+    CACHE_DIRECTORY = directory
+    TITLE_CACHE_FILE = os.path.join(directory, "title_cache.json")
+    FORMAT_CACHE_FILE = os.path.join(directory, "format_cache.json")
+    NOT_FOUND_CACHE_FILE = os.path.join(directory, "not_found_cache.json")
+    Logger.INFO(f"Storing the caches in {directory}.")
+
+
+def configure_caches_from_config(config: dict) -> None:
+    """
+    Applies the optional CACHE_TTL_DAYS and CACHE_MAX_ENTRIES configuration keys
+    to the shared caches.
+
+    CACHE_TTL_DAYS sets how many days a title is trusted before it is searched
+    again, and CACHE_MAX_ENTRIES sets how many values each cache keeps at most.
+
+    Parameters:
+        config (dict): The configuration dictionary.
+    """
+    ttl_days = config.get("CACHE_TTL_DAYS")
+    max_entries = config.get("CACHE_MAX_ENTRIES")
+    title_cache = get_title_cache()
+    format_cache = get_format_cache()
+    if ttl_days is not None:
+        title_cache.ttl = float(ttl_days) * SECONDS_PER_DAY or None
+    if max_entries is not None:
+        title_cache.max_entries = int(max_entries) or None
+        format_cache.max_entries = int(max_entries) or None
+    Logger.INFO(
+        f"Configured the shared caches. Title cache TTL: {title_cache.ttl}, "
+        f"maximum entries: {title_cache.max_entries}"
+    )
+
+
+def flush_caches() -> None:
+    """
+    Saves every open shared cache.
+    """
+    Logger.INFO("Flushing the shared caches.")
+    with _cache_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.save_cache()
+
+
+def close_caches() -> None:
+    """
+    Saves and closes every open shared cache.
+    """
+    Logger.INFO("Closing the shared caches.")
+    with _cache_lock:
+        flush_caches()
+        for cache in _caches.values():
+            cache.close()
+        _caches.clear()
+
+
+def Get_Cache_Stats() -> dict[str, dict[str, Union[int, float]]]:
+    """
+    Gets the counters of every open shared cache.
+
+    Returns:
+        dict: The stats of each cache (see Cache.stats), by cache name.
+    """
+    with _cache_lock:
+        caches = [cache for cache in _caches.values() if cache.connection is not None]
+    return {
+        os.path.splitext(os.path.basename(cache.cache_file))[0]: cache.stats()
+        for cache in caches
+    }
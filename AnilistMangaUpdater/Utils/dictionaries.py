@@ -3,11 +3,15 @@ This file contains Python dictionaries used to store:
 - Alternative titles
 - Format cache
 - Title cache
+
+Each dictionary is read from its JSON file in the Resources folder the first time
+its function is called, so importing this module does no I/O.
 """
 
 # pylint: disable=C0301, C0302
 # flake8: noqa: E501
 
+import functools
 import json
 import os
 import sys
@@ -24,12 +28,48 @@ alternative_titles_file: str = os.path.join(resources_path, "alternative_titles.
 format_cache_file: str = os.path.join(resources_path, "format_cache.json")
 title_cache_file: str = os.path.join(resources_path, "title_cache.json")
 
-# Load the JSON files into Python dictionaries
-with open(alternative_titles_file, "r", encoding="utf-8") as file:
-    alternative_titles_dict = json.load(file)
 
-with open(format_cache_file, "r", encoding="utf-8") as file:
-    cache_format_dict = json.load(file)
 
-with open(title_cache_file, "r", encoding="utf-8") as file:
-    cache_title_dict = json.load(file)
+@functools.cache
+def _load(file_path: str) -> dict:
+    """
+    Loads a JSON file of the Resources folder, once.
+
+    Parameters:
+        file_path (str): The path to the JSON file.
+
+    Returns:
+        dict: The contents of the file.
+    """
+    with open(file_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def alternative_titles_dict() -> dict:
+    """
+    Gets the bundled alternative titles.
+
+    Returns:
+        dict: The alternative titles.
+    """
+    return _load(alternative_titles_file)
+
+
+def cache_format_dict() -> dict:
+    """
+    Gets the bundled format cache.
+
+    Returns:
+        dict: The format of each manga ID.
+    """
+    return _load(format_cache_file)
+
+
+def cache_title_dict() -> dict:
+    """
+    Gets the bundled title cache.
+
+    Returns:
+        dict: The IDs found for each title.
+    """
+    return _load(title_cache_file)
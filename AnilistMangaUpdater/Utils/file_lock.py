@@ -0,0 +1,58 @@
+"""
+This module contains the file_lock context manager, which holds an exclusive lock
+on a file shared by several processes.
+
+Several runs can share one Manga_Data directory, so a file that is read, merged
+and written again (like the title index) is only changed while its lock is held.
+The lock is taken on a separate ".lock" file next to it, so the file itself can
+still be replaced atomically with os.replace while the lock is held.
+"""
+
+import contextlib
+import os
+from typing import Iterator
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+from Utils.log import Logger  # pylint: disable=E0401
+
+
+@contextlib.contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Holds an exclusive lock on a file, waiting for other processes to release it.
+
+    Parameters:
+        path (str): The path of the file to lock.
+
+    Yields:
+        None, while the lock is held.
+    """
+    lock_path = f"{path}.lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        Logger.DEBUG(f"Waiting for the lock on {path}.")
+        if os.name == "nt":
+            lock_file.seek(0)
+            # LK_LOCK gives up after about 10 seconds, so keep waiting
+            while True:
+                try:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    Logger.DEBUG(f"Still waiting for the lock on {path}.")
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        Logger.DEBUG(f"Acquired the lock on {path}.")
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            Logger.DEBUG(f"Released the lock on {path}.")
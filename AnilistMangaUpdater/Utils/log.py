@@ -5,18 +5,43 @@ additional information.
 The Logger class provides static methods for logging messages at different
 levels (INFO, DEBUG, WARNING, ERROR, CRITICAL). Each log message includes
 the current time, file name, function name, and line number.
+
+Messages below the configured level are dropped before any frame or formatting
+work is done, and the callers that log DEBUG messages for every manga check
+Logger.is_enabled_for first, so they do not build those messages either. The
+level defaults to INFO and can be set with the LOG_LEVEL environment variable
+or configuration key. The messages that are kept are put on a queue and written
+to the log file and the terminal by a background thread, so logging never waits
+for the disk or the terminal.
+
+When the LOG_JSON environment variable or configuration key is set, every message
+is also written to logs/latest.jsonl as one JSON object per line. Each object
+carries the level, module, function, line, the seconds since the run started and
+the ID of the run. Messages logged inside correlate(name) also carry the name, a
+correlation ID derived from it and the seconds since that block was entered. The
+same manga gets the same correlation ID at every step of a run, so its records
+can be followed from the CSV file to its update.
 """
 
 # pylint: disable=C0103
 
+import atexit
+import contextlib
+import contextvars
 import glob
-import inspect
+import hashlib
+import json
 import logging
 import os
+import queue
 import sys
+import time
+import uuid
 from datetime import datetime
 from logging import Handler
-from typing import List
+from logging.handlers import QueueHandler, QueueListener
+from types import FrameType
+from typing import ClassVar, Iterator, List, Optional, Union
 
 # Create logs directory if it doesn't exist
 if not os.path.exists("logs"):
@@ -27,20 +52,94 @@ for handler in logging.root.handlers[:]:
     handler.close()
     logging.root.removeHandler(handler)
 
-# Rename the existing latest.log file to a timestamped filename
-if os.path.exists("logs/latest.log"):
-    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    try:
-        os.rename("logs/latest.log", f"logs/{timestamp}.log")
-    except PermissionError:
-        print(
-            "Warning: Could not rename the log file because it is being used by another process."
-        )
+# Rename the existing latest.log and latest.jsonl files to timestamped filenames
+timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+for extension in ("log", "jsonl"):
+    if os.path.exists(f"logs/latest.{extension}"):
+        try:
+            os.rename(f"logs/latest.{extension}", f"logs/{timestamp}.{extension}")
+        except PermissionError:
+            print(
+                "Warning: Could not rename the log file because it is being used by another process."
+            )
 
 
 # Define the main directory of your project
 MAIN_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Define the logger the messages are logged through, which passes them to the
+# handlers of the root logger
+logger = logging.getLogger(__name__)
+
+# Define the level used when neither the environment nor the configuration sets one
+DEFAULT_LOG_LEVEL: int = logging.INFO
+
+# Identify this run and when it started in the JSON-lines log
+RUN_ID: str = uuid.uuid4().hex[:12]
+RUN_START: float = time.time()
+
+# The correlation ID, name and start time of the manga being processed, if any
+_correlation: contextvars.ContextVar[Optional[tuple[str, str, float]]] = (
+    contextvars.ContextVar("correlation", default=None)
+)
+
+
+def correlation_id(name: str) -> str:
+    """
+    Gets the correlation ID of a manga name.
+
+    The ID only depends on the letters and digits of the name, so the slightly
+    different forms of a name used by each step of a run get the same ID.
+
+    Parameters:
+        name (str): The name of the manga.
+
+    Returns:
+        str: The correlation ID.
+    """
+    normalized = "".join(character for character in name.lower() if character.isalnum())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:10]
+
+
+@contextlib.contextmanager
+def correlate(name: str) -> Iterator[str]:
+    """
+    Tags the messages logged inside the block with the correlation ID of a manga.
+
+    Parameters:
+        name (str): The name of the manga.
+
+    Yields:
+        str: The correlation ID.
+    """
+    correlation = (correlation_id(name), name, time.perf_counter())
+    token = _correlation.set(correlation)
+    try:
+        yield correlation[0]
+    finally:
+        _correlation.reset(token)
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """
+    Formats a log record as a single line of JSON.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields: dict = getattr(record, "structured", None) or {
+            "message": record.getMessage()
+        }
+        return json.dumps(
+            {
+                "time": datetime.fromtimestamp(record.created).isoformat(),
+                "elapsed": round(record.created - RUN_START, 6),
+                "run_id": RUN_ID,
+                "level": record.levelname,
+                **fields,
+            },
+            ensure_ascii=False,
+        )
+
 
 # noinspection PyClassHasNoInit
 class Logger:
@@ -50,26 +149,115 @@ class Logger:
     This Logger provides static methods for logging messages at different levels
     (INFO, DEBUG, WARNING, ERROR, CRITICAL). Each log message includes the current
     time, file name, function name, and line number.
+
+    Attributes:
+        level (int): The lowest level of the messages that are logged.
+        listener (QueueListener): The background writer of the queued messages.
+        json_handler (Handler): The handler of the JSON-lines log, if enabled.
     """
 
+    level: int = DEFAULT_LOG_LEVEL
+    listener: Optional[QueueListener] = None
+    json_handler: Optional[Handler] = None
+    # Paths of the source files relative to MAIN_DIR, by absolute path
+    _relative_paths: ClassVar[dict[str, str]] = {}
+
     @staticmethod
     def setup(max_logs: int = 15) -> None:
         """
-        Sets up the logger to print to both the terminal and a file.
+        Sets up the logger to print to both the terminal and a file, through a
+        queue written by a background thread.
 
         Parameters:
             max_logs (int): The maximum number of log files to keep.
         """
+        formatter = logging.Formatter("%(asctime)s, %(message)s")
         handlers: List[Handler] = [
             logging.FileHandler("logs/latest.log", encoding="utf-8"),
             logging.StreamHandler(stream=sys.stdout),
         ]
-        logging.basicConfig(
-            level=logging.DEBUG, format="%(asctime)s, %(message)s", handlers=handlers
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        logging.getLogger().handlers = [QueueHandler(log_queue)]
+        Logger.listener = QueueListener(log_queue, *handlers)
+        Logger.listener.start()
+        atexit.register(Logger.stop)
+
+        Logger.set_level(os.environ.get("LOG_LEVEL") or DEFAULT_LOG_LEVEL)
+        if os.environ.get("LOG_JSON", "").lower() in ("1", "true", "yes"):
+            Logger.enable_json_log()
+        Logger.manage_log_files(max_logs)
+
+    @staticmethod
+    def enable_json_log() -> None:
+        """
+        Starts writing every message to logs/latest.jsonl as well, as JSON lines.
+        """
+        if Logger.json_handler is not None or Logger.listener is None:
+            return
+        Logger.json_handler = logging.FileHandler("logs/latest.jsonl", encoding="utf-8")
+        Logger.json_handler.setFormatter(JSONLinesFormatter())
+        Logger.listener.handlers = (*Logger.listener.handlers, Logger.json_handler)
+
+    @staticmethod
+    def disable_console_log() -> None:
+        """
+        Stops printing the messages to the terminal, so they are only written to
+        the log files.
+        """
+        if Logger.listener is None:
+            return
+        Logger.listener.handlers = tuple(
+            handler
+            for handler in Logger.listener.handlers
+            if not (
+                isinstance(handler, logging.StreamHandler)
+                and not isinstance(handler, logging.FileHandler)
+            )
         )
 
-        logging.getLogger().handlers = handlers
-        Logger.manage_log_files(max_logs)
+    @staticmethod
+    def stop() -> None:
+        """
+        Writes the queued messages and stops the background writer.
+        """
+        if Logger.listener is not None:
+            Logger.listener.stop()
+            Logger.listener = None
+            logging.getLogger().handlers = []
+
+    @staticmethod
+    def set_level(level: Union[int, str]) -> None:
+        """
+        Sets the lowest level of the messages that are logged.
+
+        Parameters:
+            level (int or str): The level, as a logging level or its name
+                (e.g., logging.INFO or "INFO").
+        """
+        if isinstance(level, str):
+            level_number = logging.getLevelName(level.upper())
+            if not isinstance(level_number, int):
+                Logger.WARNING(f"Unknown log level: {level}. Keeping the current one.")
+                return
+            level = level_number
+        Logger.level = level
+        logging.getLogger().setLevel(level)
+
+    @staticmethod
+    def is_enabled_for(level: int) -> bool:
+        """
+        Checks if messages of a level are logged, to skip building costly messages.
+
+        Parameters:
+            level (int): The logging level (e.g., logging.DEBUG).
+
+        Returns:
+            bool: True if messages of the level are logged.
+        """
+        return level >= Logger.level
 
     @staticmethod
     def manage_log_files(max_logs: int) -> None:
@@ -79,11 +267,12 @@ class Logger:
         Parameters:
             max_logs (int): The maximum number of log files to keep.
         """
-        log_files = glob.glob("logs/*.log")
-        log_files.sort(key=os.path.getctime)
+        for pattern in ("logs/*.log", "logs/*.jsonl"):
+            log_files = glob.glob(pattern)
+            log_files.sort(key=os.path.getctime)
 
-        while len(log_files) > max_logs:
-            os.remove(log_files.pop(0))
+            while len(log_files) > max_logs:
+                os.remove(log_files.pop(0))
 
     @staticmethod
     def INFO(message: str) -> None:
@@ -144,27 +333,83 @@ class Logger:
             message (str): The message to log.
             level (int): The logging level of the message (e.g., logging.INFO, logging.DEBUG).
         """
-        # Get the current frame
-        frame = inspect.currentframe()
-        for _ in range(3):
-            if frame is not None:
-                frame = frame.f_back
+        # Drop the message before doing any work if its level is not logged
+        if level < Logger.level:
+            return
+
+        # Get the frame of the function that called INFO, DEBUG, ...
+        try:
+            frame = sys._getframe(2)  # pylint: disable=W0212
+        except ValueError:
+            frame = None
 
         if frame is not None:
             func = frame.f_code
+            relative_path = Logger._relative_paths.get(func.co_filename)
+            if relative_path is None:
+                relative_path = os.path.relpath(func.co_filename, start=MAIN_DIR)
+                Logger._relative_paths[func.co_filename] = relative_path
 
             # Prepare the log message
             log_message = (
                 f"Level: {logging.getLevelName(level)}, "
-                f"File: ..\\{os.path.relpath(func.co_filename, start=MAIN_DIR)}, "
+                f"File: ..\\{relative_path}, "
                 f"Function: {func.co_name}, Line: {frame.f_lineno}, "
                 f"Message: {message}"
             )
 
             # Log the message at the appropriate level
-            logging.log(level, log_message)
+            if Logger.json_handler is None:
+                logger.log(level, log_message)
+            else:
+                logger.log(
+                    level,
+                    log_message,
+                    extra={"structured": Logger.structured_fields(message, frame)},
+                )
         else:
-            logging.error("Error: Could not get the current frame.")
+            logger.error("Error: Could not get the current frame.")
+
+    @staticmethod
+    def structured_fields(message: str, frame: FrameType) -> dict:
+        """
+        Gets the fields of a message for the JSON-lines log.
+
+        Parameters:
+            message (str): The message to log.
+            frame (FrameType): The frame of the function that logged the message.
+
+        Returns:
+            dict: The module, function and line that logged the message, the
+            message, and the correlation fields of the current manga, if any.
+        """
+        fields = {
+            "module": frame.f_globals.get("__name__"),
+            "function": frame.f_code.co_name,
+            "line": frame.f_lineno,
+            "message": message,
+        }
+        correlation = _correlation.get()
+        if correlation is not None:
+            correlation_id_, name, start = correlation
+            fields["correlation_id"] = correlation_id_
+            fields["title"] = name
+            fields["title_elapsed"] = round(time.perf_counter() - start, 6)
+        return fields
+
+
+def configure_logging_from_config(config: dict) -> None:
+    """
+    Sets the log level from the optional LOG_LEVEL configuration key, and enables
+    the JSON-lines log if the optional LOG_JSON key is true.
+
+    Parameters:
+        config (dict): The configuration dictionary.
+    """
+    if config.get("LOG_LEVEL"):
+        Logger.set_level(config["LOG_LEVEL"])
+    if config.get("LOG_JSON"):
+        Logger.enable_json_log()
 
 
 # Setup the logger
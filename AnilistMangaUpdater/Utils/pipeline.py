@@ -0,0 +1,282 @@
+"""
+This module contains the Pipeline class, which runs items through a chain of stages
+connected by bounded queues.
+
+Each Stage has its own worker threads. A worker takes an item (or a batch of items)
+from the queue in front of its stage, passes it to the stage's function and puts
+every item the function returns on the queue of the next stage, so an item can be
+dropped, passed on or split into several. As soon as an item leaves one stage the
+next stage can start on it while the first stage works on the following items.
+The queues are bounded, so a fast stage waits for a slow one instead of piling up
+items in memory.
+
+Every stage records StageMetrics: how many items went in and out, how long its
+workers were busy, waited for input or waited for room in the next queue, how
+many items were waiting in front of it at most, and when its first item came out.
+"""
+
+# pylint: disable=E0401, R0902, R0913
+
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Optional, Union
+
+from Utils.log import Logger
+
+# Default number of items waiting in front of each stage
+DEFAULT_QUEUE_SIZE: int = 64
+
+# Marks the end of the items on a queue, once for each worker of the next stage
+_DONE = object()
+
+
+class StageMetrics:  # pylint: disable=R0903
+    """
+    The counters of a single stage.
+
+    Attributes:
+        name (str): The name of the stage.
+        workers (int): The number of worker threads of the stage.
+        items_in (int): The number of items taken from the queue.
+        items_out (int): The number of items passed on to the next stage.
+        errors (int): The number of items or batches that raised an exception.
+        busy_time (float): The seconds the workers spent running the stage function.
+        wait_time (float): The seconds the workers spent waiting for items.
+        blocked_time (float): The seconds the workers spent waiting for room in
+            the next queue.
+        max_backlog (int): The most items seen waiting in front of the stage.
+        first_output (float): The seconds from the start of the run until the
+            first item came out of the stage, or None if none did.
+    """
+
+    def __init__(self, name: str, workers: int) -> None:
+        self.name: str = name
+        self.workers: int = workers
+        self.items_in: int = 0
+        self.items_out: int = 0
+        self.errors: int = 0
+        self.busy_time: float = 0
+        self.wait_time: float = 0
+        self.blocked_time: float = 0
+        self.max_backlog: int = 0
+        self.first_output: Union[float, None] = None
+
+    def as_dict(self) -> dict:
+        """
+        Gets the counters of the stage.
+
+        Returns:
+            dict: The counters, with the times rounded to milliseconds.
+        """
+        return {
+            "name": self.name,
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "errors": self.errors,
+            "busy_time": round(self.busy_time, 3),
+            "wait_time": round(self.wait_time, 3),
+            "blocked_time": round(self.blocked_time, 3),
+            "max_backlog": self.max_backlog,
+            "first_output": (
+                round(self.first_output, 3) if self.first_output is not None else None
+            ),
+        }
+
+
+class Stage:  # pylint: disable=R0903
+    """
+    A step of a pipeline.
+
+    Attributes:
+        name (str): The name of the stage.
+        func (callable): Takes an item, or a list of items if batch_size is more
+            than 1, and returns an iterable of the items to pass on.
+        workers (int): The number of worker threads of the stage.
+        batch_size (int): The most items passed to func at once.
+        batch_timeout (float): The seconds to wait for a batch to fill up after
+            its first item arrived.
+        metrics (StageMetrics): The counters of the stage.
+        lock (threading.Lock): The lock held while the counters are updated.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        workers: int = 1,
+        batch_size: int = 1,
+        batch_timeout: float = 0.1,
+    ) -> None:
+        self.name: str = name
+        self.func: Callable = func
+        self.workers: int = max(int(workers), 1)
+        self.batch_size: int = max(int(batch_size), 1)
+        self.batch_timeout: float = batch_timeout
+        self.metrics: StageMetrics = StageMetrics(name, self.workers)
+        self.lock = threading.Lock()
+
+
+class Pipeline:
+    """
+    Runs items through a chain of stages connected by bounded queues.
+
+    Attributes:
+        stages (list): The stages, in the order items go through them.
+        queue_size (int): The most items waiting in front of each stage.
+    """
+
+    def __init__(
+        self, stages: list[Stage], queue_size: int = DEFAULT_QUEUE_SIZE
+    ) -> None:
+        self.stages: list[Stage] = stages
+        self.queue_size: int = max(int(queue_size), 1)
+        self._results: list = []
+        self._results_lock = threading.Lock()
+        self._error: Optional[BaseException] = None
+        self._start_time: float = 0
+
+    @property
+    def metrics(self) -> list[StageMetrics]:
+        """
+        The counters of every stage, in order.
+        """
+        return [stage.metrics for stage in self.stages]
+
+    def run(self, items: Iterable) -> list:
+        """
+        Runs the items through every stage and waits for all of them to finish.
+
+        An exception raised for one item is logged and the other items carry on.
+        The first exception is raised again once every item has finished.
+
+        Parameters:
+            items (iterable): The items given to the first stage.
+
+        Returns:
+            list: The items that came out of the last stage, in the order they
+            finished.
+        """
+        self._start_time = time.perf_counter()
+        queues: list[queue.Queue] = [
+            queue.Queue(maxsize=self.queue_size) for _ in self.stages
+        ]
+        threads: list[threading.Thread] = []
+        for index, stage in enumerate(self.stages):
+            output_queue = queues[index + 1] if index + 1 < len(queues) else None
+            next_workers = (
+                self.stages[index + 1].workers if index + 1 < len(queues) else 0
+            )
+            # The last worker of a stage to finish tells the next stage to stop
+            remaining = [stage.workers]
+            remaining_lock = threading.Lock()
+            for worker in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work,
+                    args=(
+                        stage,
+                        queues[index],
+                        output_queue,
+                        next_workers,
+                        remaining,
+                        remaining_lock,
+                    ),
+                    name=f"pipeline-{stage.name}-{worker}",
+                    daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        Logger.INFO(
+            "Started pipeline with stages: "
+            + ", ".join(f"{stage.name} ({stage.workers})" for stage in self.stages)
+        )
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+        Logger.INFO(f"Pipeline finished with {len(self._results)} results.")
+
+        if self._error is not None:
+            raise self._error
+        return self._results
+
+    def _work(  # pylint: disable=R0917
+        self,
+        stage: Stage,
+        input_queue: queue.Queue,
+        output_queue: Optional[queue.Queue],
+        next_workers: int,
+        remaining: list[int],
+        remaining_lock: threading.Lock,
+    ) -> None:
+        """
+        Runs the items of one stage until the end of its queue is reached.
+        """
+        metrics = stage.metrics
+        done = False
+        while not done:
+            wait_start = time.perf_counter()
+            first = input_queue.get()
+            if first is _DONE:
+                with stage.lock:
+                    metrics.wait_time += time.perf_counter() - wait_start
+                break
+            batch = [first]
+            # Wait a little for more items to fill the batch
+            deadline = time.perf_counter() + stage.batch_timeout
+            while len(batch) < stage.batch_size:
+                try:
+                    item = input_queue.get(
+                        timeout=max(deadline - time.perf_counter(), 0)
+                    )
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+            busy_start = time.perf_counter()
+            backlog = input_queue.qsize()
+
+            error = False
+            try:
+                outputs = list(stage.func(batch if stage.batch_size > 1 else first))
+            # Any error is kept and raised again by run once every item finished,
+            # so one failing item does not stop the worker and hang the pipeline
+            except Exception as e:  # pylint: disable=W0718
+                Logger.ERROR(f"Stage {stage.name} failed: {e}")
+                error = True
+                if self._error is None:
+                    self._error = e
+                outputs = []
+            put_start = time.perf_counter()
+
+            for output in outputs:
+                if output_queue is None:
+                    with self._results_lock:
+                        self._results.append(output)
+                else:
+                    output_queue.put(output)
+            put_end = time.perf_counter()
+
+            with stage.lock:
+                metrics.items_in += len(batch)
+                metrics.items_out += len(outputs)
+                metrics.errors += error
+                metrics.wait_time += busy_start - wait_start
+                metrics.busy_time += put_start - busy_start
+                metrics.blocked_time += put_end - put_start
+                metrics.max_backlog = max(metrics.max_backlog, backlog)
+                if outputs and metrics.first_output is None:
+                    metrics.first_output = put_start - self._start_time
+
+        with remaining_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last and output_queue is not None:
+            for _ in range(next_workers):
+                output_queue.put(_DONE)
@@ -0,0 +1,328 @@
+"""
+This module contains the RunJournal class, an append-only record of the work a run
+has finished, so a run that stopped halfway can be resumed.
+
+Each run writes its journal to run_journal_<fingerprint>.jsonl in the cache
+directory (Manga_Data by default). The fingerprint is a hash of the inputs of
+the run, the Kenmei export files and the settings that change the updates, so
+a rerun with the same inputs finds the journal of the run that stopped and a
+run with other inputs starts a journal of its own.
+
+The journal holds one JSON object per line:
+
+    start: the fingerprint and the ID of the run that started the journal
+    resolved: the IDs found for a title
+    formats: the formats fetched for some IDs
+    mutation: the mutations applied to a manga and the chapters they updated
+    stage: a stage of the run that finished, with the data it hands to the next
+
+Every line is flushed as soon as it is written, so a crash loses at most the line
+being written. A line cut short is ignored when the journal is read back, and
+removed before a resumed run adds its own records. A resumed run reuses the IDs
+and formats found before, skips the stages that finished and the manga that were
+already updated, so only the remaining searches and mutations are sent.
+The journal is removed once the run finishes, and journals of other inputs that
+were left untouched for JOURNAL_MAX_AGE_DAYS are removed when a run starts.
+"""
+
+# pylint: disable=E0401
+
+import contextlib
+import glob
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import IO, Any, Union
+
+from Utils import cache
+from Utils.log import RUN_ID, Logger
+
+# Define the prefix of the journal files and how long a stale journal is kept
+JOURNAL_PREFIX: str = "run_journal_"
+JOURNAL_MAX_AGE_DAYS: int = 7
+
+
+def input_fingerprint(file_paths: list[str], *settings: Any) -> str:
+    """
+    Hashes the contents of the input files and the settings of a run.
+
+    Parameters:
+        file_paths (list): The paths to the input files. Empty paths are skipped.
+        *settings: The settings that change the updates of the run.
+
+    Returns:
+        str: The hex digest of the inputs.
+    """
+    digest = hashlib.sha1()
+    for file_path in file_paths:
+        digest.update(file_path.encode("utf-8") + b"\0")
+        if file_path and os.path.isfile(file_path):
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 16), b""):
+                    digest.update(chunk)
+        digest.update(b"\0")
+    digest.update(json.dumps(settings, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class RunJournal:
+    """
+    An append-only journal of the titles resolved, the formats fetched, the
+    mutations applied and the stages finished by a run.
+
+    Attributes:
+        path (str): The path to the journal file.
+        fingerprint (str): The fingerprint of the inputs of the run.
+        resumed (bool): Whether the journal was left by a run that stopped.
+        resolved (dict): The IDs found for each title.
+        formats (dict): The format of each ID.
+        mutations (dict): The chapters updated for each manga ID that was updated
+            before the run was resumed.
+        stages (dict): The data recorded by each stage that finished.
+    """
+
+    def __init__(self, path: str, fingerprint: str) -> None:
+        self.path: str = path
+        self.fingerprint: str = fingerprint
+        self.resumed: bool = False
+        self.resolved: dict[str, list[int]] = {}
+        self.formats: dict[int, str] = {}
+        self.mutations: dict[int, int] = {}
+        self.stages: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._file: Union[IO[str], None] = None
+        self._load()
+
+    def _load(self) -> None:
+        """
+        Reads the journal left by a run with the same inputs, then opens it for
+        appending. A new journal is started if there is none.
+        """
+        records = []
+        # The end of the last whole line, where the records of this run are added
+        end = 0
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("missing line end")
+                        records.append(json.loads(line))
+                    except ValueError:
+                        Logger.WARNING(f"Ignoring a truncated line in {self.path}.")
+                        break
+                    end += len(line)
+        if records and records[0].get("fingerprint") == self.fingerprint:
+            self.resumed = True
+            for record in records[1:]:
+                self._apply(record)
+            Logger.INFO(
+                f"Resuming run {records[0].get('run_id')} from {self.path}: "
+                f"{len(self.resolved)} titles resolved, {len(self.mutations)} "
+                f"manga updated, stages finished: {sorted(self.stages)}."
+            )
+            # Cut off a line left half-written by the run that stopped, so the
+            # records added now are not joined to it and lost on the next resume
+            os.truncate(self.path, end)
+            # The journal stays open for the whole run and is closed by close()
+            self._file = open(self.path, "a", encoding="utf-8")  # pylint: disable=R1732
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")  # pylint: disable=R1732
+        self._write(
+            {"type": "start", "fingerprint": self.fingerprint, "run_id": RUN_ID},
+            sync=True,
+        )
+        Logger.INFO(f"Started run journal {self.path}.")
+
+    def _apply(self, record: dict) -> None:
+        """
+        Adds a record read back from the journal.
+
+        Parameters:
+            record (dict): The record.
+        """
+        record_type = record.get("type")
+        if record_type == "resolved":
+            self.resolved[record["title"]] = record["ids"]
+        elif record_type == "formats":
+            self.formats.update(
+                {
+                    int(manga_id): media_format
+                    for manga_id, media_format in record["formats"].items()
+                }
+            )
+        elif record_type == "mutation":
+            self.mutations[record["id"]] = record["chapters"]
+        elif record_type == "stage":
+            self.stages[record["stage"]] = record.get("data")
+
+    def _write(self, record: dict, sync: bool = False) -> None:
+        """
+        Appends a record to the journal.
+
+        Parameters:
+            record (dict): The record.
+            sync (bool): Whether to also wait for the record to reach the disk.
+        """
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(
+                json.dumps(
+                    {"time": round(time.time(), 3), **record}, ensure_ascii=False
+                )
+                + "\n"
+            )
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+
+    def resolved_ids(self, title: str) -> Union[list[int], None]:
+        """
+        Gets the IDs found for a title before the run was resumed.
+
+        Parameters:
+            title (str): The title.
+
+        Returns:
+            list: The IDs, or None if the title was not resolved yet.
+        """
+        return self.resolved.get(title)
+
+    def record_resolved(self, title: str, manga_ids: list[int]) -> None:
+        """
+        Records the IDs found for a title.
+
+        Parameters:
+            title (str): The title.
+            manga_ids (list): The IDs found.
+        """
+        with self._lock:
+            self.resolved[title] = list(manga_ids)
+        self._write({"type": "resolved", "title": title, "ids": list(manga_ids)})
+
+    def record_formats(self, formats: dict[int, Union[str, None]]) -> None:
+        """
+        Records the formats fetched for some IDs.
+
+        Parameters:
+            formats (dict): The format of each ID. IDs whose format could not be
+                fetched are left out.
+        """
+        fetched = {
+            manga_id: media_format
+            for manga_id, media_format in formats.items()
+            if media_format is not None
+        }
+        if not fetched:
+            return
+        with self._lock:
+            self.formats.update(fetched)
+        self._write({"type": "formats", "formats": fetched})
+
+    def is_mutated(self, manga_id: int) -> bool:
+        """
+        Checks if a manga was already updated before the run was resumed. The
+        manga updated by this run are not included.
+
+        Parameters:
+            manga_id (int): The ID of the manga.
+
+        Returns:
+            bool: True if the mutations of the manga were applied.
+        """
+        return manga_id in self.mutations
+
+    def record_mutation(
+        self, manga_id: int, title: str, variables_list: list[dict], chapters: int
+    ) -> None:
+        """
+        Records the mutations applied to a manga.
+
+        Parameters:
+            manga_id (int): The ID of the manga.
+            title (str): The title of the manga.
+            variables_list (list): The variables of each mutation applied.
+            chapters (int): The number of chapters the mutations updated.
+        """
+        self._write(
+            {
+                "type": "mutation",
+                "id": manga_id,
+                "title": title,
+                "variables": variables_list,
+                "chapters": chapters,
+            }
+        )
+
+    def record_stage(self, stage: str, data: Any = None) -> None:
+        """
+        Records that a stage of the run finished.
+
+        Parameters:
+            stage (str): The name of the stage.
+            data: The result of the stage a resumed run needs to skip it, if any.
+        """
+        with self._lock:
+            self.stages[stage] = data
+        self._write({"type": "stage", "stage": stage, "data": data}, sync=True)
+
+    def close(self) -> None:
+        """
+        Closes the journal, keeping it so the run can be resumed.
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def finish(self) -> None:
+        """
+        Closes and removes the journal once the run finished.
+        """
+        self.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path)
+        Logger.INFO(f"Run finished, removed run journal {self.path}.")
+
+
+def remove_stale_journals(directory: str, keep: str) -> None:
+    """
+    Removes the journals that were not written to for JOURNAL_MAX_AGE_DAYS.
+
+    Parameters:
+        directory (str): The directory of the journals.
+        keep (str): The path to the journal of the current run.
+    """
+    cutoff = time.time() - JOURNAL_MAX_AGE_DAYS * cache.SECONDS_PER_DAY
+    for path in glob.glob(os.path.join(directory, f"{JOURNAL_PREFIX}*.jsonl")):
+        if os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                Logger.INFO(f"Removed stale run journal {path}.")
+        except OSError as e:
+            Logger.WARNING(f"Could not remove stale run journal {path}: {e}")
+
+
+def open_run_journal(fingerprint: str) -> RunJournal:
+    """
+    Opens the journal of the run with the given inputs in the cache directory,
+    resuming it if a run with the same inputs stopped before finishing.
+
+    Parameters:
+        fingerprint (str): The fingerprint of the inputs of the run.
+
+    Returns:
+        RunJournal: The journal of the run.
+    """
+    path = os.path.join(
+        cache.CACHE_DIRECTORY, f"{JOURNAL_PREFIX}{fingerprint[:16]}.jsonl"
+    )
+    remove_stale_journals(cache.CACHE_DIRECTORY, path)
+    return RunJournal(path, fingerprint)
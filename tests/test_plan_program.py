@@ -0,0 +1,54 @@
+"""
+Tests for the checks apply_mutation_plan makes before applying a planned entry.
+"""
+
+# pylint: disable=E0401
+
+from typing import Union
+
+import pytest
+from API.AccessAPI import MangaList
+from Main.PlanProgram import planned_entry_state
+
+MANGA_ID = 30013
+
+
+def make_manga_list(progress: int, status: Union[str, None]) -> MangaList:
+    """
+    Creates a list holding the manga, or an empty list if status is None.
+    """
+    manga_list = MangaList()
+    if status is not None:
+        manga_list.add_entries(
+            [{"mediaId": MANGA_ID, "progress": progress, "status": status}]
+        )
+    return manga_list
+
+
+@pytest.mark.parametrize(
+    "status_anilist, variables, progress, status, expected",
+    [
+        ("CURRENT", {"progress": 8}, 5, "CURRENT", "planned"),
+        ("CURRENT", {"progress": 8}, 8, "CURRENT", "applied"),
+        ("CURRENT", {"progress": 8}, 6, "CURRENT", "changed"),
+        ("CURRENT", {"progress": 8}, 5, "PAUSED", "changed"),
+        ("CURRENT", {"progress": 8}, 5, None, "changed"),
+        (None, {"progress": 8, "status": "CURRENT"}, 0, None, "planned"),
+        (None, {"progress": 8, "status": "CURRENT"}, 8, "CURRENT", "applied"),
+        (None, {"progress": 8, "status": "CURRENT"}, 2, "CURRENT", "changed"),
+    ],
+)
+def test_planned_entry_state(
+    status_anilist: Union[str, None],
+    variables: dict,
+    progress: int,
+    status: Union[str, None],
+    expected: str,
+) -> None:
+    entry = {
+        "id": MANGA_ID,
+        "chapter_anilist": 5 if status_anilist is not None else 0,
+        "status_anilist": status_anilist,
+        "variables": [{"mediaId": MANGA_ID, **variables}],
+    }
+    assert planned_entry_state(entry, make_manga_list(progress, status)) == expected
@@ -0,0 +1,57 @@
+"""
+Tests for resuming a run from the RunJournal it left behind.
+"""
+
+# pylint: disable=E0401
+
+from Utils.run_journal import RunJournal
+
+
+def test_resume_after_a_truncated_line(tmp_path) -> None:
+    path = str(tmp_path / "run_journal.jsonl")
+    journal = RunJournal(path, "fingerprint")
+    journal.record_mutation(1, "First", [{"mediaId": 1, "progress": 3}], 3)
+    journal.record_mutation(2, "Second", [{"mediaId": 2, "progress": 4}], 4)
+    journal.close()
+    # The run stopped while writing a line
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "mutation", "id": 9')
+
+    journal = RunJournal(path, "fingerprint")
+    assert journal.resumed
+    assert sorted(journal.mutations) == [1, 2]
+    journal.record_mutation(3, "Third", [{"mediaId": 3, "progress": 5}], 5)
+    journal.close()
+
+    journal = RunJournal(path, "fingerprint")
+    assert sorted(journal.mutations) == [1, 2, 3]
+    journal.close()
+
+
+def test_other_inputs_start_a_new_journal(tmp_path) -> None:
+    path = str(tmp_path / "run_journal.jsonl")
+    journal = RunJournal(path, "fingerprint")
+    journal.record_mutation(1, "First", [{"mediaId": 1, "progress": 3}], 3)
+    journal.close()
+
+    journal = RunJournal(path, "other fingerprint")
+    assert not journal.resumed
+    assert not journal.mutations
+    journal.close()
+
+
+def test_resume_reads_back_finished_stages(tmp_path) -> None:
+    path = str(tmp_path / "run_journal.jsonl")
+    journal = RunJournal(path, "fingerprint")
+    journal.record_stage("ids", {"First": [[1, 3, "reading", None]]})
+    journal.close()
+
+    journal = RunJournal(path, "fingerprint")
+    assert journal.stages == {"ids": {"First": [[1, 3, "reading", None]]}}
+    assert "updates" not in journal.stages
+    journal.record_stage("updates")
+    journal.close()
+
+    journal = RunJournal(path, "fingerprint")
+    assert journal.stages["updates"] is None
+    journal.close()
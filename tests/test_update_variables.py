@@ -0,0 +1,274 @@
+"""
+Tests for the mutations computed by update_variables and diff_entry_variables.
+
+Each case gives the progress and status of the entry on AniList (None when it is
+not on the user's list), the last chapter read and status from Kenmei, and the
+mutations the update should send, written out by hand from how the original
+update treated that transition.
+"""
+
+# pylint: disable=C0103, E0401
+
+from datetime import datetime, timedelta
+from typing import Union
+
+import pytest
+from API.AccessAPI import Manga
+from API.UpdateManga import (
+    Get_Chapters_Updated,
+    Set_Chapters_Updated,
+    diff_entry_variables,
+    plan_manga_update,
+    update_manga_progress,
+    update_variables,
+)
+
+MANGA_ID = 30013
+
+
+def make_manga(
+    last_chapter_read: Union[int, None],
+    status: str,
+    last_read_at: Union[str, None] = None,
+    months: str = "0",
+) -> Manga:
+    """
+    Creates the manga of a test case.
+    """
+    return Manga(
+        name="Test Manga",
+        manga_id=MANGA_ID,
+        last_chapter_read=last_chapter_read,
+        private_bool="No",
+        status=status,
+        last_read_at=last_read_at,
+        months=months,
+    )
+
+
+def days_ago(days: int) -> str:
+    """
+    Formats the date some days ago the way Kenmei exports it.
+    """
+    return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+def apply_mutations(
+    anilist_progress: Union[int, None],
+    anilist_status: Union[str, None],
+    variables_list: list[dict],
+) -> tuple[Union[int, None], Union[str, None]]:
+    """
+    Applies mutations to an entry the way SaveMediaListEntry does.
+    """
+    progress, status = anilist_progress, anilist_status
+    for variables in variables_list:
+        assert variables["mediaId"] == MANGA_ID
+        progress = variables.get("progress", progress)
+        status = variables.get("status", status)
+    return progress, status
+
+
+def without_private(variables_list: list[dict]) -> list[dict]:
+    """
+    Leaves the privacy setting, which every mutation carries, out of the variables.
+    """
+    return [
+        {key: value for key, value in variables.items() if key != "private"}
+        for variables in variables_list
+    ]
+
+
+# anilist_progress, anilist_status, last_chapter_read, status, expected variables,
+# and the progress and status the entry ends up with
+UPDATE_CASES = {
+    # Reading further on Kenmei only sends the new progress
+    "read_ahead": (5, "CURRENT", 8, "CURRENT", [{"progress": 8}], (8, "CURRENT")),
+    # The progress on AniList is never lowered
+    "read_behind": (5, "CURRENT", 3, "CURRENT", [], (5, "CURRENT")),
+    "read_equal": (5, "CURRENT", 5, "CURRENT", [], (5, "CURRENT")),
+    "read_unknown": (5, "CURRENT", None, "CURRENT", [], (5, "CURRENT")),
+    # A status change that is not ahead on Kenmei keeps the AniList progress
+    "dropped_behind": (
+        5,
+        "CURRENT",
+        3,
+        "DROPPED",
+        [{"status": "DROPPED"}],
+        (5, "DROPPED"),
+    ),
+    "paused_read_unknown": (
+        5,
+        "CURRENT",
+        None,
+        "PAUSED",
+        [{"status": "PAUSED"}],
+        (5, "PAUSED"),
+    ),
+    # Progress and status that both change go in the same mutation
+    "resumed_ahead": (
+        5,
+        "PAUSED",
+        8,
+        "CURRENT",
+        [{"progress": 8, "status": "CURRENT"}],
+        (8, "CURRENT"),
+    ),
+    "dropped_on_anilist_read_ahead": (
+        5,
+        "DROPPED",
+        8,
+        "CURRENT",
+        [{"progress": 8, "status": "CURRENT"}],
+        (8, "CURRENT"),
+    ),
+    # A dropped entry that is dropped on Kenmei too is kept as it is
+    "dropped_kept": (5, "DROPPED", 5, "DROPPED", [], (5, "DROPPED")),
+    "dropped_kept_behind": (5, "DROPPED", 3, "DROPPED", [], (5, "DROPPED")),
+    # A completed entry is never changed
+    "completed_kept_read_ahead": (5, "COMPLETED", 8, "CURRENT", [], (5, "COMPLETED")),
+    "completed_kept_dropped": (5, "COMPLETED", 3, "DROPPED", [], (5, "COMPLETED")),
+    "completed_kept_planning": (5, "COMPLETED", 8, "PLANNING", [], (5, "COMPLETED")),
+    # A planned manga is reset to chapter 0 by the mutation setting its status
+    "planning_resets_progress": (
+        5,
+        "CURRENT",
+        8,
+        "PLANNING",
+        [{"progress": 0, "status": "PLANNING"}],
+        (0, "PLANNING"),
+    ),
+    "planning_kept": (0, "PLANNING", 4, "PLANNING", [], (0, "PLANNING")),
+    # An entry without progress on AniList gets the last chapter read
+    "anilist_progress_unknown": (
+        None,
+        "CURRENT",
+        8,
+        "CURRENT",
+        [{"progress": 8}],
+        (8, "CURRENT"),
+    ),
+    # A manga that is not on the list is added with its progress and status
+    "added_read_ahead": (
+        0,
+        None,
+        8,
+        "CURRENT",
+        [{"progress": 8, "status": "CURRENT"}],
+        (8, "CURRENT"),
+    ),
+    "added_unread": (0, None, 0, "CURRENT", [{"status": "CURRENT"}], (0, "CURRENT")),
+    "added_read_unknown": (
+        None,
+        None,
+        None,
+        "CURRENT",
+        [{"status": "CURRENT"}],
+        (None, "CURRENT"),
+    ),
+    # A new entry starts at chapter 0, so a planned one only needs its status
+    "added_planning": (
+        0,
+        None,
+        5,
+        "PLANNING",
+        [{"status": "PLANNING"}],
+        (0, "PLANNING"),
+    ),
+}
+
+
+@pytest.mark.parametrize("case", UPDATE_CASES)
+def test_update_variables(case: str) -> None:
+    (
+        anilist_progress,
+        anilist_status,
+        last_chapter_read,
+        status,
+        expected,
+        expected_state,
+    ) = UPDATE_CASES[case]
+    manga = make_manga(last_chapter_read, status)
+
+    variables_list = update_variables(manga, anilist_progress, anilist_status)
+
+    assert without_private(variables_list) == [
+        {"mediaId": MANGA_ID, **variables} for variables in expected
+    ]
+    assert all(variables["private"] is False for variables in variables_list)
+    assert (
+        apply_mutations(anilist_progress, anilist_status, variables_list)
+        == expected_state
+    )
+
+
+# Kenmei status, months, days since the manga was last read (None if unknown),
+# and the status the entry is set to when it is at chapter 5 on AniList
+PAUSE_CASES = {
+    "read_long_ago_paused": ("reading", "3", 100, [{"status": "PAUSED"}]),
+    "read_recently_kept": ("reading", "3", 10, []),
+    "never_paused_without_months": ("reading", "0", 1000, []),
+    "last_read_unknown_paused": ("reading", "3", None, [{"status": "PAUSED"}]),
+    "dropped_long_ago_paused": ("dropped", "3", 100, [{"status": "PAUSED"}]),
+    "dropped_recently_kept": ("dropped", "3", 10, [{"status": "DROPPED"}]),
+    "on_hold_mapped": ("on_hold", "0", 10, [{"status": "PAUSED"}]),
+    "planned_not_paused": (
+        "plan_to_read",
+        "3",
+        100,
+        [{"progress": 0, "status": "PLANNING"}],
+    ),
+}
+
+
+@pytest.mark.parametrize("case", PAUSE_CASES)
+def test_plan_manga_update_pauses_after_months(case: str) -> None:
+    status, months, days, expected = PAUSE_CASES[case]
+    manga = make_manga(5, status, days_ago(days) if days is not None else None, months)
+
+    variables_list = plan_manga_update(manga, 5, "CURRENT")
+
+    assert without_private(variables_list) == [
+        {"mediaId": MANGA_ID, **variables} for variables in expected
+    ]
+
+
+def test_diff_entry_variables_planning_is_a_single_mutation() -> None:
+    assert diff_entry_variables(MANGA_ID, 12, "CURRENT", 0, "PLANNING") == [
+        {"mediaId": MANGA_ID, "progress": 0, "status": "PLANNING"}
+    ]
+    assert diff_entry_variables(MANGA_ID, 0, "CURRENT", 7, "PLANNING") == [
+        {"mediaId": MANGA_ID, "progress": 7, "status": "PLANNING"}
+    ]
+
+
+def test_diff_entry_variables_adds_missing_entry() -> None:
+    # An entry that is not on the list is added even if nothing else changes
+    assert diff_entry_variables(MANGA_ID, 0, None, None, None, False) == [
+        {"mediaId": MANGA_ID, "private": False}
+    ]
+
+
+class Terminal:  # pylint: disable=R0903
+    """
+    Collects the terminal messages of update_manga_progress.
+    """
+
+    def __init__(self) -> None:
+        self.messages: list[str] = []
+
+    def update_terminal(self, text: str) -> None:
+        self.messages.append(text)
+
+
+def test_update_manga_progress_without_anilist_progress() -> None:
+    manga = make_manga(5, "CURRENT")
+    variables_list = update_variables(manga, None, "CURRENT")
+    Set_Chapters_Updated()
+
+    updated = update_manga_progress(
+        manga, Terminal(), variables_list, None, [{"SaveMediaListEntry": {}}]
+    )
+
+    assert updated is True
+    assert Get_Chapters_Updated() == 5